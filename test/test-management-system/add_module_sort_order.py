@@ -17,23 +17,13 @@ def add_sort_order_field():
         return False
     
     try:
+        # sort_order 字段由数据库迁移 v1 创建，初始化 TestDatabase 即可保证字段存在
+        TestDatabase(db_path)
+        print("ℹ️ sort_order 字段已由数据库迁移创建")
+        
         conn = sqlite3.connect(db_path)
         conn.row_factory = sqlite3.Row
         
-        # 检查是否已经有 sort_order 字段
-        cursor = conn.execute("PRAGMA table_info(test_modules)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'sort_order' not in columns:
-            print("📝 添加 sort_order 字段到 test_modules 表...")
-            conn.execute('''
-                ALTER TABLE test_modules 
-                ADD COLUMN sort_order INTEGER DEFAULT 999
-            ''')
-            print("✅ sort_order 字段添加成功")
-        else:
-            print("ℹ️ sort_order 字段已存在")
-        
         # 设置模块的排序顺序
         module_order = [
             '用户认证',      # 1
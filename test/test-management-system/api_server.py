@@ -4,51 +4,179 @@
 提供RESTful API接口用于管理测试模块、测试用例、测试步骤和测试结果
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, send_from_directory, stream_with_context
+from werkzeug.security import safe_join
 from flask_cors import CORS
 import os
 import sys
 import json
+import time
+import mimetypes
 from datetime import datetime
-from database import TestDatabase
+from database import TestDatabase, VersionConflictError
+from backup import BackupManager, BackupScheduler, BackupError
+from snapshots import SnapshotStore, SnapshotError
+from maintenance import MaintenanceScheduler
+from catalog_index import CatalogIndex, CaseRecord, select_cases
+from statistics_engine import StatisticsEngine
+from events import event_stream, resume_version
+from config import get_config
+from serialization import BACKEND as JSON_BACKEND, dumps
+from compression import STATIC_DIRECTORIES, negotiate, compress, precompressed_variant
+from build_assets import cache_control_for
 
 # 创建Flask应用
 app = Flask(__name__)
-CORS(app)  # 启用跨域支持
+CORS(app, expose_headers=['ETag'])  # 启用跨域支持，允许前端读取版本号
 
 # 初始化数据库
-db = TestDatabase()
+db = TestDatabase(
+    get_config('database.path', 'test_management.db'),
+    slow_query_threshold_ms=(
+        get_config('database.slow_query_threshold_ms', 100)
+        if get_config('database.slow_query_log', True) else None
+    ),
+    write_queue=get_config('database.write_queue', True),
+    read_only_connections=get_config('database.read_only_connections', True),
+    analytics_snapshot_interval=(
+        get_config('database.analytics_snapshot_interval', 60)
+        if get_config('database.analytics_snapshot', False) else None
+    )
+)
+
+# 在线备份（定时备份在启动服务时开始）
+backup_manager = BackupManager.from_config(db.db_path)
+backup_scheduler = None
+
+# 空闲时的数据库维护（启动服务时开始）
+maintenance_scheduler = None
+
+# 内存中的目录索引（列表摘要和统计接口不访问 SQLite）
+catalog_index = (
+    CatalogIndex(db, get_config('database.catalog_index_sync_interval', 5)).start()
+    if get_config('database.catalog_index', False) else None
+)
+
+# 列式统计引擎（分组统计、模块统计）
+statistics_engine = StatisticsEngine(db)
+
+# 命名快照（测试环境重置）
+snapshot_store = SnapshotStore.from_config(db.db_path)
+
+# 列表和详情接口由 SQLite JSON1 直接生成响应文本
+JSON_RESPONSES = get_config('database.json_responses', True)
 
 # 通用响应格式
+def json_response(payload, status_code=200):
+    """使用配置的序列化后端生成 JSON 响应"""
+    return app.response_class(dumps(payload), status=status_code, mimetype='application/json')
+
 def success_response(data=None, message="操作成功"):
     """成功响应格式"""
-    return jsonify({
+    return json_response({
         "success": True,
         "data": data,
         "message": message,
         "timestamp": datetime.now().isoformat()
     })
 
+def raw_success_response(data_json, message="操作成功"):
+    """成功响应格式，data_json 为数据库生成的 JSON 文本，原样拼接到响应中"""
+    envelope = dumps({
+        "message": message,
+        "timestamp": datetime.now().isoformat()
+    })
+    body = b'{"success":true,"data":' + data_json.encode('utf-8') + b',' + envelope[1:]
+    return app.response_class(body, mimetype='application/json')
+
 def error_response(message="操作失败", status_code=400):
     """错误响应格式"""
-    response = jsonify({
+    return json_response({
         "success": False,
         "error": message,
         "timestamp": datetime.now().isoformat()
-    })
-    response.status_code = status_code
+    }, status_code)
+
+def with_etag(response, test_case):
+    """以测试用例版本号作为 ETag，客户端可通过 If-Match 做乐观并发控制"""
+    if test_case and test_case.get('version') is not None:
+        response.headers['ETag'] = f'"{test_case["version"]}"'
+    return response
+
+def parse_if_match():
+    """解析 If-Match 请求头中的版本号，未提供或为 * 时返回 None"""
+    header = request.headers.get('If-Match', '').strip()
+    if not header or header == '*':
+        return None
+    if header.startswith('W/'):
+        header = header[2:]
+    try:
+        return int(header.strip('"'))
+    except ValueError:
+        raise ValueError("If-Match 必须是测试用例的版本号")
+
+# 响应压缩
+COMPRESSION_ENABLED = get_config('compression.enabled', True)
+COMPRESSION_MIN_SIZE = get_config('compression.min_size', 1024)
+
+@app.after_request
+def compress_response(response):
+    """按 Accept-Encoding 压缩较大的 JSON 响应"""
+    if (not COMPRESSION_ENABLED
+            or response.mimetype != 'application/json'
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request.headers.get('Accept-Encoding', ''))
+    if not encoding:
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESSION_MIN_SIZE:
+        return response
+    
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
     return response
 
 # 静态文件服务
+# source: 直接提供源文件；dist: 提供 build_assets.py 生成的带哈希资源（长期缓存）
+STATIC_MODE = get_config('static.mode', 'source')
+STATIC_ROOT = (os.path.join(app.root_path, get_config('static.dist_dir', 'dist'))
+               if STATIC_MODE == 'dist' else app.root_path)
+STATIC_PREFIXES = tuple(f'{name}/' for name in STATIC_DIRECTORIES)
+
+def send_static(filename, **kwargs):
+    """发送静态文件；dist 模式下带哈希的资源永久缓存，其余文件（index.html）通过 ETag 重新验证"""
+    response = send_from_directory(STATIC_ROOT, filename, **kwargs)
+    if STATIC_MODE == 'dist':
+        response.headers['Cache-Control'] = cache_control_for(filename)
+    return response
+
 @app.route('/')
 def index():
     """主页"""
-    return send_from_directory('.', 'index.html')
+    return send_static('index.html')
 
 @app.route('/<path:filename>')
 def static_files(filename):
-    """静态文件服务"""
-    return send_from_directory('.', filename)
+    """静态文件服务，js/ 和 css/ 下有预压缩文件（python compression.py 生成）时直接发送"""
+    if not filename.startswith(STATIC_PREFIXES):
+        return send_static(filename)
+    
+    source = safe_join(STATIC_ROOT, filename)
+    variant = (precompressed_variant(source, request.headers.get('Accept-Encoding', ''))
+               if COMPRESSION_ENABLED and source else None)
+    if variant:
+        path, encoding = variant
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_static(os.path.relpath(path, STATIC_ROOT), mimetype=mimetype)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_static(filename)
+    response.vary.add('Accept-Encoding')
+    return response
 
 # API路由
 
@@ -59,9 +187,133 @@ def health_check():
     return success_response({
         "status": "healthy",
         "service": "测试用例管理系统",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "json_backend": JSON_BACKEND,
+        "backup": {
+            "enabled": backup_scheduler is not None,
+            "last_backup": backup_manager.last_backup,
+            "last_error": backup_scheduler.last_error if backup_scheduler else None
+        },
+        "maintenance": {
+            "enabled": maintenance_scheduler is not None,
+            **(maintenance_scheduler.snapshot() if maintenance_scheduler else {})
+        },
+        "catalog_index": {
+            "enabled": catalog_index is not None,
+            **(catalog_index.snapshot() if catalog_index else {})
+        }
+    })
+
+# 数据变更事件流
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """
+    以 Server-Sent Events 推送数据变更事件
+    since=<版本号>（或浏览器重连时的 Last-Event-ID）从指定版本之后继续推送
+    """
+    since = resume_version(request.args.get('since'), request.headers.get('Last-Event-ID'))
+    return app.response_class(
+        stream_with_context(event_stream(db.events, since)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# 增量同步
+@app.route('/api/changes', methods=['GET'])
+def get_changes():
+    """
+    获取指定版本之后的变更（新增/修改的数据和删除记录）
+    since=<版本号> 默认 0（全部数据）；limit=<条数> 默认 1000，最大 5000
+    """
+    try:
+        since = request.args.get('since', 0, type=int)
+        limit = request.args.get('limit', 1000, type=int)
+        if since < 0 or limit <= 0:
+            return error_response("since 不能为负数，limit 必须大于 0")
+        return success_response(db.get_changes(since, min(limit, 5000)))
+    except Exception as e:
+        return error_response(f"获取变更失败: {str(e)}")
+
+# 慢查询日志
+@app.route('/api/admin/slow-queries', methods=['GET'])
+def get_slow_queries():
+    """获取按归一化SQL聚合的慢查询及其执行计划"""
+    if db.slow_query_log is None:
+        return error_response("慢查询日志未启用", 404)
+    return success_response({
+        "threshold_ms": db.slow_query_log.threshold_ms,
+        "queries": db.slow_query_log.snapshot()
     })
 
+@app.route('/api/admin/slow-queries', methods=['DELETE'])
+def reset_slow_queries():
+    """清空慢查询日志"""
+    if db.slow_query_log is None:
+        return error_response("慢查询日志未启用", 404)
+    db.slow_query_log.reset()
+    return success_response(None, "慢查询日志已清空")
+
+# 数据库备份
+@app.route('/api/admin/backups', methods=['GET'])
+def list_backups():
+    """列出数据库备份（最新的在前）"""
+    return success_response(backup_manager.list_backups())
+
+@app.route('/api/admin/backups', methods=['POST'])
+def create_backup():
+    """立即创建备份，可选 label"""
+    data = request.get_json(silent=True) or {}
+    try:
+        return success_response(backup_manager.create_backup(data.get('label')), "备份成功")
+    except BackupError as e:
+        return error_response(str(e))
+    except Exception as e:
+        return error_response(f"备份失败: {str(e)}", 500)
+
+# 数据库快照
+@app.route('/api/admin/snapshots', methods=['GET'])
+def list_snapshots():
+    """列出命名快照"""
+    return success_response(snapshot_store.list())
+
+@app.route('/api/admin/snapshots', methods=['POST'])
+def save_snapshot():
+    """把当前数据库保存为命名快照（同名快照被替换）"""
+    data = request.get_json(silent=True) or {}
+    try:
+        return success_response(snapshot_store.save(data.get('name', '')), "快照已保存")
+    except SnapshotError as e:
+        return error_response(str(e))
+    except Exception as e:
+        return error_response(f"保存快照失败: {str(e)}", 500)
+
+@app.route('/api/admin/snapshots/<name>/restore', methods=['POST'])
+def restore_snapshot(name):
+    """用快照替换数据库文件并重新打开连接，客户端收到 reset 事件后重新加载"""
+    try:
+        source = snapshot_store.path(name)
+        if not os.path.exists(source):
+            return error_response("快照不存在", 404)
+        started = time.perf_counter()
+        db.replace_database(source)
+        return success_response({
+            "name": name,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1)
+        }, "快照已恢复")
+    except SnapshotError as e:
+        return error_response(str(e))
+    except Exception as e:
+        return error_response(f"恢复快照失败: {str(e)}", 500)
+
+@app.route('/api/admin/snapshots/<name>', methods=['DELETE'])
+def delete_snapshot(name):
+    """删除命名快照"""
+    try:
+        snapshot_store.delete(name)
+        return success_response(None, "快照已删除")
+    except SnapshotError as e:
+        return error_response(str(e), 404)
+
 # 测试模块相关API
 @app.route('/api/test-cases/modules', methods=['GET'])
 def get_modules():
@@ -131,7 +383,13 @@ def get_test_cases():
     """获取测试用例"""
     try:
         module_id = request.args.get('moduleId', type=int)
-        test_cases = db.get_test_cases(module_id)
+        exclude_passed = request.args.get('excludePassed', '').lower() in ('true', '1', 'yes')
+        if request.args.get('view') == 'summary':
+            return get_test_case_summaries(module_id, exclude_passed)
+        if JSON_RESPONSES:
+            return raw_success_response(db.get_test_cases_json(module_id, exclude_passed))
+        
+        test_cases = db.get_test_cases(module_id, exclude_passed=exclude_passed)
         
         # 为每个测试用例添加步骤信息
         for test_case in test_cases:
@@ -142,6 +400,36 @@ def get_test_cases():
     except Exception as e:
         return error_response(f"获取测试用例失败: {str(e)}")
 
+def get_test_case_summaries(module_id, exclude_passed):
+    """
+    测试用例摘要（view=summary）：只包含目录字段，支持筛选、排序和分页
+    
+    查询参数: status, priority, q（标题包含的文本）, sort, order（asc/desc）, offset, limit（0 表示只计数）
+    启用目录索引时在内存中计算，否则查询数据库后筛选
+    """
+    filters = {
+        'module_id': module_id,
+        'exclude_passed': exclude_passed,
+        'status': request.args.get('status') or None,
+        'priority': request.args.get('priority') or None,
+        'search': request.args.get('q') or None,
+        'sort': request.args.get('sort', 'created_at'),
+        'descending': request.args.get('order', 'desc').lower() != 'asc',
+        'offset': max(request.args.get('offset', 0, type=int), 0),
+        'limit': request.args.get('limit', type=int)
+    }
+    try:
+        if catalog_index is not None:
+            total, items = catalog_index.query(**filters)
+        else:
+            test_cases = db.get_test_cases(module_id, exclude_passed=exclude_passed)
+            module_names = {test_case['module_id']: test_case['module_name'] for test_case in test_cases}
+            total, records = select_cases([CaseRecord.from_row(test_case) for test_case in test_cases], **filters)
+            items = [record.to_dict(module_names.get(record.module_id)) for record in records]
+    except ValueError as e:
+        return error_response(str(e))
+    return success_response({'total': total, 'items': items})
+
 @app.route('/api/test-cases', methods=['POST'])
 def create_test_case():
     """创建测试用例"""
@@ -168,19 +456,71 @@ def create_test_case():
     except Exception as e:
         return error_response(f"创建测试用例失败: {str(e)}")
 
+@app.route('/api/test-cases/batch-status', methods=['POST'])
+def batch_update_status():
+    """
+    批量更新测试用例状态
+    请求体: {"status": "passed", "ids": [1, 2]} 或 {"status": "passed", "filter": {"module_id": 1, "status": "pending"}}
+    可选: record_results（同时写入执行结果）、executed_by、actual_result、notes
+    """
+    try:
+        data = request.get_json()
+        if not data or not data.get('status'):
+            return error_response("测试状态不能为空")
+        
+        ids = data.get('ids')
+        if ids is not None and not isinstance(ids, list):
+            return error_response("ids 必须是数组")
+        filters = data.get('filter') or {}
+        
+        try:
+            result = db.batch_update_status(
+                data['status'],
+                test_case_ids=ids,
+                module_id=filters.get('module_id'),
+                current_status=filters.get('status'),
+                record_results=bool(data.get('record_results', False)),
+                executed_by=data.get('executed_by'),
+                actual_result=data.get('actual_result', ''),
+                notes=data.get('notes', '')
+            )
+        except ValueError as e:
+            return error_response(str(e))
+        
+        return success_response(result, f"已更新 {result['updated']} 个测试用例")
+    except Exception as e:
+        return error_response(f"批量更新测试用例失败: {str(e)}")
+
 @app.route('/api/test-cases/<int:test_case_id>', methods=['GET'])
 def get_test_case(test_case_id):
-    """获取单个测试用例"""
+    """
+    获取单个测试用例
+    默认附带步骤；include=steps,results&results_limit=N 可同时返回最近的执行结果
+    """
     try:
-        test_case = db.get_test_case(test_case_id)
+        include = request.args.get('include', 'steps')
+        include = tuple(item.strip() for item in include.split(',') if item.strip())
+        unknown = [item for item in include if item not in ('steps', 'results')]
+        if unknown:
+            return error_response(f"不支持的 include 参数: {', '.join(unknown)}")
+        results_limit = request.args.get('results_limit', type=int)
+        if results_limit is not None and results_limit < 0:
+            return error_response("results_limit 不能为负数")
+        
+        if JSON_RESPONSES:
+            bundle = db.get_test_case_bundle_json(test_case_id, include, results_limit)
+            if not bundle:
+                return error_response("测试用例不存在", 404)
+            version, data_json = bundle
+            response = raw_success_response(data_json)
+            response.headers['ETag'] = f'"{version}"'
+            return response
+        
+        test_case = db.get_test_case_bundle(test_case_id, include, results_limit)
         if not test_case:
             return error_response("测试用例不存在", 404)
         
-        # 添加步骤信息
-        steps = db.get_test_steps(test_case_id)
-        test_case['steps'] = steps
-        
-        return success_response(test_case)
+        return with_etag(success_response(test_case), test_case)
     except Exception as e:
         return error_response(f"获取测试用例失败: {str(e)}")
 
@@ -197,7 +537,34 @@ def update_test_case(test_case_id):
             return error_response("测试用例不存在", 404)
         
         test_case = db.get_test_case(test_case_id)
-        return success_response(test_case, "测试用例更新成功")
+        return with_etag(success_response(test_case, "测试用例更新成功"), test_case)
+    except Exception as e:
+        return error_response(f"更新测试用例失败: {str(e)}")
+
+@app.route('/api/test-cases/<int:test_case_id>', methods=['PATCH'])
+def patch_test_case(test_case_id):
+    """局部更新测试用例，只修改请求体中出现的字段；可通过 If-Match 校验版本号"""
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data, dict):
+            return error_response("更新内容不能为空")
+        if 'title' in data and not data['title']:
+            return error_response("标题不能为空")
+        
+        try:
+            expected_version = parse_if_match()
+            version = db.patch_test_case(test_case_id, data, expected_version)
+        except ValueError as e:
+            return error_response(str(e))
+        except VersionConflictError as e:
+            response = error_response("测试用例已被修改，请刷新后重试", 412)
+            response.headers['ETag'] = f'"{e.current_version}"'
+            return response
+        if version is None:
+            return error_response("测试用例不存在", 404)
+        
+        test_case = db.get_test_case(test_case_id)
+        return with_etag(success_response(test_case, "测试用例更新成功"), test_case)
     except Exception as e:
         return error_response(f"更新测试用例失败: {str(e)}")
 
@@ -292,25 +659,12 @@ def create_test_result(test_case_id):
         data['test_case_id'] = test_case_id
         result_id = db.create_test_result(data)
         
-        # 同时更新测试用例的状态
-        test_case_update = {
+        # 同时更新测试用例的状态（只写入执行相关的字段）
+        db.patch_test_case(test_case_id, {
             'status': data['status'],
             'actual_result': data.get('actual_result', ''),
             'executed_by': data.get('executed_by', '')
-        }
-        
-        # 获取原测试用例数据
-        original_test_case = db.get_test_case(test_case_id)
-        if original_test_case:
-            test_case_update.update({
-                'title': original_test_case['title'],
-                'description': original_test_case['description'],
-                'module_id': original_test_case['module_id'],
-                'priority': original_test_case['priority'],
-                'estimated_time': original_test_case['estimated_time'],
-                'expected_result': original_test_case['expected_result']
-            })
-            db.update_test_case(test_case_id, test_case_update)
+        })
         
         # 获取创建的结果
         results = db.get_test_results(test_case_id)
@@ -323,9 +677,26 @@ def create_test_result(test_case_id):
 # 统计数据API
 @app.route('/api/test-cases/statistics', methods=['GET'])
 def get_statistics():
-    """获取统计数据"""
+    """
+    获取统计数据
+    
+    指定 group_by（module、priority、status 的组合，逗号分隔）、bucket（hour/day/week）或 buckets 时
+    由列式统计引擎返回总体、按优先级、分组统计和执行时间直方图
+    """
     try:
-        stats = db.get_statistics()
+        if any(name in request.args for name in ('group_by', 'bucket', 'buckets')):
+            group_by = [field.strip() for field in request.args.get('group_by', '').split(',') if field.strip()]
+            try:
+                stats = statistics_engine.statistics(
+                    group_by,
+                    bucket=request.args.get('bucket', 'day'),
+                    buckets=request.args.get('buckets', 30, type=int)
+                )
+            except ValueError as e:
+                return error_response(str(e))
+            return success_response(stats)
+        
+        stats = catalog_index.statistics() if catalog_index is not None else db.get_statistics()
         return success_response(stats)
     except Exception as e:
         return error_response(f"获取统计数据失败: {str(e)}")
@@ -334,40 +705,7 @@ def get_statistics():
 def get_module_statistics():
     """获取模块统计信息"""
     try:
-        # 获取所有模块
-        modules = db.get_modules()
-        
-        # 为每个模块添加统计信息
-        module_stats = []
-        for module in modules:
-            # 获取该模块的测试用例统计
-            test_cases = db.get_test_cases(module['id'])
-            
-            # 统计各种状态的测试用例数量
-            total_cases = len(test_cases)
-            passed_cases = len([tc for tc in test_cases if tc.get('status') == 'passed'])
-            failed_cases = len([tc for tc in test_cases if tc.get('status') == 'failed'])
-            pending_cases = len([tc for tc in test_cases if tc.get('status') in ['pending', None, '']])
-            
-            # 计算通过率
-            pass_rate = round((passed_cases / total_cases * 100) if total_cases > 0 else 0, 1)
-            
-            module_stat = {
-                'id': module['id'],
-                'name': module['name'],
-                'description': module['description'],
-                'color': module.get('color', '#3498db'),
-                'icon': module.get('icon', 'fas fa-cube'),
-                'total_cases': total_cases,
-                'passed_cases': passed_cases,
-                'failed_cases': failed_cases,
-                'pending_cases': pending_cases,
-                'pass_rate': pass_rate,
-                'status': 'active' if total_cases > 0 else 'inactive'
-            }
-            module_stats.append(module_stat)
-        
-        return success_response(module_stats)
+        return success_response(statistics_engine.module_statistics())
     except Exception as e:
         return error_response(f"获取模块统计失败: {str(e)}")
 
@@ -393,27 +731,28 @@ def execute_test_case(test_case_id):
         result_id = db.create_test_result(result_data)
         
         # 更新测试用例状态
-        original_test_case = db.get_test_case(test_case_id)
-        if original_test_case:
-            test_case_update = {
-                'title': original_test_case['title'],
-                'description': original_test_case['description'],
-                'module_id': original_test_case['module_id'],
-                'priority': original_test_case['priority'],
-                'estimated_time': original_test_case['estimated_time'],
-                'expected_result': original_test_case['expected_result'],
-                'status': data['status'],
-                'actual_result': data.get('actual_result', ''),
-                'executed_by': data.get('executed_by', '手动测试')
-            }
-            db.update_test_case(test_case_id, test_case_update)
+        db.patch_test_case(test_case_id, {
+            'status': data['status'],
+            'actual_result': data.get('actual_result', ''),
+            'executed_by': data.get('executed_by', '手动测试')
+        })
         
         # 返回更新后的测试用例
         updated_test_case = db.get_test_case(test_case_id)
-        return success_response(updated_test_case, "测试用例执行完成")
+        return with_etag(success_response(updated_test_case, "测试用例执行完成"), updated_test_case)
     except Exception as e:
         return error_response(f"执行测试用例失败: {str(e)}")
 
+def start_background_services():
+    """
+    按配置启动定时备份和空闲维护（WSGI 入口和 ASGI 的 lifespan 启动时调用，重复调用不会重复启动）
+    """
+    global backup_scheduler, maintenance_scheduler
+    if backup_scheduler is None and get_config('database.backup_enabled', True):
+        backup_scheduler = BackupScheduler(backup_manager, get_config('database.backup_interval', 3600)).start()
+    if maintenance_scheduler is None and get_config('maintenance.enabled', True):
+        maintenance_scheduler = MaintenanceScheduler(db).start()
+
 # 错误处理
 @app.errorhandler(404)
 def not_found(error):
@@ -438,6 +777,14 @@ if __name__ == '__main__':
     if len(sys.argv) > 2 and sys.argv[2] == '--debug':
         debug = True
     
+    if '--async' in sys.argv or get_config('server.mode') == 'asgi':
+        # 异步模式：数据库操作在有界线程池中执行，后台任务在服务启动时开始
+        from asgi import serve
+        serve(port, wsgi_app=app, change_feed=db.events, on_startup=start_background_services)
+        sys.exit(0)
+    
+    start_background_services()
+    
     print("🚀 测试用例管理系统 API 服务器启动中...")
     print(f"📍 服务地址: http://localhost:{port}")
     print(f"📊 API文档: http://localhost:{port}/api/health")
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+测试用例管理系统 ASGI 入口
+连接的收发由事件循环处理，Flask 视图（及其中的SQLite读写）在专用线程池中执行：
+
+- 普通接口和统计类接口使用不同的线程池，慢统计查询不会阻塞普通请求（无队头阻塞）
+- 线程池大小固定，等待中的请求只占用协程而不占用线程
+- 排队请求数超过上限时直接返回 503，避免积压
+
+用法:
+    python asgi.py [端口]                  # 需要安装 uvicorn
+    uvicorn asgi:application --port 8000
+"""
+
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs
+from typing import List, Dict, Optional, Any, Callable, Awaitable, Tuple
+
+from config import get_config
+from serialization import dumps
+from events import ChangeFeed, format_sse, reset_event, resume_version
+
+# 统计、分析类接口使用独立线程池
+ANALYTICS_PREFIXES = (
+    '/api/test-cases/statistics',
+    '/api/modules/statistics',
+    '/api/admin/',
+)
+
+NativeHandler = Callable[[Dict[str, Any], Callable, Callable], Awaitable[None]]
+
+
+class AsyncApiServer:
+    """把 WSGI 应用适配为 ASGI 应用，视图在有界线程池中执行"""
+
+    def __init__(self, wsgi_app: Callable, db_workers: int = 4, analytics_workers: int = 2,
+                 max_pending: int = 256, on_startup: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            wsgi_app: WSGI 应用（Flask app）
+            db_workers: 普通接口线程数
+            analytics_workers: 统计类接口线程数
+            max_pending: 同时处理和排队的请求上限
+            on_startup: 服务启动时调用（启动定时备份、空闲维护等后台任务）
+        """
+        self.wsgi_app = wsgi_app
+        self.on_startup = on_startup
+        self.executors = {
+            'default': ThreadPoolExecutor(db_workers, thread_name_prefix='api-db'),
+            'analytics': ThreadPoolExecutor(analytics_workers, thread_name_prefix='api-analytics'),
+        }
+        self.max_pending = max_pending
+        self.pending = 0
+        # 直接在事件循环中处理的原生异步路由（如长连接推送）
+        self.native_routes: Dict[str, NativeHandler] = {}
+
+    def route(self, path: str) -> Callable[[NativeHandler], NativeHandler]:
+        """注册原生 ASGI 路由"""
+        def decorator(handler: NativeHandler) -> NativeHandler:
+            self.native_routes[path] = handler
+            return handler
+        return decorator
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        handler = self.native_routes.get(scope['path'])
+        if handler is not None:
+            await handler(scope, receive, send)
+            return
+
+        if self.pending >= self.max_pending:
+            await send_json(send, 503, {
+                "success": False,
+                "error": "服务器繁忙，请稍后重试",
+                "timestamp": datetime.now().isoformat()
+            })
+            return
+
+        self.pending += 1
+        try:
+            body = await read_body(receive)
+            environ = build_environ(scope, body)
+            loop = asyncio.get_running_loop()
+            status, headers, chunks = await loop.run_in_executor(
+                self.executors[self.select_pool(scope['path'])], self._call_wsgi, environ
+            )
+        finally:
+            self.pending -= 1
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b''.join(chunks)})
+
+    @staticmethod
+    def select_pool(path: str) -> str:
+        return 'analytics' if path.startswith(ANALYTICS_PREFIXES) else 'default'
+
+    def _call_wsgi(self, environ: Dict[str, Any]) -> Tuple[int, List[Tuple[bytes, bytes]], List[bytes]]:
+        """在工作线程中执行 WSGI 应用，返回状态码、响应头和响应体"""
+        response: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+
+        def start_response(status: str, headers: List[Tuple[str, str]], exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers
+            ]
+            return chunks.append
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in result:
+                if chunk:
+                    chunks.append(chunk)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return response['status'], response['headers'], chunks
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                if self.on_startup is not None:
+                    self.on_startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                for executor in self.executors.values():
+                    executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+async def read_body(receive: Callable) -> bytes:
+    """读取完整的请求体"""
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        body.extend(message.get('body', b''))
+        if not message.get('more_body', False):
+            break
+    return bytes(body)
+
+
+async def wait_for_disconnect(receive: Callable) -> None:
+    """读完请求体后等待客户端断开连接（http.disconnect）"""
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+        more_body = message.get('more_body', False)
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def send_json(send: Callable, status: int, payload: Dict[str, Any]) -> None:
+    """发送 JSON 响应"""
+    body = dumps(payload)
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def build_environ(scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    """根据 ASGI scope 构造 WSGI environ（PEP 3333）"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name not in ('CONTENT_LENGTH', 'TRANSFER_ENCODING'):
+            key = f'HTTP_{name}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    # 请求体已完整读取（包括分块传输的请求），以实际长度为准
+    environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+
+def event_stream_handler(feed: ChangeFeed, heartbeat: float = 15.0) -> NativeHandler:
+    """
+    SSE 事件流的原生路由：等待事件时只占用协程，不占用线程池
+    发布事件的线程通过回调唤醒事件循环中等待的连接
+    """
+    async def handler(scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        headers = dict(scope.get('headers', []))
+        since = resume_version(query.get('since', [None])[0],
+                               headers.get(b'last-event-id', b'').decode('latin-1') or None)
+
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+
+        def listener(event: Dict[str, Any]) -> None:
+            loop.call_soon_threadsafe(wakeup.set)
+
+        feed.subscribe(listener)
+        disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [(b'content-type', b'text/event-stream; charset=utf-8'),
+                            (b'cache-control', b'no-cache'),
+                            (b'x-accel-buffering', b'no')]
+            })
+            await send({'type': 'http.response.body', 'body': b'retry: 3000\n\n', 'more_body': True})
+
+            version = feed.latest_version() if since is None else since
+            while True:
+                wakeup.clear()
+                events = feed.events_since(version)
+                if events is None:
+                    version = feed.latest_version()
+                    chunk = format_sse(reset_event(version))
+                else:
+                    chunk = b''.join(format_sse(event) for event in events)
+                    if events:
+                        version = events[-1]['version']
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+                waiter = asyncio.ensure_future(wakeup.wait())
+                done, _ = await asyncio.wait({waiter, disconnected}, timeout=heartbeat,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                if disconnected in done:
+                    break
+                if not done:
+                    await send({'type': 'http.response.body', 'body': b': keep-alive\n\n',
+                                'more_body': True})
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            feed.unsubscribe(listener)
+            disconnected.cancel()
+
+    return handler
+
+
+def create_application(wsgi_app: Optional[Callable] = None,
+                       change_feed: Optional[ChangeFeed] = None,
+                       on_startup: Optional[Callable[[], None]] = None) -> AsyncApiServer:
+    """
+    按配置创建 ASGI 应用
+    
+    Args:
+        wsgi_app: 要包装的 WSGI 应用，默认为 api_server.app
+        change_feed: /api/events 使用的事件源，默认为 api_server.db.events
+        on_startup: 服务启动时调用，默认为 api_server.start_background_services
+    """
+    if wsgi_app is None:
+        from api_server import app as wsgi_app
+    if on_startup is None:
+        from api_server import start_background_services as on_startup
+    if change_feed is None:
+        from api_server import db
+        change_feed = db.events
+    application = AsyncApiServer(
+        wsgi_app,
+        db_workers=get_config('server.db_workers', 4),
+        analytics_workers=get_config('server.analytics_workers', 2),
+        max_pending=get_config('server.max_pending', 256),
+        on_startup=on_startup
+    )
+    application.route('/api/events')(event_stream_handler(change_feed))
+    return application
+
+
+_application: Optional[AsyncApiServer] = None
+
+
+def __getattr__(name: str) -> Any:
+    """延迟创建模块级 application，供 uvicorn asgi:application 使用"""
+    global _application
+    if name == 'application':
+        if _application is None:
+            _application = create_application()
+        return _application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def serve(port: int = 8000, host: str = '0.0.0.0', wsgi_app: Optional[Callable] = None,
+          change_feed: Optional[ChangeFeed] = None,
+          on_startup: Optional[Callable[[], None]] = None) -> None:
+    """
+    使用 uvicorn 启动异步服务
+    
+    Args:
+        port: 端口
+        host: 监听地址
+        wsgi_app: 要包装的 WSGI 应用，默认为 api_server.app
+        change_feed: 事件源，默认为 api_server.db.events
+        on_startup: 服务启动时调用，默认为 api_server.start_background_services
+    """
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ 异步模式需要安装 uvicorn: pip3 install uvicorn")
+        sys.exit(1)
+
+    application = create_application(wsgi_app, change_feed, on_startup)
+    print(f"⚡ 异步模式: 普通接口 {get_config('server.db_workers', 4)} 线程, "
+          f"统计接口 {get_config('server.analytics_workers', 2)} 线程")
+    uvicorn.run(application, host=host, port=port, log_level='warning')
+
+
+if __name__ == '__main__':
+    port = 8000
+    if len(sys.argv) > 1:
+        try:
+            port = int(sys.argv[1])
+        except ValueError:
+            print("❌ 错误: 端口号必须是数字")
+            sys.exit(1)
+    serve(port)
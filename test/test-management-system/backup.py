@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+数据库在线备份
+使用 SQLite 备份 API（sqlite3.Connection.backup）分步复制数据库页，每一步之间释放读锁，
+备份期间 API 服务器可以继续读写；备份文件经过完整性检查后压缩保存，超过保留数量的旧备份自动删除
+
+配置（config.py database 部分）:
+    backup_enabled / backup_interval   API 服务器是否定时备份及间隔（秒）
+    backup_dir / backup_keep           备份目录和保留数量
+    backup_compress                    是否 gzip 压缩
+    backup_pages_per_step              每一步复制的页数
+
+用法:
+    python backup.py create [标签]      # 立即备份
+    python backup.py list              # 列出备份
+    python backup.py restore <备份文件>  # 从备份恢复（恢复前自动备份当前数据库）
+    python backup.py prune             # 按保留数量删除旧备份
+"""
+
+import os
+import re
+import sys
+import gzip
+import time
+import shutil
+import sqlite3
+import logging
+import tempfile
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional, Any
+from urllib.parse import quote
+
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 备份文件名: <数据库名>-<时间>[-<标签>].db[.gz]
+BACKUP_NAME_PATTERN = re.compile(r'^(?P<name>.+?)-(?P<time>\d{8}-\d{6}-\d{6})(?:-(?P<label>[\w.-]+))?\.db(?:\.gz)?$')
+
+
+class BackupError(Exception):
+    """备份或恢复失败"""
+
+
+class BackupRestarted(Exception):
+    """分步备份期间数据库被其他连接修改，备份从头重新开始的次数超过上限"""
+
+
+class BackupManager:
+    """创建、列出、轮换和恢复数据库备份"""
+
+    def __init__(self, db_path: str, backup_dir: str = 'backups', keep: int = 24,
+                 compress: bool = True, pages_per_step: int = 256, step_sleep: float = 0.005,
+                 max_restarts: int = 3):
+        """
+        Args:
+            db_path: 数据库文件路径
+            backup_dir: 备份目录
+            keep: 保留的备份数量（0 表示不删除）
+            compress: 是否 gzip 压缩备份文件
+            pages_per_step: 每一步复制的页数，越小对并发写入的影响越小
+            step_sleep: 每一步之间的等待时间（秒），让出数据库给其他连接
+            max_restarts: 分步复制因并发写入重新开始的次数上限，超过后改为一次性复制
+        """
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self.compress = compress
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.max_restarts = max_restarts
+        self.last_backup: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, db_path: Optional[str] = None) -> 'BackupManager':
+        """按 config.py 的 database 配置创建"""
+        backup_dir = get_config('database.backup_dir', 'backups')
+        return cls(
+            db_path or get_config('database.path', 'test_management.db'),
+            backup_dir if os.path.isabs(backup_dir) else os.path.join(BASE_DIR, backup_dir),
+            keep=get_config('database.backup_keep', 24),
+            compress=get_config('database.backup_compress', True),
+            pages_per_step=get_config('database.backup_pages_per_step', 256)
+        )
+
+    def _copy(self, source_path: str, target_path: str) -> None:
+        """
+        通过备份 API 分步复制数据库
+        其他连接在复制期间写入时备份会从头开始（剩余页数变多），持续写入时可能一直无法完成；
+        重新开始超过 max_restarts 次后改为一次性复制，WAL 模式下这只持有一个读事务，不阻塞写入
+        """
+        source = sqlite3.connect(source_path, timeout=30.0)
+        target = sqlite3.connect(target_path)
+        restarts = 0
+        previous_remaining = None
+
+        def progress(status: int, remaining: int, total: int) -> None:
+            nonlocal restarts, previous_remaining
+            if previous_remaining is not None and remaining > previous_remaining:
+                restarts += 1
+                if restarts > self.max_restarts:
+                    raise BackupRestarted()
+            previous_remaining = remaining
+
+        try:
+            with target:
+                try:
+                    source.backup(target, pages=self.pages_per_step, progress=progress, sleep=self.step_sleep)
+                except BackupRestarted:
+                    logger.info("备份期间数据库持续写入，改为一次性复制")
+                    source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+    @staticmethod
+    def _check(path: str) -> None:
+        """检查数据库文件完整性"""
+        conn = sqlite3.connect(f'file:{quote(os.path.abspath(path))}?mode=ro', uri=True)
+        try:
+            result = conn.execute('PRAGMA quick_check').fetchone()[0]
+        finally:
+            conn.close()
+        if result != 'ok':
+            raise BackupError(f"数据库完整性检查失败: {result}")
+
+    def create_backup(self, label: Optional[str] = None) -> Dict[str, Any]:
+        """
+        创建备份
+
+        Args:
+            label: 备份标签（如 pre-restore），会出现在文件名中
+
+        Returns:
+            备份信息 {path, size, created_at, duration_ms, label}
+        """
+        if not os.path.exists(self.db_path):
+            raise BackupError(f"数据库文件不存在: {self.db_path}")
+        if label and not re.fullmatch(r'[\w.-]+', label):
+            raise BackupError("备份标签只能包含字母、数字、下划线、点和连字符")
+
+        with self._lock:
+            started = time.perf_counter()
+            os.makedirs(self.backup_dir, exist_ok=True)
+            name = os.path.splitext(os.path.basename(self.db_path))[0]
+            created_at = datetime.now()
+            file_name = f"{name}-{created_at.strftime('%Y%m%d-%H%M%S-%f')}{'-' + label if label else ''}.db"
+            target = os.path.join(self.backup_dir, file_name + ('.gz' if self.compress else ''))
+
+            fd, temp_path = tempfile.mkstemp(dir=self.backup_dir, suffix='.tmp')
+            os.close(fd)
+            try:
+                self._copy(self.db_path, temp_path)
+                # 备份文件改为回滚日志模式，单个文件即完整的数据库
+                conn = sqlite3.connect(temp_path)
+                try:
+                    conn.execute('PRAGMA journal_mode = DELETE')
+                finally:
+                    conn.close()
+                self._check(temp_path)
+                if self.compress:
+                    compressed = temp_path + '.gz'
+                    with open(temp_path, 'rb') as src, gzip.open(compressed, 'wb', compresslevel=6) as dst:
+                        shutil.copyfileobj(src, dst, 1024 * 1024)
+                    os.unlink(temp_path)
+                    temp_path = compressed
+                os.replace(temp_path, target)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+
+            info = {
+                'path': target,
+                'size': os.path.getsize(target),
+                'created_at': created_at.isoformat(),
+                'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+                'label': label
+            }
+            self.last_backup = info
+            self.prune()
+            logger.info("数据库已备份到 %s（%.0fms）", target, info['duration_ms'])
+            return info
+
+    def list_backups(self) -> List[Dict[str, Any]]:
+        """列出备份（最新的在前）"""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        backups = []
+        for file_name in os.listdir(self.backup_dir):
+            match = BACKUP_NAME_PATTERN.match(file_name)
+            if not match:
+                continue
+            path = os.path.join(self.backup_dir, file_name)
+            backups.append({
+                'path': path,
+                'size': os.path.getsize(path),
+                'created_at': datetime.strptime(match.group('time'), '%Y%m%d-%H%M%S-%f').isoformat(),
+                'label': match.group('label')
+            })
+        backups.sort(key=lambda backup: backup['created_at'], reverse=True)
+        return backups
+
+    def prune(self) -> List[str]:
+        """删除超过保留数量的旧备份，返回被删除的文件"""
+        if self.keep <= 0:
+            return []
+        removed = []
+        for backup in self.list_backups()[self.keep:]:
+            os.unlink(backup['path'])
+            removed.append(backup['path'])
+        return removed
+
+    def restore(self, backup_path: str) -> Dict[str, Any]:
+        """
+        从备份恢复数据库
+        备份先解压到临时文件并检查完整性，再通过备份 API 写回数据库（遵守数据库锁，正在运行的
+        API 服务器无需重启）；恢复前会自动创建 pre-restore 备份
+
+        Returns:
+            恢复前创建的备份信息
+        """
+        if not os.path.exists(backup_path):
+            raise BackupError(f"备份文件不存在: {backup_path}")
+
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.db_path)), suffix='.restore')
+        os.close(fd)
+        try:
+            if backup_path.endswith('.gz'):
+                with gzip.open(backup_path, 'rb') as src, open(temp_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+            else:
+                shutil.copyfile(backup_path, temp_path)
+            try:
+                self._check(temp_path)
+            except sqlite3.DatabaseError as e:
+                raise BackupError(f"备份文件无效: {e}")
+
+            previous = self.create_backup('pre-restore') if os.path.exists(self.db_path) else None
+            with self._lock:
+                self._copy(temp_path, self.db_path)
+            return previous
+        finally:
+            os.unlink(temp_path)
+
+
+class BackupScheduler:
+    """后台线程按间隔执行备份（API 服务器启用 database.backup_enabled 时启动）"""
+
+    def __init__(self, manager: BackupManager, interval: float):
+        self.manager = manager
+        self.interval = interval
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sqlite-backup', daemon=True)
+
+    def start(self) -> 'BackupScheduler':
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.manager.create_backup()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error("定时备份失败: %s", e)
+
+
+def format_size(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f}MB" if size >= 1024 * 1024 else f"{size / 1024:.1f}KB"
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'create'
+    manager = BackupManager.from_config()
+
+    try:
+        if command == 'create':
+            info = manager.create_backup(sys.argv[2] if len(sys.argv) > 2 else None)
+            print(f"✅ 已备份: {info['path']}（{format_size(info['size'])}，耗时 {info['duration_ms']:.0f}ms）")
+        elif command == 'list':
+            backups = manager.list_backups()
+            if not backups:
+                print(f"📭 没有备份（{manager.backup_dir}）")
+            for backup in backups:
+                label = f" [{backup['label']}]" if backup['label'] else ''
+                print(f"💾 {backup['created_at']}{label}  {format_size(backup['size'])}  {backup['path']}")
+        elif command == 'restore':
+            if len(sys.argv) < 3:
+                print("❌ 错误: 请指定备份文件")
+                sys.exit(1)
+            previous = manager.restore(sys.argv[2])
+            print(f"✅ 已从 {sys.argv[2]} 恢复数据库 {manager.db_path}")
+            if previous:
+                print(f"💾 恢复前的数据已备份到: {previous['path']}")
+        elif command == 'prune':
+            removed = manager.prune()
+            print(f"🧹 已删除 {len(removed)} 个旧备份")
+        else:
+            print("用法: python backup.py [create [标签] | list | restore <备份文件> | prune]")
+            sys.exit(1)
+    except (BackupError, OSError, sqlite3.Error) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
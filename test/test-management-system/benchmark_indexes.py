@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+索引性能基准测试
+在临时数据库上生成大规模数据，分别使用旧的单列索引和迁移 v2 的复合索引执行热点查询并对比耗时
+
+用法:
+    python benchmark_indexes.py [用例数量] [重复次数]
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from typing import List, Dict, Any
+
+from database import TestDatabase
+from migrations import MIGRATIONS, MigrationRunner, CreateIndex
+
+# 迁移 v2 之前的单列索引
+LEGACY_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_test_cases_module_id ON test_cases(module_id)',
+    'CREATE INDEX IF NOT EXISTS idx_test_steps_test_case_id ON test_steps(test_case_id)',
+    'CREATE INDEX IF NOT EXISTS idx_test_results_test_case_id ON test_results(test_case_id)',
+]
+
+
+MODULE_COUNT = 20
+
+
+def populate(db: TestDatabase, case_count: int, module_count: int = MODULE_COUNT) -> None:
+    """生成测试数据：每个用例 5 个步骤、3 条执行结果"""
+    rng = random.Random(42)
+    base = datetime(2024, 1, 1)
+    statuses = ['passed'] * 7 + ['failed', 'pending', 'blocked']
+
+    with db.get_connection() as conn:
+        conn.executemany(
+            'INSERT INTO test_modules (name, sort_order) VALUES (?, ?)',
+            [(f'模块{i}', i) for i in range(1, module_count + 1)]
+        )
+        conn.executemany('''
+            INSERT INTO test_cases (title, module_id, status, priority, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [
+            (f'测试用例{i}', rng.randint(1, module_count), rng.choice(statuses),
+             rng.choice(['low', 'medium', 'high', 'urgent']),
+             (base + timedelta(minutes=rng.randint(0, 500000))).isoformat())
+            for i in range(case_count)
+        ])
+        conn.executemany('''
+            INSERT INTO test_steps (test_case_id, step_number, description)
+            VALUES (?, ?, ?)
+        ''', [
+            (case_id, step, f'步骤{step}')
+            for case_id in range(1, case_count + 1)
+            for step in rng.sample(range(1, 6), 5)
+        ])
+        conn.executemany('''
+            INSERT INTO test_results (test_case_id, status, executed_at)
+            VALUES (?, ?, ?)
+        ''', [
+            (rng.randint(1, case_count), rng.choice(['passed', 'failed']),
+             (base + timedelta(minutes=rng.randint(0, 500000))).isoformat())
+            for _ in range(case_count * 3)
+        ])
+        conn.execute('ANALYZE')
+
+
+def use_legacy_indexes(db: TestDatabase) -> None:
+    """删除 v2 复合索引，恢复旧的单列索引"""
+    v2 = next(m for m in MIGRATIONS if m.version == 2)
+    with db.get_connection() as conn:
+        for step in v2.steps:
+            if isinstance(step, CreateIndex):
+                conn.execute(f'DROP INDEX IF EXISTS {step.name}')
+        for sql in LEGACY_INDEXES:
+            conn.execute(sql)
+        conn.execute('ANALYZE')
+
+
+def use_v2_indexes(db: TestDatabase) -> None:
+    """重新执行迁移 v2 的步骤"""
+    runner = MigrationRunner(db.get_connection, pause_seconds=0)
+    conn = runner.open_connection()
+    try:
+        for step in next(m for m in MIGRATIONS if m.version == 2).steps:
+            step.apply(conn, runner)
+        conn.execute('ANALYZE')
+    finally:
+        conn.close()
+
+
+# 热点查询：与 TestDatabase 中的查询语句一致，参数由随机数生成
+HOT_QUERIES = {
+    '模块用例列表 (module_id + created_at DESC)': ('''
+        SELECT tc.*, m.name as module_name FROM test_cases tc
+        JOIN test_modules m ON tc.module_id = m.id
+        WHERE tc.module_id = ? ORDER BY tc.created_at DESC
+    ''', 'module'),
+    '模块未通过用例 (部分索引)': ('''
+        SELECT tc.*, m.name as module_name FROM test_cases tc
+        JOIN test_modules m ON tc.module_id = m.id
+        WHERE tc.module_id = ? AND tc.status != 'passed' ORDER BY tc.created_at DESC
+    ''', 'module'),
+    '全部用例列表 (created_at DESC)': ('''
+        SELECT tc.*, m.name as module_name FROM test_cases tc
+        JOIN test_modules m ON tc.module_id = m.id
+        ORDER BY tc.created_at DESC
+    ''', None),
+    '用例步骤 (test_case_id + step_number)': (
+        'SELECT * FROM test_steps WHERE test_case_id = ? ORDER BY step_number', 'case'),
+    '执行历史 (test_case_id + executed_at DESC)': (
+        'SELECT * FROM test_results WHERE test_case_id = ? ORDER BY executed_at DESC', 'case'),
+}
+
+
+def measure(db_path: str, case_count: int, repeat: int, page_size: int = 0) -> Dict[str, float]:
+    """
+    每个查询执行 repeat 次，返回平均耗时（毫秒）
+    直接在原始连接上执行SQL，排除字典转换的开销；page_size > 0 时只取第一页
+    """
+    rng = random.Random(7)
+    conn = sqlite3.connect(db_path)
+    timings = {}
+    try:
+        for name, (sql, param_kind) in HOT_QUERIES.items():
+            def params() -> tuple:
+                if param_kind == 'module':
+                    return (rng.randint(1, MODULE_COUNT),)
+                if param_kind == 'case':
+                    return (rng.randint(1, case_count),)
+                return ()
+
+            def run() -> None:
+                cursor = conn.execute(sql, params())
+                cursor.fetchmany(page_size) if page_size else cursor.fetchall()
+
+            run()  # 预热
+            started = time.perf_counter()
+            for _ in range(repeat):
+                run()
+            timings[name] = (time.perf_counter() - started) * 1000 / repeat
+    finally:
+        conn.close()
+    return timings
+
+
+def run_benchmark(case_count: int = 50000, repeat: int = 50,
+                  page_size: int = 50) -> List[Dict[str, Any]]:
+    """执行基准测试，返回每个查询优化前后的平均耗时（完整结果和第一页）"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'benchmark.db')
+        db = TestDatabase(db_path)
+        print(f"📦 生成数据: {case_count} 个用例 / {case_count * 5} 个步骤 / {case_count * 3} 条结果")
+        populate(db, case_count)
+
+        use_legacy_indexes(db)
+        before = measure(db_path, case_count, repeat)
+        before_page = measure(db_path, case_count, repeat, page_size)
+
+        use_v2_indexes(db)
+        after = measure(db_path, case_count, repeat)
+        after_page = measure(db_path, case_count, repeat, page_size)
+
+    return [
+        {'query': name,
+         'before_ms': before[name], 'after_ms': after[name],
+         'before_page_ms': before_page[name], 'after_page_ms': after_page[name]}
+        for name in HOT_QUERIES
+    ]
+
+
+if __name__ == '__main__':
+    case_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    results = run_benchmark(case_count, repeat)
+
+    def speedup(before: float, after: float) -> str:
+        return f"{before / after:.1f}x" if after else "-"
+
+    print("=" * 96)
+    print("查询 | 完整结果: 单列索引 -> 复合索引 | 第一页(50行): 单列索引 -> 复合索引")
+    print("-" * 96)
+    for item in results:
+        print(f"{item['query']}")
+        print(f"    完整结果 {item['before_ms']:8.2f}ms -> {item['after_ms']:8.2f}ms "
+              f"({speedup(item['before_ms'], item['after_ms'])})   "
+              f"第一页 {item['before_page_ms']:8.2f}ms -> {item['after_page_ms']:8.2f}ms "
+              f"({speedup(item['before_page_ms'], item['after_page_ms'])})")
+    print("=" * 96)
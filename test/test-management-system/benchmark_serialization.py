@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+JSON 序列化基准测试
+对大规模测试用例列表比较 Flask jsonify、标准库紧凑输出和 orjson（如已安装）的序列化耗时
+
+用法:
+    python benchmark_serialization.py [用例数量] [重复次数]
+"""
+
+import sys
+import time
+import random
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Callable
+
+from flask import Flask, jsonify
+
+from serialization import available_backends
+
+
+def build_payload(case_count: int) -> Dict[str, Any]:
+    """生成与 /api/test-cases 响应结构一致的数据，每个用例 5 个中文步骤"""
+    rng = random.Random(42)
+    base = datetime(2024, 1, 1)
+    cases = []
+    for i in range(1, case_count + 1):
+        created = (base + timedelta(minutes=rng.randint(0, 500000))).strftime('%Y-%m-%d %H:%M:%S')
+        cases.append({
+            'id': i,
+            'title': f'验证用户登录功能在异常网络环境下的表现 #{i}',
+            'description': '检查登录页面在弱网、断网重连等场景下的提示信息和重试逻辑',
+            'module_id': rng.randint(1, 20),
+            'module_name': f'模块{rng.randint(1, 20)}',
+            'priority': rng.choice(['low', 'medium', 'high', 'urgent']),
+            'status': rng.choice(['passed', 'failed', 'pending']),
+            'estimated_time': '10分钟',
+            'expected_result': '页面给出明确提示，恢复网络后可以正常登录',
+            'actual_result': '',
+            'executed_by': '手动测试',
+            'version': 1,
+            'created_at': created,
+            'updated_at': created,
+            'steps': [f'第{step}步：执行操作并观察页面响应' for step in range(1, 6)],
+        })
+    return {
+        'success': True,
+        'data': cases,
+        'message': '操作成功',
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def measure(serialize: Callable[[Any], bytes], payload: Any, repeat: int) -> Dict[str, float]:
+    """返回平均耗时（毫秒）和输出大小（字节）"""
+    size = len(serialize(payload))  # 预热
+    started = time.perf_counter()
+    for _ in range(repeat):
+        serialize(payload)
+    return {'ms': (time.perf_counter() - started) * 1000 / repeat, 'bytes': size}
+
+
+def run_benchmark(case_count: int = 10000, repeat: int = 20) -> List[Dict[str, Any]]:
+    """对每个序列化方式执行基准测试"""
+    payload = build_payload(case_count)
+    app = Flask(__name__)
+
+    def flask_jsonify(obj: Any) -> bytes:
+        with app.app_context():
+            return jsonify(obj).get_data()
+
+    candidates = {'flask jsonify (改造前)': flask_jsonify}
+    candidates.update(available_backends())
+
+    return [
+        {'backend': name, **measure(serialize, payload, repeat)}
+        for name, serialize in candidates.items()
+    ]
+
+
+if __name__ == '__main__':
+    case_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    print(f"📦 序列化 {case_count} 个测试用例，重复 {repeat} 次")
+    results = run_benchmark(case_count, repeat)
+    baseline = results[0]['ms']
+
+    print("=" * 64)
+    print(f"{'后端':<24}{'平均耗时':>12}{'输出大小':>14}{'加速':>10}")
+    print("-" * 64)
+    for item in results:
+        print(f"{item['backend']:<24}{item['ms']:>10.2f}ms{item['bytes'] / 1024:>12.0f}KB"
+              f"{baseline / item['ms']:>9.1f}x")
+    print("=" * 64)
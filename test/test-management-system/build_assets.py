@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+静态资源构建
+把 js/ 和 css/ 下的文件按内容哈希重命名（app.js -> app.3f2a9c1d0b.js）复制到输出目录，
+并改写 index.html 中的引用。文件内容不变 URL 就不变，浏览器可以长期缓存；
+index.html 本身不缓存内容，每次通过 ETag 重新验证
+
+用法:
+    python build_assets.py [输出目录]    # 默认读取配置 static.dist_dir（dist）
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import hashlib
+from typing import Dict
+
+from config import get_config
+from compression import STATIC_DIRECTORIES, precompress_directory
+
+HASH_LENGTH = 10
+
+# 带内容哈希的文件名，如 app.3f2a9c1d0b.js（及其预压缩文件 app.3f2a9c1d0b.js.gz）
+FINGERPRINT_PATTERN = re.compile(r'\.[0-9a-f]{%d}\.(?:js|css)(?:\.gz|\.br)?$' % HASH_LENGTH)
+
+# 带哈希的资源内容永不改变
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# index.html 等入口文件每次都向服务器验证
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+MANIFEST_FILE = 'asset-manifest.json'
+
+
+def is_fingerprinted(path: str) -> bool:
+    """路径是否为带内容哈希的资源"""
+    return bool(FINGERPRINT_PATTERN.search(path))
+
+
+def cache_control_for(path: str) -> str:
+    """根据路径返回 Cache-Control 响应头"""
+    return IMMUTABLE_CACHE_CONTROL if is_fingerprinted(path) else REVALIDATE_CACHE_CONTROL
+
+
+def fingerprint(path: str) -> str:
+    """计算文件内容哈希"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:HASH_LENGTH]
+
+
+def build(source_dir: str, output_dir: str) -> Dict[str, str]:
+    """
+    构建带哈希的静态资源
+
+    Args:
+        source_dir: 源目录（包含 index.html、js/、css/）
+        output_dir: 输出目录，构建前会清空
+
+    Returns:
+        原始路径 -> 带哈希路径 的映射
+    """
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+
+    manifest = {}
+    for directory in STATIC_DIRECTORIES:
+        source = os.path.join(source_dir, directory)
+        if not os.path.isdir(source):
+            continue
+        os.makedirs(os.path.join(output_dir, directory))
+        for name in sorted(os.listdir(source)):
+            stem, ext = os.path.splitext(name)
+            if ext not in ('.js', '.css'):
+                continue
+            hashed_name = f'{stem}.{fingerprint(os.path.join(source, name))}{ext}'
+            shutil.copy2(os.path.join(source, name), os.path.join(output_dir, directory, hashed_name))
+            manifest[f'{directory}/{name}'] = f'{directory}/{hashed_name}'
+
+    with open(os.path.join(source_dir, 'index.html'), encoding='utf-8') as f:
+        html = f.read()
+    # 改写 src="js/app.js" / href="css/styles.css" 形式的引用
+    html = re.sub(
+        r'((?:src|href)=")([^"?#]+)(")',
+        lambda m: m.group(1) + manifest.get(m.group(2), m.group(2)) + m.group(3),
+        html
+    )
+    # 资源版本号供 cacheManager.js 使用，代替每次加载都变化的时间戳
+    version = hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()[:HASH_LENGTH]
+    html = html.replace('<head>', f'<head>\n    <meta name="asset-version" content="{version}">', 1)
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(html)
+
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    for directory in STATIC_DIRECTORIES:
+        if os.path.isdir(os.path.join(output_dir, directory)):
+            precompress_directory(os.path.join(output_dir, directory))
+    return manifest
+
+
+if __name__ == '__main__':
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else get_config('static.dist_dir', 'dist')
+    if not os.path.isabs(output_dir):
+        output_dir = os.path.join(base_dir, output_dir)
+
+    print(f"📦 构建静态资源 -> {output_dir}")
+    manifest = build(base_dir, output_dir)
+    for original, hashed in manifest.items():
+        print(f"   {original} -> {hashed}")
+    print(f"✅ 完成，共 {len(manifest)} 个资源；设置 STATIC_MODE=dist 后服务器将使用构建结果")
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+内存中的测试用例目录索引
+API 进程启动时把模块和测试用例的目录字段（标题、状态、优先级、时间）加载为 __slots__ 记录，
+列表摘要（GET /api/test-cases?view=summary）的筛选、计数、排序和统计接口直接在内存中计算，不访问 SQLite
+
+索引通过 change_log 增量同步（与 GET /api/changes 相同的变更日志）：
+    - TestDatabase 的写操作发布事件后立即同步，写入后的查询能读到最新数据
+    - 后台线程按 database.catalog_index_sync_interval 同步，导入脚本等其他进程的写入也会反映到索引
+    - 数据库被替换（快照恢复，reset 事件）或变更日志版本回退时重新加载全部数据
+"""
+
+import json
+import time
+import logging
+import sqlite3
+import threading
+from typing import List, Dict, Optional, Any, Tuple, Iterable
+
+from database import TestDatabase
+
+logger = logging.getLogger(__name__)
+
+# 排序用的优先级顺序（数值越小越紧急）
+PRIORITY_RANK = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+# 可排序的字段
+SORT_FIELDS = ('created_at', 'updated_at', 'title', 'priority', 'status', 'id')
+
+# 统计接口中单独计数的状态
+STATUSES = ('passed', 'failed', 'pending', 'blocked', 'skipped')
+
+
+class ModuleRecord:
+    __slots__ = ('id', 'name', 'color', 'icon', 'sort_order')
+
+    def __init__(self, id: int, name: str, color: Optional[str], icon: Optional[str], sort_order: int):
+        self.id = id
+        self.name = name
+        self.color = color
+        self.icon = icon
+        self.sort_order = sort_order
+
+
+class CaseRecord:
+    __slots__ = ('id', 'module_id', 'title', 'status', 'priority', 'created_at', 'updated_at')
+
+    def __init__(self, id: int, module_id: int, title: str, status: Optional[str],
+                 priority: Optional[str], created_at: Optional[str], updated_at: Optional[str]):
+        self.id = id
+        self.module_id = module_id
+        self.title = title
+        self.status = status
+        self.priority = priority
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_row(cls, row: Any) -> 'CaseRecord':
+        return cls(row['id'], row['module_id'], row['title'], row['status'], row['priority'],
+                   row['created_at'], row['updated_at'])
+
+    def to_dict(self, module_name: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'module_id': self.module_id,
+            'module_name': module_name,
+            'title': self.title,
+            'status': self.status,
+            'priority': self.priority,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+
+def sort_key(field: str):
+    """排序字段对应的 key 函数（时间为 ISO 字符串或 SQLite 时间戳，按字符串比较即按时间顺序）"""
+    if field == 'priority':
+        return lambda record: PRIORITY_RANK.get(record.priority, len(PRIORITY_RANK))
+    if field == 'id':
+        return lambda record: record.id
+    return lambda record: getattr(record, field) or ''
+
+
+def select_cases(records: Iterable[CaseRecord], module_id: Optional[int] = None,
+                 exclude_passed: bool = False, status: Optional[str] = None,
+                 priority: Optional[str] = None, search: Optional[str] = None,
+                 sort: str = 'created_at', descending: bool = True,
+                 offset: int = 0, limit: Optional[int] = None) -> Tuple[int, List[CaseRecord]]:
+    """
+    筛选、排序和分页
+
+    Args:
+        records: 测试用例记录
+        module_id / status / priority: 等值筛选
+        exclude_passed: 只返回未通过的测试用例
+        search: 标题包含的文本（不区分大小写）
+        sort / descending: 排序字段和方向
+        offset / limit: 分页，limit 为 None 时返回全部，为 0 时只计数
+
+    Returns:
+        (符合条件的总数, 当前页的记录)
+    """
+    if sort not in SORT_FIELDS:
+        raise ValueError(f"不支持的排序字段: {sort}（可选: {', '.join(SORT_FIELDS)}）")
+    needle = search.casefold() if search else None
+    matched = [
+        record for record in records
+        if (not module_id or record.module_id == module_id)
+        and (not exclude_passed or record.status != 'passed')
+        and (not status or record.status == status)
+        and (not priority or record.priority == priority)
+        and (needle is None or needle in record.title.casefold())
+    ]
+    if limit == 0:
+        return len(matched), []
+    matched.sort(key=sort_key(sort), reverse=descending)
+    end = None if limit is None else offset + limit
+    return len(matched), matched[offset:end]
+
+
+class CatalogIndex:
+    """模块和测试用例目录字段的内存索引（线程安全）"""
+
+    def __init__(self, db: TestDatabase, sync_interval: Optional[float] = 5.0):
+        """
+        Args:
+            db: 数据库（订阅其事件并通过变更日志同步）
+            sync_interval: 后台同步间隔（秒），None 表示只在本进程写入后同步
+        """
+        self.db = db
+        self.sync_interval = sync_interval
+        self.modules: Dict[int, ModuleRecord] = {}
+        self.cases: Dict[int, CaseRecord] = {}
+        # 已同步到的 change_log 版本
+        self.version = 0
+        self.loaded_at: Optional[float] = None
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'CatalogIndex':
+        """加载全部数据，订阅写操作事件并启动后台同步"""
+        self.load()
+        self.db.events.subscribe(self._on_event)
+        if self.sync_interval:
+            self._thread = threading.Thread(target=self._run, name='catalog-index', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self.db.events.unsubscribe(self._on_event)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _connection(self) -> sqlite3.Connection:
+        # 同步不计入读写活动，不影响维护任务的空闲判断
+        return self.db.get_connection(background=True)
+
+    def load(self) -> None:
+        """从数据库重新加载全部模块和测试用例"""
+        started = time.perf_counter()
+        with self._lock, self._connection() as conn:
+            # 先读取版本号：之后提交的变更会在下次同步时重复应用，不会遗漏
+            version = conn.execute('SELECT COALESCE(MAX(version), 0) FROM change_log').fetchone()[0]
+            self.modules = {
+                row['id']: ModuleRecord(row['id'], row['name'], row['color'], row['icon'], row['sort_order'])
+                for row in conn.execute('SELECT id, name, color, icon, sort_order FROM test_modules')
+            }
+            self.cases = {
+                row['id']: CaseRecord.from_row(row)
+                for row in conn.execute('''
+                    SELECT id, module_id, title, status, priority, created_at, updated_at
+                    FROM test_cases
+                ''')
+            }
+            self.version = version
+            self.loaded_at = time.time()
+        logger.info("目录索引已加载: %d 个模块，%d 个测试用例（%.0fms）",
+                    len(self.modules), len(self.cases), (time.perf_counter() - started) * 1000)
+
+    def sync(self) -> int:
+        """
+        应用 change_log 中比已同步版本新的变更
+
+        Returns:
+            应用的变更条数
+        """
+        with self._lock, self._connection() as conn:
+            latest = conn.execute('SELECT COALESCE(MAX(version), 0) FROM change_log').fetchone()[0]
+            if latest == self.version:
+                return 0
+            if latest < self.version:
+                # 数据库已被替换为更早的版本
+                self.load()
+                return 0
+
+            rows = conn.execute('''
+                SELECT table_name, row_id, operation FROM change_log
+                WHERE version > ? AND table_name IN ('test_modules', 'test_cases')
+            ''', (self.version,)).fetchall()
+            upserts: Dict[str, List[int]] = {'test_modules': [], 'test_cases': []}
+            for row in rows:
+                if row['operation'] == 'upsert':
+                    upserts[row['table_name']].append(row['row_id'])
+                elif row['table_name'] == 'test_modules':
+                    self.modules.pop(row['row_id'], None)
+                else:
+                    self.cases.pop(row['row_id'], None)
+
+            for row in conn.execute('''
+                SELECT id, name, color, icon, sort_order FROM test_modules
+                WHERE id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps(upserts['test_modules']),)):
+                self.modules[row['id']] = ModuleRecord(row['id'], row['name'], row['color'],
+                                                       row['icon'], row['sort_order'])
+            for row in conn.execute('''
+                SELECT id, module_id, title, status, priority, created_at, updated_at
+                FROM test_cases
+                WHERE id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps(upserts['test_cases']),)):
+                self.cases[row['id']] = CaseRecord.from_row(row)
+            self.version = latest
+            return len(rows)
+
+    def _on_event(self, event: Dict[str, Any]) -> None:
+        if event['type'] == 'statistics.changed':
+            return
+        try:
+            if event['type'] == 'reset':
+                self.load()
+            else:
+                self.sync()
+        except sqlite3.Error as e:
+            # 下次后台同步时重试
+            logger.warning("目录索引同步失败: %s", e)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.sync_interval):
+            try:
+                self.sync()
+            except Exception as e:
+                logger.error("目录索引同步失败: %s", e)
+
+    def query(self, **filters: Any) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        测试用例摘要的筛选、计数和排序（参数见 select_cases）
+
+        Returns:
+            (符合条件的总数, 当前页的测试用例摘要)
+        """
+        with self._lock:
+            total, records = select_cases(list(self.cases.values()), **filters)
+            return total, [
+                record.to_dict(self.modules[record.module_id].name if record.module_id in self.modules else None)
+                for record in records
+            ]
+
+    def statistics(self) -> Dict[str, Any]:
+        """与 TestDatabase.get_statistics 相同结构的统计数据"""
+        with self._lock:
+            overall = {'total_cases': 0, **{f'{status}_cases': 0 for status in STATUSES}}
+            by_module = {
+                module_id: {'total_cases': 0, 'passed_cases': 0, 'failed_cases': 0, 'pending_cases': 0}
+                for module_id in self.modules
+            }
+            for record in self.cases.values():
+                overall['total_cases'] += 1
+                key = f'{record.status}_cases'
+                if key in overall:
+                    overall[key] += 1
+                counts = by_module.get(record.module_id)
+                if counts is not None:
+                    counts['total_cases'] += 1
+                    if key in counts:
+                        counts[key] += 1
+            modules = sorted(self.modules.values(), key=lambda module: module.name)
+            return {
+                'overall': overall,
+                'by_module': [
+                    {'module_name': module.name, 'module_color': module.color, **by_module[module.id]}
+                    for module in modules
+                ]
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """索引状态（/api/health）"""
+        with self._lock:
+            return {
+                'modules': len(self.modules),
+                'test_cases': len(self.cases),
+                'version': self.version
+            }
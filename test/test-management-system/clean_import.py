@@ -6,12 +6,18 @@
 
 import sqlite3
 import os
-import re
+import sys
 import time
 from datetime import datetime
 
+from js_catalog import iter_test_cases, step_texts, text_field
+from backup import BackupManager
+from snapshots import SnapshotStore, restore_snapshot
+
 def completely_reset_database():
     """完全重置数据库"""
+    # 清空前先备份，可用 python backup.py restore <备份文件> 恢复
+    BackupManager.from_config('test_management.db').create_backup('pre-reset')
     conn = sqlite3.connect('test_management.db', timeout=30.0)
     cursor = conn.cursor()
     
@@ -73,36 +79,11 @@ def parse_js_file(file_path):
         return []
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 提取测试用例数组
-        array_pattern = r'const\s+(\w+TestCases)\s*=\s*\[(.*?)\];'
-        match = re.search(array_pattern, content, re.DOTALL)
-        
-        if not match:
-            return []
-        
-        # 提取每个测试用例对象
-        case_pattern = r'\{([^{}]*(?:\{[^{}]*\}[^{}]*)*)\}'
-        cases = re.findall(case_pattern, match.group(2))
+        # 逐个读取解析后的测试用例（js_catalog 解析缓存，文件未变化时不再解析）
+        cases = iter_test_cases(file_path)
         
         test_cases = []
-        for i, case_str in enumerate(cases):
-            # 提取基本信息
-            name_match = re.search(r'name:\s*[\'"]([^\'"]*)[\'"]', case_str)
-            desc_match = re.search(r'description:\s*[\'"]([^\'"]*)[\'"]', case_str)
-            priority_match = re.search(r'priority:\s*[\'"]([^\'"]*)[\'"]', case_str)
-            status_match = re.search(r'status:\s*[\'"]([^\'"]*)[\'"]', case_str)
-            expected_match = re.search(r'expectedResult:\s*[\'"]([^\'"]*)[\'"]', case_str)
-            
-            # 提取测试步骤
-            steps_match = re.search(r'testSteps:\s*\[(.*?)\]', case_str, re.DOTALL)
-            steps = []
-            if steps_match:
-                step_matches = re.findall(r'[\'"]([^\'"]*)[\'"]', steps_match.group(1))
-                steps = step_matches
-            
+        for i, case in enumerate(cases):
             # 状态值映射
             status_mapping = {
                 'completed': 'passed',
@@ -111,7 +92,7 @@ def parse_js_file(file_path):
                 'inactive': 'skipped'
             }
             
-            original_status = status_match.group(1) if status_match else 'pending'
+            original_status = text_field(case, 'status', 'pending')
             mapped_status = status_mapping.get(original_status, original_status)
             
             valid_statuses = ['pending', 'passed', 'failed', 'blocked', 'skipped']
@@ -119,12 +100,12 @@ def parse_js_file(file_path):
                 mapped_status = 'pending'
             
             test_case = {
-                'name': name_match.group(1) if name_match else f'测试用例{i+1}',
-                'description': desc_match.group(1) if desc_match else '',
-                'priority': priority_match.group(1) if priority_match else 'medium',
+                'name': text_field(case, 'name', f'测试用例{i+1}'),
+                'description': text_field(case, 'description'),
+                'priority': text_field(case, 'priority', 'medium'),
                 'status': mapped_status,
-                'expected_result': expected_match.group(1) if expected_match else '',
-                'steps': steps
+                'expected_result': text_field(case, 'expectedResult'),
+                'steps': step_texts(case.get('testSteps'))
             }
             
             test_cases.append(test_case)
@@ -187,11 +168,18 @@ def import_test_cases(test_cases, module_id):
     conn.close()
     return imported_count
 
-def main():
+def main(snapshot=None):
     print("============================================================")
     print("🚀 完全重置并导入测试用例数据")
     print("============================================================")
     
+    # 已有快照时直接恢复（替换数据库文件），不再清空后重新解析和导入
+    store = SnapshotStore.from_config('test_management.db')
+    if snapshot and store.exists(snapshot):
+        info = restore_snapshot(snapshot, store)
+        print(f"📸 已从快照 {snapshot} 恢复，耗时 {info['duration_ms']:.0f}ms")
+        return True
+    
     # 1. 完全重置数据库
     if not completely_reset_database():
         print("❌ 数据库重置失败，退出")
@@ -284,9 +272,21 @@ def main():
     conn.close()
     print(f"============================================================")
     
+    if snapshot:
+        store.save(snapshot)
+        print(f"📸 已保存快照 {snapshot}，下次运行时直接恢复")
+    
     return True
 
 if __name__ == "__main__":
-    success = main()
+    # --snapshot <名称>: 有快照时直接恢复，没有时完整导入后保存为快照
+    snapshot = None
+    if '--snapshot' in sys.argv:
+        index = sys.argv.index('--snapshot')
+        if index + 1 >= len(sys.argv):
+            print("❌ 错误: --snapshot 需要指定快照名称")
+            sys.exit(1)
+        snapshot = sys.argv[index + 1]
+    success = main(snapshot)
     if not success:
         exit(1)
\ No newline at end of file
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+响应压缩
+- API 的 JSON 响应按 Accept-Encoding 协商后动态压缩（br 优先，其次 gzip）
+- js/ 和 css/ 下的静态资源预先压缩为 .br / .gz 文件，请求时直接发送压缩文件
+
+brotli 为可选依赖，未安装时只使用 gzip
+
+用法:
+    python compression.py [目录...]    # 预压缩静态资源，默认 js css
+"""
+
+import os
+import sys
+import gzip
+from typing import List, Optional, Tuple
+
+from config import get_config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 预压缩的静态资源目录和文件类型
+STATIC_DIRECTORIES = ('js', 'css')
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.html', '.json', '.svg')
+
+# 压缩编码 -> 预压缩文件后缀，按优先级排列
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')] if brotli else [('gzip', '.gz')]
+
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """解析 Accept-Encoding 请求头，返回客户端接受的编码（忽略 q=0）"""
+    accepted = []
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.append(name)
+    return accepted
+
+
+def accepts(encoding: str, accepted: List[str]) -> bool:
+    """客户端是否接受该编码（* 表示接受任意编码）"""
+    return encoding in accepted or '*' in accepted
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """选择服务器支持且客户端接受的压缩编码"""
+    accepted = accepted_encodings(accept_encoding or '')
+    for encoding, _ in ENCODINGS:
+        if accepts(encoding, accepted):
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    压缩数据
+
+    Args:
+        data: 原始数据
+        encoding: br 或 gzip
+        level: 压缩级别，默认读取配置 compression.gzip_level / compression.brotli_quality
+    """
+    if encoding == 'br':
+        quality = level if level is not None else get_config('compression.brotli_quality', 5)
+        return brotli.compress(data, quality=quality)
+    if encoding == 'gzip':
+        level = level if level is not None else get_config('compression.gzip_level', 6)
+        # 固定 mtime，相同内容得到相同的压缩结果
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    raise ValueError(f"不支持的压缩编码: {encoding}")
+
+
+def precompressed_variant(path: str, accept_encoding: str) -> Optional[Tuple[str, str]]:
+    """
+    查找可以直接发送的预压缩文件
+
+    Args:
+        path: 原始文件路径
+        accept_encoding: 请求的 Accept-Encoding
+
+    Returns:
+        (预压缩文件路径, 编码)，没有可用的最新预压缩文件时返回 None
+    """
+    accepted = accepted_encodings(accept_encoding or '')
+    try:
+        source_mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    for encoding, suffix in ENCODINGS:
+        if not accepts(encoding, accepted):
+            continue
+        variant = path + suffix
+        try:
+            # 源文件修改后预压缩文件已过期，回退到原始文件
+            if os.stat(variant).st_mtime >= source_mtime:
+                return variant, encoding
+        except OSError:
+            continue
+    return None
+
+
+def precompress_directory(directory: str) -> List[Tuple[str, int, int]]:
+    """
+    为目录下的静态资源生成预压缩文件（使用最高压缩级别）
+
+    Returns:
+        [(文件路径, 原始大小, 压缩后大小)]
+    """
+    results = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            for encoding, suffix in ENCODINGS:
+                compressed = compress(data, encoding, 11 if encoding == 'br' else 9)
+                # 压缩收益太小的文件不生成预压缩版本
+                if len(compressed) >= len(data):
+                    continue
+                with open(path + suffix, 'wb') as f:
+                    f.write(compressed)
+                results.append((path + suffix, len(data), len(compressed)))
+    return results
+
+
+if __name__ == '__main__':
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    directories = sys.argv[1:] or [os.path.join(base_dir, name) for name in STATIC_DIRECTORIES]
+
+    print(f"🗜️ 预压缩静态资源，编码: {', '.join(encoding for encoding, _ in ENCODINGS)}")
+    if not brotli:
+        print("   （未安装 brotli，只生成 .gz 文件: pip3 install brotli）")
+    total_before = total_after = 0
+    for directory in directories:
+        for path, before, after in precompress_directory(directory):
+            total_before += before
+            total_after += after
+            print(f"   {os.path.relpath(path, base_dir)}: {before / 1024:.1f}KB -> {after / 1024:.1f}KB")
+    if total_before:
+        print(f"✅ 完成，压缩率 {total_after / total_before * 100:.1f}%")
+    else:
+        print("⚠️ 没有需要压缩的文件")
@@ -25,14 +25,68 @@ class Config:
                 'host': 'localhost',
                 'port': 8000,
                 'protocol': 'http',
-                'base_path': '/api'
+                'base_path': '/api',
+                'json_backend': 'auto',  # auto / orjson / stdlib，见 serialization.py
+                'statistics_backend': 'auto'  # auto / numpy / array，见 statistics_engine.py
             },
             
             # 数据库配置
             'database': {
                 'path': 'test_management.db',
                 'backup_enabled': True,
-                'backup_interval': 3600  # 1小时
+                'backup_interval': 3600,  # 1小时
+                'backup_dir': 'backups',
+                'backup_keep': 24,  # 保留的备份数量，0 表示不删除
+                'backup_compress': True,
+                'backup_pages_per_step': 256,  # 备份 API 每一步复制的页数
+                'snapshot_dir': 'snapshots',  # 命名快照（python snapshots.py）
+                'slow_query_log': True,
+                'slow_query_threshold_ms': 100,
+                'write_queue': True,  # API服务器通过单写线程组提交写操作
+                'json_responses': True,  # 列表/详情接口由 SQLite JSON1 直接生成响应
+                'read_only_connections': True,  # API 查询使用只读连接（mode=ro + query_only）
+                'analytics_snapshot': False,  # 统计接口查询定期刷新的数据库副本，不访问主库
+                'analytics_snapshot_interval': 60,  # 副本刷新间隔（秒）
+                'catalog_index': False,  # API 进程在内存中维护目录索引（catalog_index.py）
+                'catalog_index_sync_interval': 5  # 同步其他进程写入的间隔（秒）
+            },
+            
+            # 数据库维护（API服务器空闲时执行，见 maintenance.py）
+            'maintenance': {
+                'enabled': True,
+                'idle_seconds': 30,  # 距离上次读写超过该时间视为空闲
+                'check_interval': 60,
+                'analyze_interval': 86400,  # ANALYZE
+                'optimize_interval': 3600,  # PRAGMA optimize
+                'vacuum_interval': 3600,  # PRAGMA incremental_vacuum
+                'vacuum_min_free_pages': 256,  # 空闲页少于该数量时不回收
+                'vacuum_pages': 2000,  # 每次最多回收的页数
+                'checkpoint_interval': 300  # PRAGMA wal_checkpoint(TRUNCATE)
+            },
+            
+            # 服务模式配置
+            'server': {
+                'mode': 'wsgi',  # wsgi: Flask 内置服务器; asgi: 异步模式（python asgi.py）
+                'db_workers': 4,
+                'analytics_workers': 2,
+                'max_pending': 256
+            },
+            
+            # 静态资源配置
+            'static': {
+                'mode': 'source',  # source: 源文件; dist: build_assets.py 生成的带哈希资源
+                'dist_dir': 'dist',
+                'server': 'threaded',  # server.py: threaded 多线程; single 单线程
+                'sendfile': True,  # 使用 sendfile 零拷贝发送文件
+                'access_log': 'async'  # async: 后台线程输出; sync: 直接输出; off: 关闭
+            },
+            
+            # 响应压缩配置
+            'compression': {
+                'enabled': True,
+                'min_size': 1024,  # 小于该字节数的响应不压缩
+                'gzip_level': 6,
+                'brotli_quality': 5  # 需要安装 brotli
             },
             
             # 应用配置
@@ -47,7 +101,24 @@ class Config:
             'import_export': {
                 'batch_size': 100,
                 'timeout': 30,
-                'retry_count': 3
+                'retry_count': 3,
+                'parse_cache': True,  # 缓存 JS 测试用例文件的解析结果（js_catalog.py）
+                'parse_cache_dir': '.parse_cache',
+                'catalog_dir': 'testCases',  # JS 测试用例文件目录
+                # JS 文件名 -> 模块名称（测试用例自带 module 字段时以字段为准，未列出的文件使用文件名）
+                'catalog_modules': {
+                    'auth.js': '用户认证',
+                    'dashboard.js': '仪表板',
+                    'task.js': '任务管理',
+                    'category.js': '分类管理',
+                    'tag.js': '标签管理',
+                    'plan.js': '计划管理',
+                    'time.js': '时间记录',
+                    'log.js': '工作日志',
+                    'statistics.js': '统计分析',
+                    'report.js': '报告管理',
+                    'settings.js': '设置'
+                }
             }
         }
         
@@ -95,10 +166,82 @@ class Config:
             config['api']['protocol'] = os.getenv('API_PROTOCOL')
         if os.getenv('API_BASE_PATH'):
             config['api']['base_path'] = os.getenv('API_BASE_PATH')
+        if os.getenv('API_JSON_BACKEND'):
+            config['api']['json_backend'] = os.getenv('API_JSON_BACKEND')
+        if os.getenv('API_STATISTICS_BACKEND'):
+            config['api']['statistics_backend'] = os.getenv('API_STATISTICS_BACKEND')
         
         # 数据库配置
         if os.getenv('DB_PATH'):
             config['database']['path'] = os.getenv('DB_PATH')
+        if os.getenv('DB_BACKUP_ENABLED'):
+            config['database']['backup_enabled'] = os.getenv('DB_BACKUP_ENABLED').lower() == 'true'
+        if os.getenv('DB_BACKUP_INTERVAL'):
+            try:
+                config['database']['backup_interval'] = int(os.getenv('DB_BACKUP_INTERVAL'))
+            except ValueError:
+                pass
+        if os.getenv('DB_BACKUP_DIR'):
+            config['database']['backup_dir'] = os.getenv('DB_BACKUP_DIR')
+        if os.getenv('DB_BACKUP_KEEP'):
+            try:
+                config['database']['backup_keep'] = int(os.getenv('DB_BACKUP_KEEP'))
+            except ValueError:
+                pass
+        if os.getenv('DB_READ_ONLY_CONNECTIONS'):
+            config['database']['read_only_connections'] = os.getenv('DB_READ_ONLY_CONNECTIONS').lower() == 'true'
+        if os.getenv('DB_ANALYTICS_SNAPSHOT'):
+            config['database']['analytics_snapshot'] = os.getenv('DB_ANALYTICS_SNAPSHOT').lower() == 'true'
+        if os.getenv('DB_ANALYTICS_SNAPSHOT_INTERVAL'):
+            try:
+                config['database']['analytics_snapshot_interval'] = float(os.getenv('DB_ANALYTICS_SNAPSHOT_INTERVAL'))
+            except ValueError:
+                pass
+        if os.getenv('DB_CATALOG_INDEX'):
+            config['database']['catalog_index'] = os.getenv('DB_CATALOG_INDEX').lower() == 'true'
+        if os.getenv('DB_CATALOG_INDEX_SYNC_INTERVAL'):
+            try:
+                config['database']['catalog_index_sync_interval'] = float(os.getenv('DB_CATALOG_INDEX_SYNC_INTERVAL'))
+            except ValueError:
+                pass
+        if os.getenv('DB_SNAPSHOT_DIR'):
+            config['database']['snapshot_dir'] = os.getenv('DB_SNAPSHOT_DIR')
+        if os.getenv('DB_SLOW_QUERY_MS'):
+            try:
+                config['database']['slow_query_threshold_ms'] = float(os.getenv('DB_SLOW_QUERY_MS'))
+            except ValueError:
+                pass
+        
+        # 数据库维护配置
+        if os.getenv('MAINTENANCE_ENABLED'):
+            config['maintenance']['enabled'] = os.getenv('MAINTENANCE_ENABLED').lower() == 'true'
+        if os.getenv('MAINTENANCE_IDLE_SECONDS'):
+            try:
+                config['maintenance']['idle_seconds'] = float(os.getenv('MAINTENANCE_IDLE_SECONDS'))
+            except ValueError:
+                pass
+        
+        # 服务模式配置
+        if os.getenv('SERVER_MODE'):
+            config['server']['mode'] = os.getenv('SERVER_MODE')
+        
+        # 静态资源配置
+        if os.getenv('STATIC_MODE'):
+            config['static']['mode'] = os.getenv('STATIC_MODE')
+        if os.getenv('STATIC_SERVER'):
+            config['static']['server'] = os.getenv('STATIC_SERVER')
+        if os.getenv('STATIC_ACCESS_LOG'):
+            config['static']['access_log'] = os.getenv('STATIC_ACCESS_LOG')
+        
+        # 响应压缩配置
+        if os.getenv('COMPRESSION_ENABLED'):
+            config['compression']['enabled'] = os.getenv('COMPRESSION_ENABLED').lower() == 'true'
+        
+        # 导入/导出配置
+        if os.getenv('PARSE_CACHE_ENABLED'):
+            config['import_export']['parse_cache'] = os.getenv('PARSE_CACHE_ENABLED').lower() == 'true'
+        if os.getenv('CATALOG_DIR'):
+            config['import_export']['catalog_dir'] = os.getenv('CATALOG_DIR')
         
         # 应用配置
         if os.getenv('APP_DEBUG'):
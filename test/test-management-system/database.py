@@ -7,29 +7,454 @@
 import sqlite3
 import json
 import os
+import re
+import time
+import queue
+import logging
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Callable, Tuple
+from urllib.parse import quote
+
+from migrations import MigrationRunner
+from events import ChangeFeed
+
+logger = logging.getLogger(__name__)
+
+
+class SlowQueryLog:
+    """
+    慢查询日志
+    记录执行时间超过阈值的语句（参数、耗时、EXPLAIN QUERY PLAN），按归一化SQL聚合
+    """
+    
+    # 可以生成执行计划的语句类型
+    EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'WITH')
+    
+    def __init__(self, threshold_ms: float = 100.0, max_entries: int = 200):
+        """
+        Args:
+            threshold_ms: 慢查询阈值（毫秒），0 表示记录所有语句
+            max_entries: 最多保留的归一化语句条数
+        """
+        self.threshold_ms = threshold_ms
+        self.max_entries = max_entries
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def normalize_sql(sql: str) -> str:
+        """归一化SQL文本：字面量替换为占位符，IN列表折叠，空白压缩"""
+        sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+        sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+        sql = re.sub(r'\(\s*\?(?:\s*,\s*\?)+\s*\)', '(?, ...)', sql)
+        return re.sub(r'\s+', ' ', sql).strip()
+    
+    def record(self, sql: str, params: Any, duration_ms: float,
+               explain: Optional[Callable[[], List[str]]] = None) -> None:
+        """记录一次语句执行，未超过阈值时直接忽略"""
+        if duration_ms < self.threshold_ms:
+            return
+        
+        key = self.normalize_sql(sql)
+        with self._lock:
+            entry = self._entries.get(key)
+            is_new = entry is None
+            if is_new:
+                if len(self._entries) >= self.max_entries:
+                    oldest = min(self._entries, key=lambda k: self._entries[k]['last_seen'])
+                    del self._entries[oldest]
+                entry = self._entries[key] = {
+                    'sql': key,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'plan': []
+                }
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+            entry['last_ms'] = duration_ms
+            entry['last_params'] = self._format_params(params)
+            entry['last_seen'] = datetime.now().isoformat()
+        
+        # 执行计划只在首次出现时采集，避免重复开销
+        if is_new and explain is not None:
+            entry['plan'] = explain()
+        
+        logger.warning("慢查询 %.1fms: %s 参数=%s", duration_ms, key, entry['last_params'])
+    
+    @staticmethod
+    def _format_params(params: Any) -> Any:
+        """参数转换为可JSON序列化的形式，过长的文本截断"""
+        if isinstance(params, dict):
+            return {k: SlowQueryLog._format_value(v) for k, v in params.items()}
+        if isinstance(params, (list, tuple)):
+            return [SlowQueryLog._format_value(v) for v in params]
+        return params
+    
+    @staticmethod
+    def _format_value(value: Any) -> Any:
+        if isinstance(value, bytes):
+            return f'<{len(value)} bytes>'
+        if isinstance(value, str) and len(value) > 200:
+            return value[:200] + '...'
+        return value
+    
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """获取聚合后的慢查询列表，按总耗时降序"""
+        with self._lock:
+            entries = [dict(entry) for entry in self._entries.values()]
+        for entry in entries:
+            entry['avg_ms'] = round(entry['total_ms'] / entry['count'], 3)
+            entry['total_ms'] = round(entry['total_ms'], 3)
+            entry['max_ms'] = round(entry['max_ms'], 3)
+            entry['last_ms'] = round(entry['last_ms'], 3)
+        return sorted(entries, key=lambda e: e['total_ms'], reverse=True)
+    
+    def reset(self) -> None:
+        """清空慢查询日志"""
+        with self._lock:
+            self._entries.clear()
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """
+    带执行计时的数据库连接
+    注意：SELECT 的耗时只包含到第一行返回为止（排序、聚合已在此阶段完成）
+    """
+    
+    slow_query_log: Optional[SlowQueryLog] = None
+    
+    def execute(self, sql, parameters=(), /):
+        log = self.slow_query_log
+        if log is None:
+            return super().execute(sql, parameters)
+        
+        started = time.perf_counter()
+        cursor = super().execute(sql, parameters)
+        log.record(sql, parameters, (time.perf_counter() - started) * 1000,
+                   lambda: self.explain(sql, parameters))
+        return cursor
+    
+    def executemany(self, sql, seq_of_parameters, /):
+        log = self.slow_query_log
+        if log is None:
+            return super().executemany(sql, seq_of_parameters)
+        
+        started = time.perf_counter()
+        cursor = super().executemany(sql, seq_of_parameters)
+        log.record(sql, '<executemany>', (time.perf_counter() - started) * 1000)
+        return cursor
+    
+    def explain(self, sql: str, parameters: Any = ()) -> List[str]:
+        """获取语句的 EXPLAIN QUERY PLAN，按层级缩进"""
+        if not sql.lstrip().upper().startswith(SlowQueryLog.EXPLAINABLE):
+            return []
+        try:
+            rows = super().execute(f'EXPLAIN QUERY PLAN {sql}', parameters).fetchall()
+        except sqlite3.Error:
+            return []
+        
+        depth = {0: -1}
+        plan = []
+        for node_id, parent_id, _, detail in rows:
+            depth[node_id] = depth.get(parent_id, -1) + 1
+            plan.append('  ' * depth[node_id] + detail)
+        return plan
+
+
+WriteOperation = Callable[[sqlite3.Connection], Any]
+
+
+class WriteQueueClosedError(RuntimeError):
+    """写队列已关闭（数据库替换期间），写操作需要提交到新的写队列"""
+
+
+class WriteQueue:
+    """
+    单写线程队列
+    所有写操作提交到队列，由一个专用线程串行执行；队列中积压的多个写操作合并到同一个事务提交（组提交），
+    每个写操作在独立的 SAVEPOINT 中执行，单个操作失败只回滚它自己，不影响同批次的其他操作。
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, connect: Callable[[], sqlite3.Connection], max_batch: int = 64):
+        """
+        Args:
+            connect: 返回新数据库连接的函数（写线程独占该连接）
+            max_batch: 单个事务最多合并的写操作数
+        """
+        self.connect = connect
+        self.max_batch = max_batch
+        self.closed = False
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        # 保证关闭后不再有写操作排在停止标记之后
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+        self._thread.start()
+    
+    def submit(self, operation: WriteOperation) -> Future:
+        """
+        提交写操作
+        
+        Args:
+            operation: 接收数据库连接并执行写入的函数，其返回值作为 Future 的结果
+            
+        Returns:
+            写操作所在事务提交后完成的 Future
+            
+        Raises:
+            WriteQueueClosedError: 写队列已关闭
+        """
+        future: Future = Future()
+        with self._submit_lock:
+            if self.closed:
+                raise WriteQueueClosedError("写队列已关闭")
+            self._queue.put((operation, future))
+        return future
+    
+    def close(self, timeout: Optional[float] = None) -> None:
+        """处理完已提交的写操作后停止写线程，之后提交的写操作抛出 WriteQueueClosedError"""
+        with self._submit_lock:
+            self.closed = True
+            self._queue.put(self._STOP)
+        self._thread.join(timeout)
+    
+    def _run(self) -> None:
+        conn = self.connect()
+        conn.isolation_level = None  # 事务由写线程显式控制
+        conn.execute('PRAGMA journal_mode = WAL')  # 读不阻塞写，写不阻塞读
+        conn.execute('PRAGMA busy_timeout = 30000')  # 等待外部脚本等其他写入方
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._STOP:
+                    return
+                batch = [item]
+                stop = False
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is self._STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+                self._commit_batch(conn, batch)
+                if stop:
+                    return
+        finally:
+            conn.close()
+    
+    def _commit_batch(self, conn: sqlite3.Connection, batch: List[Any]) -> None:
+        """在一个事务中执行一批写操作，提交成功后再完成各自的 Future"""
+        results = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for operation, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute('SAVEPOINT write_op')
+                try:
+                    results.append((future, operation(conn), None))
+                    conn.execute('RELEASE write_op')
+                except Exception as e:
+                    conn.execute('ROLLBACK TO write_op')
+                    conn.execute('RELEASE write_op')
+                    results.append((future, None, e))
+            conn.execute('COMMIT')
+        except Exception as e:
+            # 提交失败时整个批次都未生效
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            for operation, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+class AnalyticsSnapshot:
+    """
+    统计分析用的数据库副本
+    按间隔通过备份 API 从主库复制到 <数据库>.analytics，以 immutable 只读方式打开，
+    统计查询不获取主库的任何锁；数据最多落后 interval 秒
+    """
+    
+    def __init__(self, connect: Callable[[], sqlite3.Connection], path: str, interval: float = 60.0):
+        """
+        Args:
+            connect: 返回主库连接的函数（复制时使用）
+            path: 副本文件路径
+            interval: 刷新间隔（秒）
+        """
+        self.connect = connect
+        self.path = path
+        self.interval = interval
+        self.refreshed_at: Optional[float] = None
+        self._refreshing = threading.Lock()
+    
+    def refresh(self) -> None:
+        """复制主库到临时文件后原子替换副本（已打开的副本连接继续读取旧文件）"""
+        with self._refreshing:
+            started = time.monotonic()
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix='.tmp')
+            os.close(fd)
+            try:
+                source = self.connect()
+                target = sqlite3.connect(temp_path)
+                try:
+                    # WAL 模式下一次性复制只持有读事务，不阻塞写入
+                    source.backup(target)
+                    target.execute('PRAGMA journal_mode = DELETE')
+                finally:
+                    target.close()
+                    source.close()
+                os.replace(temp_path, self.path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+            self.refreshed_at = started
+    
+    def invalidate(self) -> None:
+        """主库被替换（快照恢复）后，下次使用前同步刷新"""
+        self.refreshed_at = None
+    
+    def connection(self) -> sqlite3.Connection:
+        """打开副本；副本过期时在后台刷新，本次仍使用当前副本"""
+        if self.refreshed_at is None or not os.path.exists(self.path):
+            self.refresh()
+        elif time.monotonic() - self.refreshed_at >= self.interval and not self._refreshing.locked():
+            threading.Thread(target=self.refresh, name='analytics-refresh', daemon=True).start()
+        conn = sqlite3.connect(f'file:{quote(os.path.abspath(self.path))}?mode=ro&immutable=1',
+                               uri=True, factory=ProfiledConnection)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+
+# 允许通过 PATCH 局部更新的测试用例字段
+PATCHABLE_TEST_CASE_FIELDS = (
+    'title', 'description', 'module_id', 'priority', 'status',
+    'estimated_time', 'expected_result', 'actual_result', 'executed_by'
+)
+
+
+class VersionConflictError(Exception):
+    """测试用例已被其他请求修改（版本号不匹配）"""
+
+    def __init__(self, test_case_id: int, current_version: int):
+        super().__init__(f"测试用例 {test_case_id} 的当前版本为 {current_version}")
+        self.test_case_id = test_case_id
+        self.current_version = current_version
+
 
 class TestDatabase:
-    def __init__(self, db_path: str = "test_management.db"):
+    def __init__(self, db_path: str = "test_management.db",
+                 slow_query_threshold_ms: Optional[float] = None,
+                 write_queue: bool = False,
+                 read_only_connections: bool = False,
+                 analytics_snapshot_interval: Optional[float] = None):
         """
         初始化数据库连接
         
         Args:
             db_path: 数据库文件路径
+            slow_query_threshold_ms: 慢查询阈值（毫秒），None 表示不启用慢查询日志
+            write_queue: 是否通过单写线程队列执行写操作（适合多线程的API服务器）
+            read_only_connections: 查询方法使用只读连接（mode=ro + query_only），WAL 模式下读写互不阻塞
+            analytics_snapshot_interval: 统计查询使用按该间隔（秒）刷新的数据库副本，None 表示直接查询主库
         """
         self.db_path = db_path
+        # 替换数据库文件（快照恢复）期间清除，新的连接等待替换完成
+        self._available = threading.Event()
+        self._available.set()
+        # 最近一次读写的时间（time.monotonic），维护任务据此判断是否空闲
+        self.last_activity = time.monotonic()
+        self.slow_query_log = (
+            SlowQueryLog(slow_query_threshold_ms) if slow_query_threshold_ms is not None else None
+        )
         self.init_database()
+        self.write_queue = WriteQueue(self.get_connection) if write_queue else None
+        self.read_only_connections = read_only_connections
+        self.analytics_snapshot = (
+            AnalyticsSnapshot(lambda: self.get_connection(background=True),
+                              db_path + '.analytics', analytics_snapshot_interval)
+            if analytics_snapshot_interval is not None else None
+        )
+        self._json_columns: Dict[str, List[str]] = {}
+        # 写操作提交后发布的数据变更事件（GET /api/events）
+        self.events = ChangeFeed()
     
-    def get_connection(self) -> sqlite3.Connection:
-        """获取数据库连接"""
-        conn = sqlite3.connect(self.db_path)
+    def get_connection(self, background: bool = False) -> sqlite3.Connection:
+        """
+        获取数据库连接
+        
+        Args:
+            background: 后台任务（维护）使用的连接，不计入读写活动
+        """
+        self._available.wait()
+        if not background:
+            self.last_activity = time.monotonic()
+        return self._connect()
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, factory=ProfiledConnection)
+        conn.slow_query_log = self.slow_query_log
         conn.row_factory = sqlite3.Row  # 使结果可以通过列名访问
         return conn
     
+    def read_connection(self) -> sqlite3.Connection:
+        """
+        获取查询用的连接
+        启用只读连接时以 mode=ro 打开并设置 query_only，连接不会获取写锁；
+        无法以只读方式打开时（如 WAL 文件不可创建）退回普通连接
+        """
+        if not self.read_only_connections:
+            return self.get_connection()
+        self._available.wait()
+        self.last_activity = time.monotonic()
+        conn = None
+        try:
+            conn = sqlite3.connect(f'file:{quote(os.path.abspath(self.db_path))}?mode=ro',
+                                   uri=True, factory=ProfiledConnection)
+            # 打开连接时不访问 -wal/-shm 文件，执行一次读取确认 WAL 索引可用
+            conn.execute('SELECT 1 FROM sqlite_master LIMIT 1').fetchall()
+        except sqlite3.OperationalError:
+            if conn is not None:
+                conn.close()
+            conn = self._connect()
+        conn.slow_query_log = self.slow_query_log
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA query_only = ON')
+        return conn
+    
+    def analytics_connection(self) -> sqlite3.Connection:
+        """获取统计查询用的连接（启用时为定期刷新的数据库副本）"""
+        if self.analytics_snapshot is None:
+            return self.read_connection()
+        self._available.wait()
+        conn = self.analytics_snapshot.connection()
+        conn.slow_query_log = self.slow_query_log
+        return conn
+    
     def init_database(self):
         """初始化数据库表结构"""
         with self.get_connection() as conn:
+            # 新建数据库时启用增量 VACUUM（必须在创建第一个表之前设置，已有数据库不受影响），
+            # 删除数据后的空闲页由维护任务回收
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            
             # 创建测试模块表
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS test_modules (
@@ -89,17 +514,97 @@ class TestDatabase:
                 )
             ''')
             
-            # 创建索引
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_test_cases_module_id ON test_cases(module_id)')
+            # 创建索引（按查询形态设计的复合索引由迁移 v2 创建）
             conn.execute('CREATE INDEX IF NOT EXISTS idx_test_cases_status ON test_cases(status)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_test_steps_test_case_id ON test_steps(test_case_id)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_test_results_test_case_id ON test_results(test_case_id)')
             
             conn.commit()
+        
+        # 执行版本化迁移（PRAGMA user_version）
+        self.migrate()
             
         # 初始化默认数据
         self.init_default_data()
     
+    def submit_write(self, operation: WriteOperation) -> Future:
+        """
+        提交写操作，返回 Future
+        启用写队列时由写线程组提交；否则在当前线程立即执行
+        """
+        while True:
+            self._available.wait()
+            self.last_activity = time.monotonic()
+            write_queue = self.write_queue
+            if write_queue is None:
+                break
+            try:
+                return write_queue.submit(operation)
+            except WriteQueueClosedError:
+                # 数据库正在替换，等待替换完成后提交到新的写队列
+                continue
+        
+        future: Future = Future()
+        try:
+            with self.get_connection() as conn:
+                future.set_result(operation(conn))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    def execute_write(self, operation: WriteOperation) -> Any:
+        """执行写操作并等待提交完成"""
+        return self.submit_write(operation).result()
+    
+    def replace_database(self, source_path: str) -> None:
+        """
+        用另一个数据库文件（快照）原子替换当前数据库
+        
+        替换期间新的连接和写操作等待；写线程处理完已提交的写操作后停止，
+        源文件复制到同一目录后通过 os.replace 原子替换，旧的 WAL 文件删除，
+        然后执行迁移、重新打开写连接，并发布 reset 事件通知前端重新加载
+        """
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.swap')
+        os.close(fd)
+        try:
+            shutil.copyfile(source_path, temp_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        
+        self._available.clear()
+        try:
+            if self.write_queue is not None:
+                self.write_queue.close()
+            # 旧数据库的 WAL 不能应用到新文件上
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(self.db_path + suffix):
+                    os.unlink(self.db_path + suffix)
+            os.replace(temp_path, self.db_path)
+            MigrationRunner(self._connect).run()
+            self._json_columns = {}
+            if self.analytics_snapshot is not None:
+                self.analytics_snapshot.invalidate()
+        finally:
+            # 替换失败时同样需要新的写队列，否则等待中的写操作无法提交
+            if self.write_queue is not None and self.write_queue.closed:
+                self.write_queue = WriteQueue(self.get_connection)
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            self._available.set()
+        self.events.publish('reset')
+    
+    def migrate(self, target: Optional[int] = None) -> int:
+        """
+        执行待处理的数据库迁移
+        
+        Args:
+            target: 目标版本，默认迁移到最新
+            
+        Returns:
+            执行的迁移数量
+        """
+        return MigrationRunner(self.get_connection).run(target)
+    
     def init_default_data(self):
         """初始化默认的测试模块和测试用例数据"""
         # 暂时禁用所有默认数据创建
@@ -170,7 +675,7 @@ class TestDatabase:
     # 测试模块相关方法
     def create_module(self, module_data: Dict[str, Any]) -> int:
         """创建测试模块"""
-        with self.get_connection() as conn:
+        def write(conn: sqlite3.Connection) -> int:
             cursor = conn.execute('''
                 INSERT INTO test_modules (name, description, color, icon)
                 VALUES (?, ?, ?, ?)
@@ -181,10 +686,13 @@ class TestDatabase:
                 module_data.get('icon', '')
             ))
             return cursor.lastrowid
+        module_id = self.execute_write(write)
+        self.events.publish('module.created', {'id': module_id})
+        return module_id
     
     def get_modules(self) -> List[Dict[str, Any]]:
         """获取所有测试模块"""
-        with self.get_connection() as conn:
+        with self.read_connection() as conn:
             cursor = conn.execute('''
                 SELECT m.*, COUNT(tc.id) as test_case_count
                 FROM test_modules m
@@ -196,7 +704,7 @@ class TestDatabase:
     
     def get_module(self, module_id: int) -> Optional[Dict[str, Any]]:
         """获取单个测试模块"""
-        with self.get_connection() as conn:
+        with self.read_connection() as conn:
             cursor = conn.execute('''
                 SELECT m.*, COUNT(tc.id) as test_case_count
                 FROM test_modules m
@@ -209,7 +717,7 @@ class TestDatabase:
     
     def update_module(self, module_id: int, module_data: Dict[str, Any]) -> bool:
         """更新测试模块"""
-        with self.get_connection() as conn:
+        def write(conn: sqlite3.Connection) -> bool:
             cursor = conn.execute('''
                 UPDATE test_modules 
                 SET name = ?, description = ?, color = ?, icon = ?, updated_at = CURRENT_TIMESTAMP
@@ -222,17 +730,27 @@ class TestDatabase:
                 module_id
             ))
             return cursor.rowcount > 0
+        updated = self.execute_write(write)
+        if updated:
+            self.events.publish('module.updated', {'id': module_id})
+        return updated
     
     def delete_module(self, module_id: int) -> bool:
         """删除测试模块"""
-        with self.get_connection() as conn:
+        def write(conn: sqlite3.Connection) -> bool:
             cursor = conn.execute('DELETE FROM test_modules WHERE id = ?', (module_id,))
             return cursor.rowcount > 0
+        deleted = self.execute_write(write)
+        if deleted:
+            # 模块下的测试用例级联删除
+            self.events.publish('module.deleted', {'id': module_id})
+            self.events.publish('statistics.changed')
+        return deleted
     
     # 测试用例相关方法
     def create_test_case(self, test_case_data: Dict[str, Any]) -> int:
         """创建测试用例"""
-        with self.get_connection() as conn:
+        def write(conn: sqlite3.Connection) -> int:
             cursor = conn.execute('''
                 INSERT INTO test_cases (
                     title, description, module_id, priority, status, 
@@ -251,30 +769,50 @@ class TestDatabase:
                 test_case_data.get('executed_by', '')
             ))
             return cursor.lastrowid
+        test_case_id = self.execute_write(write)
+        self.events.publish('test_case.created',
+                            {'id': test_case_id, 'module_id': test_case_data['module_id']})
+        self.events.publish('statistics.changed')
+        return test_case_id
     
-    def get_test_cases(self, module_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        """获取测试用例"""
-        with self.get_connection() as conn:
-            if module_id:
-                cursor = conn.execute('''
-                    SELECT tc.*, m.name as module_name
-                    FROM test_cases tc
-                    JOIN test_modules m ON tc.module_id = m.id
-                    WHERE tc.module_id = ?
-                    ORDER BY tc.created_at DESC
-                ''', (module_id,))
-            else:
-                cursor = conn.execute('''
-                    SELECT tc.*, m.name as module_name
-                    FROM test_cases tc
-                    JOIN test_modules m ON tc.module_id = m.id
-                    ORDER BY tc.created_at DESC
-                ''')
+    def get_test_cases(self, module_id: Optional[int] = None,
+                       exclude_passed: bool = False) -> List[Dict[str, Any]]:
+        """
+        获取测试用例
+        
+        Args:
+            module_id: 模块ID，为空时返回所有模块
+            exclude_passed: 只返回未通过的测试用例（使用部分索引 idx_test_cases_not_passed）
+        """
+        where, params = self._test_case_filters(module_id, exclude_passed)
+        
+        with self.read_connection() as conn:
+            cursor = conn.execute(f'''
+                SELECT tc.*, m.name as module_name
+                FROM test_cases tc
+                JOIN test_modules m ON tc.module_id = m.id
+                {where}
+                ORDER BY tc.created_at DESC
+            ''', params)
             return [dict(row) for row in cursor.fetchall()]
     
+    @staticmethod
+    def _test_case_filters(module_id: Optional[int],
+                           exclude_passed: bool) -> Tuple[str, List[Any]]:
+        """构造测试用例列表的 WHERE 子句和参数"""
+        conditions = []
+        params: List[Any] = []
+        if module_id:
+            conditions.append('tc.module_id = ?')
+            params.append(module_id)
+        if exclude_passed:
+            conditions.append("tc.status != 'passed'")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return where, params
+    
     def get_test_case(self, test_case_id: int) -> Optional[Dict[str, Any]]:
         """获取单个测试用例"""
-        with self.get_connection() as conn:
+        with self.read_connection() as conn:
             cursor = conn.execute('''
                 SELECT tc.*, m.name as module_name
                 FROM test_cases tc
@@ -284,14 +822,141 @@ class TestDatabase:
             row = cursor.fetchone()
             return dict(row) if row else None
     
+    def get_test_case_bundle(self, test_case_id: int, include: tuple = ('steps',),
+                             results_limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        在同一个连接上获取测试用例及其关联数据（每种数据一条查询，最多三条）
+        
+        Args:
+            test_case_id: 测试用例ID
+            include: 要附带的关联数据，可选 'steps'、'results'
+            results_limit: 只返回最近的 N 条执行结果，为空时返回全部
+        """
+        with self.read_connection() as conn:
+            row = conn.execute('''
+                SELECT tc.*, m.name as module_name
+                FROM test_cases tc
+                JOIN test_modules m ON tc.module_id = m.id
+                WHERE tc.id = ?
+            ''', (test_case_id,)).fetchone()
+            if row is None:
+                return None
+            test_case = dict(row)
+            
+            if 'steps' in include:
+                cursor = conn.execute('''
+                    SELECT * FROM test_steps 
+                    WHERE test_case_id = ? 
+                    ORDER BY step_number
+                ''', (test_case_id,))
+                test_case['steps'] = [dict(step) for step in cursor.fetchall()]
+            
+            if 'results' in include:
+                cursor = conn.execute('''
+                    SELECT * FROM test_results 
+                    WHERE test_case_id = ? 
+                    ORDER BY executed_at DESC
+                    LIMIT ?
+                ''', (test_case_id, results_limit if results_limit is not None else -1))
+                test_case['results'] = [dict(result) for result in cursor.fetchall()]
+            
+            return test_case
+    
+    # JSON 响应构建：由 SQLite JSON1 函数直接生成响应文本，不经过 Python 字典
+    def _json_object(self, conn: sqlite3.Connection, table: str, alias: str,
+                     extra: Tuple[str, ...] = ()) -> str:
+        """
+        生成把一行数据转换为 JSON 对象的 json_object(...) 表达式
+        字段列表取自表结构（迁移新增的字段会自动包含），与 dict(row) 的键一致
+        
+        Args:
+            table: 表名
+            alias: 查询中该表的别名
+            extra: 追加的 '键', 表达式 参数
+        """
+        if table not in self._json_columns:
+            self._json_columns[table] = [
+                row[1] for row in conn.execute(f'PRAGMA table_info({table})')
+            ]
+        pairs = [f"'{column}', {alias}.\"{column}\"" for column in self._json_columns[table]]
+        return f"json_object({', '.join(pairs + list(extra))})"
+    
+    def get_test_cases_json(self, module_id: Optional[int] = None,
+                            exclude_passed: bool = False) -> str:
+        """
+        获取测试用例列表的 JSON 文本（与列表接口格式一致，steps 为步骤描述数组）
+        整个数组由一条查询生成
+        """
+        where, params = self._test_case_filters(module_id, exclude_passed)
+        
+        with self.read_connection() as conn:
+            item = self._json_object(conn, 'test_cases', 'tc', (
+                "'module_name', m.name",
+                """'steps', (
+                    SELECT json_group_array(description) FROM (
+                        SELECT description FROM test_steps
+                        WHERE test_case_id = tc.id ORDER BY step_number
+                    )
+                )""",
+            ))
+            row = conn.execute(f'''
+                SELECT json_group_array(json(item)) FROM (
+                    SELECT {item} AS item
+                    FROM test_cases tc
+                    JOIN test_modules m ON tc.module_id = m.id
+                    {where}
+                    ORDER BY tc.created_at DESC
+                )
+            ''', params).fetchone()
+            return row[0]
+    
+    def get_test_case_bundle_json(self, test_case_id: int, include: tuple = ('steps',),
+                                  results_limit: Optional[int] = None) -> Optional[Tuple[int, str]]:
+        """
+        与 get_test_case_bundle 相同，但用一条查询生成 JSON 文本
+        
+        Returns:
+            (版本号, JSON文本)，测试用例不存在时返回 None
+        """
+        with self.read_connection() as conn:
+            extra = ["'module_name', m.name"]
+            params: List[Any] = []
+            if 'steps' in include:
+                step = self._json_object(conn, 'test_steps', 's')
+                extra.append(f"""'steps', (
+                    SELECT json_group_array(json(item)) FROM (
+                        SELECT {step} AS item FROM test_steps s
+                        WHERE s.test_case_id = tc.id ORDER BY s.step_number
+                    )
+                )""")
+            if 'results' in include:
+                result = self._json_object(conn, 'test_results', 'r')
+                extra.append(f"""'results', (
+                    SELECT json_group_array(json(item)) FROM (
+                        SELECT {result} AS item FROM test_results r
+                        WHERE r.test_case_id = tc.id ORDER BY r.executed_at DESC
+                        LIMIT ?
+                    )
+                )""")
+                params.append(results_limit if results_limit is not None else -1)
+            item = self._json_object(conn, 'test_cases', 'tc', tuple(extra))
+            row = conn.execute(f'''
+                SELECT tc.version, {item}
+                FROM test_cases tc
+                JOIN test_modules m ON tc.module_id = m.id
+                WHERE tc.id = ?
+            ''', params + [test_case_id]).fetchone()
+            return (row[0], row[1]) if row else None
+    
     def update_test_case(self, test_case_id: int, test_case_data: Dict[str, Any]) -> bool:
         """更新测试用例"""
-        with self.get_connection() as conn:
+        def write(conn: sqlite3.Connection) -> bool:
             cursor = conn.execute('''
                 UPDATE test_cases 
                 SET title = ?, description = ?, module_id = ?, priority = ?, 
                     status = ?, estimated_time = ?, expected_result = ?, 
-                    actual_result = ?, executed_by = ?, updated_at = CURRENT_TIMESTAMP
+                    actual_result = ?, executed_by = ?, version = version + 1,
+                    updated_at = CURRENT_TIMESTAMP
                 WHERE id = ?
             ''', (
                 test_case_data['title'],
@@ -306,17 +971,72 @@ class TestDatabase:
                 test_case_id
             ))
             return cursor.rowcount > 0
+        updated = self.execute_write(write)
+        if updated:
+            self.events.publish('test_case.updated', {'id': test_case_id})
+            self.events.publish('statistics.changed')
+        return updated
+    
+    def patch_test_case(self, test_case_id: int, changes: Dict[str, Any],
+                        expected_version: Optional[int] = None) -> Optional[int]:
+        """
+        局部更新测试用例，只写入 changes 中出现的字段
+        
+        Args:
+            test_case_id: 测试用例ID
+            changes: 要修改的字段，键必须在 PATCHABLE_TEST_CASE_FIELDS 中
+            expected_version: 期望的当前版本号，不一致时抛出 VersionConflictError
+        
+        Returns:
+            更新后的版本号，测试用例不存在时返回 None
+        """
+        unknown = [field for field in changes if field not in PATCHABLE_TEST_CASE_FIELDS]
+        if unknown:
+            raise ValueError(f"不支持更新的字段: {', '.join(unknown)}")
+        
+        assignments = [f'{field} = ?' for field in changes]
+        params: List[Any] = list(changes.values())
+        assignments.append('version = version + 1')
+        assignments.append('updated_at = CURRENT_TIMESTAMP')
+        condition = 'id = ?'
+        params.append(test_case_id)
+        if expected_version is not None:
+            condition += ' AND version = ?'
+            params.append(expected_version)
+        
+        def write(conn: sqlite3.Connection) -> Optional[int]:
+            cursor = conn.execute(
+                f"UPDATE test_cases SET {', '.join(assignments)} WHERE {condition}", params
+            )
+            row = conn.execute('SELECT version FROM test_cases WHERE id = ?',
+                               (test_case_id,)).fetchone()
+            if row is None:
+                return None
+            if cursor.rowcount == 0:
+                raise VersionConflictError(test_case_id, row[0])
+            return row[0]
+        version = self.execute_write(write)
+        if version is not None:
+            self.events.publish('test_case.updated', {'id': test_case_id, 'version': version})
+            if 'status' in changes or 'module_id' in changes:
+                self.events.publish('statistics.changed')
+        return version
     
     def delete_test_case(self, test_case_id: int) -> bool:
         """删除测试用例"""
-        with self.get_connection() as conn:
+        def write(conn: sqlite3.Connection) -> bool:
             cursor = conn.execute('DELETE FROM test_cases WHERE id = ?', (test_case_id,))
             return cursor.rowcount > 0
+        deleted = self.execute_write(write)
+        if deleted:
+            self.events.publish('test_case.deleted', {'id': test_case_id})
+            self.events.publish('statistics.changed')
+        return deleted
     
     # 测试步骤相关方法
     def create_test_step(self, step_data: Dict[str, Any]) -> int:
         """创建测试步骤"""
-        with self.get_connection() as conn:
+        def write(conn: sqlite3.Connection) -> int:
             cursor = conn.execute('''
                 INSERT INTO test_steps (test_case_id, step_number, description, expected_result)
                 VALUES (?, ?, ?, ?)
@@ -327,10 +1047,13 @@ class TestDatabase:
                 step_data.get('expected_result', '')
             ))
             return cursor.lastrowid
+        step_id = self.execute_write(write)
+        self.events.publish('test_case.updated', {'id': step_data['test_case_id'], 'steps': True})
+        return step_id
     
     def get_test_steps(self, test_case_id: int) -> List[Dict[str, Any]]:
         """获取测试步骤"""
-        with self.get_connection() as conn:
+        with self.read_connection() as conn:
             cursor = conn.execute('''
                 SELECT * FROM test_steps 
                 WHERE test_case_id = ? 
@@ -340,29 +1063,41 @@ class TestDatabase:
     
     def update_test_step(self, step_id: int, step_data: Dict[str, Any]) -> bool:
         """更新测试步骤"""
-        with self.get_connection() as conn:
-            cursor = conn.execute('''
+        def write(conn: sqlite3.Connection) -> Optional[int]:
+            rows = conn.execute('''
                 UPDATE test_steps 
                 SET step_number = ?, description = ?, expected_result = ?
                 WHERE id = ?
+                RETURNING test_case_id
             ''', (
                 step_data['step_number'],
                 step_data['description'],
                 step_data.get('expected_result', ''),
                 step_id
-            ))
-            return cursor.rowcount > 0
+            )).fetchall()
+            return rows[0][0] if rows else None
+        test_case_id = self.execute_write(write)
+        if test_case_id is None:
+            return False
+        self.events.publish('test_case.updated', {'id': test_case_id, 'steps': True})
+        return True
     
     def delete_test_step(self, step_id: int) -> bool:
         """删除测试步骤"""
-        with self.get_connection() as conn:
-            cursor = conn.execute('DELETE FROM test_steps WHERE id = ?', (step_id,))
-            return cursor.rowcount > 0
+        def write(conn: sqlite3.Connection) -> Optional[int]:
+            rows = conn.execute('DELETE FROM test_steps WHERE id = ? RETURNING test_case_id',
+                                (step_id,)).fetchall()
+            return rows[0][0] if rows else None
+        test_case_id = self.execute_write(write)
+        if test_case_id is None:
+            return False
+        self.events.publish('test_case.updated', {'id': test_case_id, 'steps': True})
+        return True
     
     # 测试结果相关方法
     def create_test_result(self, result_data: Dict[str, Any]) -> int:
         """创建测试结果"""
-        with self.get_connection() as conn:
+        def write(conn: sqlite3.Connection) -> int:
             cursor = conn.execute('''
                 INSERT INTO test_results (
                     test_case_id, status, actual_result, notes, executed_by, executed_at
@@ -377,10 +1112,17 @@ class TestDatabase:
                 result_data.get('executed_at', datetime.now().isoformat())
             ))
             return cursor.lastrowid
+        result_id = self.execute_write(write)
+        self.events.publish('test_result.recorded', {
+            'id': result_id,
+            'test_case_id': result_data['test_case_id'],
+            'status': result_data['status']
+        })
+        return result_id
     
     def get_test_results(self, test_case_id: int) -> List[Dict[str, Any]]:
         """获取测试结果"""
-        with self.get_connection() as conn:
+        with self.read_connection() as conn:
             cursor = conn.execute('''
                 SELECT * FROM test_results 
                 WHERE test_case_id = ? 
@@ -388,40 +1130,205 @@ class TestDatabase:
             ''', (test_case_id,))
             return [dict(row) for row in cursor.fetchall()]
     
-    # 统计相关方法
-    def get_statistics(self) -> Dict[str, Any]:
-        """获取统计数据"""
-        with self.get_connection() as conn:
-            # 总体统计
-            cursor = conn.execute('''
-                SELECT 
-                    COUNT(*) as total_cases,
-                    SUM(CASE WHEN status = 'passed' THEN 1 ELSE 0 END) as passed_cases,
-                    SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END) as failed_cases,
-                    SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending_cases,
-                    SUM(CASE WHEN status = 'blocked' THEN 1 ELSE 0 END) as blocked_cases,
-                    SUM(CASE WHEN status = 'skipped' THEN 1 ELSE 0 END) as skipped_cases
-                FROM test_cases
-            ''')
-            overall_stats = dict(cursor.fetchone())
+    def batch_update_status(self, status: str, test_case_ids: Optional[List[int]] = None,
+                            module_id: Optional[int] = None, current_status: Optional[str] = None,
+                            record_results: bool = False, executed_by: Optional[str] = None,
+                            actual_result: str = '', notes: str = '') -> Dict[str, Any]:
+        """
+        批量更新测试用例状态
+        按ID列表或过滤条件（模块 + 当前状态）选中用例，在一个事务中用集合SQL完成更新
+        
+        Args:
+            status: 新状态
+            test_case_ids: 测试用例ID列表，与过滤条件同时提供时取交集
+            module_id: 只更新该模块的用例
+            current_status: 只更新当前为该状态的用例
+            record_results: 是否为每个用例写入一条执行结果
+            executed_by: 执行人，为空时不修改
+            actual_result: 写入执行结果的实际结果
+            notes: 写入执行结果的备注
+        
+        Returns:
+            更新的用例数量和更新后的统计数据
+        """
+        if test_case_ids is None and module_id is None and current_status is None:
+            raise ValueError("必须提供测试用例ID列表或过滤条件")
+        if record_results and status == 'pending':
+            raise ValueError("待执行状态不能记录执行结果")
+        
+        conditions = []
+        params: List[Any] = []
+        if test_case_ids is not None:
+            # 整个ID列表作为一个JSON参数传入，不受SQL变量个数上限限制
+            conditions.append('id IN (SELECT value FROM json_each(?))')
+            params.append(json.dumps([int(test_case_id) for test_case_id in test_case_ids]))
+        if module_id is not None:
+            conditions.append('module_id = ?')
+            params.append(module_id)
+        if current_status is not None:
+            conditions.append('status = ?')
+            params.append(current_status)
+        where = ' AND '.join(conditions)
+        
+        assignments = ['status = ?']
+        update_params: List[Any] = [status]
+        if executed_by is not None:
+            assignments.append('executed_by = ?')
+            update_params.append(executed_by)
+        
+        def write(conn: sqlite3.Connection) -> Tuple[List[int], Dict[str, Any]]:
+            if record_results:
+                # 先按更新前的状态选中用例写入执行结果
+                conn.execute(f'''
+                    INSERT INTO test_results (
+                        test_case_id, status, actual_result, notes, executed_by, executed_at
+                    )
+                    SELECT id, ?, ?, ?, ?, ? FROM test_cases WHERE {where}
+                ''', [status, actual_result, notes, executed_by or '',
+                      datetime.now().isoformat()] + params)
+            updated_ids = [row[0] for row in conn.execute(f'''
+                UPDATE test_cases
+                SET {', '.join(assignments)}, version = version + 1,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE {where}
+                RETURNING id
+            ''', update_params + params).fetchall()]
+            return updated_ids, self._query_statistics(conn)
+        updated_ids, statistics = self.execute_write(write)
+        if updated_ids:
+            if record_results:
+                self.events.publish('test_result.recorded',
+                                    {'test_case_ids': updated_ids, 'status': status})
+            self.events.publish('test_case.updated', {'ids': updated_ids})
+            self.events.publish('statistics.changed')
+        return {'updated': len(updated_ids), 'statistics': statistics}
+    
+    # 增量同步（变更日志由迁移 v4 的触发器写入）
+    def get_changes(self, since: int = 0, limit: int = 1000) -> Dict[str, Any]:
+        """
+        获取版本号大于 since 的变更
+        
+        Args:
+            since: 客户端已同步到的版本，0 表示全部数据
+            limit: 每次最多返回的变更记录数，has_more 为真时以返回的 version 继续请求
             
-            # 按模块统计
-            cursor = conn.execute('''
-                SELECT 
-                    m.name as module_name,
-                    m.color as module_color,
-                    COUNT(tc.id) as total_cases,
-                    SUM(CASE WHEN tc.status = 'passed' THEN 1 ELSE 0 END) as passed_cases,
-                    SUM(CASE WHEN tc.status = 'failed' THEN 1 ELSE 0 END) as failed_cases,
-                    SUM(CASE WHEN tc.status = 'pending' THEN 1 ELSE 0 END) as pending_cases
+        Returns:
+            {since, version, latest_version, has_more, reset,
+             modules, test_cases, test_results, deleted: {modules, test_cases, test_results}}
+            test_cases 与列表接口格式一致（steps 为步骤描述数组）；
+            reset 为真表示 since 大于当前版本（数据库已被替换），客户端应清空本地数据后使用本次结果
+        """
+        with self.read_connection() as conn:
+            latest = conn.execute('SELECT COALESCE(MAX(version), 0) FROM change_log').fetchone()[0]
+            reset = since > latest
+            if reset:
+                since = 0
+            
+            rows = conn.execute('''
+                SELECT version, table_name, row_id, operation FROM change_log
+                WHERE version > ?
+                ORDER BY version
+                LIMIT ?
+            ''', (since, limit + 1)).fetchall()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            
+            upserts: Dict[str, List[int]] = {'test_modules': [], 'test_cases': [], 'test_results': []}
+            deleted: Dict[str, List[int]] = {'test_modules': [], 'test_cases': [], 'test_results': []}
+            for row in rows:
+                target = upserts if row['operation'] == 'upsert' else deleted
+                target[row['table_name']].append(row['row_id'])
+            
+            modules = [dict(row) for row in conn.execute('''
+                SELECT m.*, COUNT(tc.id) as test_case_count
                 FROM test_modules m
                 LEFT JOIN test_cases tc ON m.id = tc.module_id
-                GROUP BY m.id, m.name, m.color
-                ORDER BY m.name
-            ''')
-            module_stats = [dict(row) for row in cursor.fetchall()]
+                WHERE m.id IN (SELECT value FROM json_each(?))
+                GROUP BY m.id
+                ORDER BY m.sort_order ASC, m.name ASC
+            ''', (json.dumps(upserts['test_modules']),))]
             
-            return {
-                'overall': overall_stats,
-                'by_module': module_stats
-            }
\ No newline at end of file
+            test_cases = [dict(row) for row in conn.execute('''
+                SELECT tc.*, m.name as module_name
+                FROM test_cases tc
+                JOIN test_modules m ON tc.module_id = m.id
+                WHERE tc.id IN (SELECT value FROM json_each(?))
+                ORDER BY tc.created_at DESC
+            ''', (json.dumps(upserts['test_cases']),))]
+            steps: Dict[int, List[str]] = {}
+            for row in conn.execute('''
+                SELECT test_case_id, description FROM test_steps
+                WHERE test_case_id IN (SELECT value FROM json_each(?))
+                ORDER BY test_case_id, step_number
+            ''', (json.dumps([test_case['id'] for test_case in test_cases]),)):
+                steps.setdefault(row['test_case_id'], []).append(row['description'])
+            for test_case in test_cases:
+                test_case['steps'] = steps.get(test_case['id'], [])
+            # 所属模块已不存在的用例不会出现在列表接口中，按删除处理
+            found = {test_case['id'] for test_case in test_cases}
+            deleted['test_cases'] += [i for i in upserts['test_cases'] if i not in found]
+            
+            test_results = [dict(row) for row in conn.execute('''
+                SELECT * FROM test_results
+                WHERE id IN (SELECT value FROM json_each(?))
+                ORDER BY id
+            ''', (json.dumps(upserts['test_results']),))]
+        
+        return {
+            'since': since,
+            'version': rows[-1]['version'] if rows else latest,
+            'latest_version': latest,
+            'has_more': has_more,
+            'reset': reset,
+            'modules': modules,
+            'test_cases': test_cases,
+            'test_results': test_results,
+            'deleted': {
+                'modules': deleted['test_modules'],
+                'test_cases': deleted['test_cases'],
+                'test_results': deleted['test_results']
+            }
+        }
+    
+    # 统计相关方法
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取统计数据"""
+        with self.analytics_connection() as conn:
+            return self._query_statistics(conn)
+    
+    @staticmethod
+    def _query_statistics(conn: sqlite3.Connection) -> Dict[str, Any]:
+        """在给定连接上计算统计数据（可在写事务内调用，得到提交后的结果）"""
+        # 总体统计
+        cursor = conn.execute('''
+            SELECT 
+                COUNT(*) as total_cases,
+                SUM(CASE WHEN status = 'passed' THEN 1 ELSE 0 END) as passed_cases,
+                SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END) as failed_cases,
+                SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending_cases,
+                SUM(CASE WHEN status = 'blocked' THEN 1 ELSE 0 END) as blocked_cases,
+                SUM(CASE WHEN status = 'skipped' THEN 1 ELSE 0 END) as skipped_cases
+            FROM test_cases
+        ''')
+        overall_stats = dict(cursor.fetchone())
+        
+        # 按模块统计
+        cursor = conn.execute('''
+            SELECT 
+                m.name as module_name,
+                m.color as module_color,
+                COUNT(tc.id) as total_cases,
+                SUM(CASE WHEN tc.status = 'passed' THEN 1 ELSE 0 END) as passed_cases,
+                SUM(CASE WHEN tc.status = 'failed' THEN 1 ELSE 0 END) as failed_cases,
+                SUM(CASE WHEN tc.status = 'pending' THEN 1 ELSE 0 END) as pending_cases
+            FROM test_modules m
+            LEFT JOIN test_cases tc ON m.id = tc.module_id
+            GROUP BY m.id, m.name, m.color
+            ORDER BY m.name
+        ''')
+        module_stats = [dict(row) for row in cursor.fetchall()]
+        
+        return {
+            'overall': overall_stats,
+            'by_module': module_stats
+        }
\ No newline at end of file
@@ -3,9 +3,10 @@
 
 import requests
 import json
-import re
 import os
 
+from js_catalog import iter_test_cases, step_texts, text_field
+
 # API配置
 API_BASE_URL = 'http://localhost:8000/api'
 
@@ -24,125 +25,20 @@ def get_module_id_by_name(module_name):
         print(f"获取模块ID失败: {e}")
         return None
 
-def parse_single_test_case(test_case_str):
-    """解析单个测试用例对象"""
-    test_case = {}
-    
-    # 提取基本字段
-    patterns = {
-        'id': r"id:\s*['\"]([^'\"]+)['\"]",
-        'name': r"name:\s*['\"]([^'\"]+)['\"]",
-        'description': r"description:\s*['\"]([^'\"]+)['\"]",
-        'module': r"module:\s*['\"]([^'\"]+)['\"]",
-        'priority': r"priority:\s*['\"]([^'\"]+)['\"]",
-        'status': r"status:\s*['\"]([^'\"]+)['\"]",
-        'apiEndpoint': r"apiEndpoint:\s*['\"]([^'\"]+)['\"]",
-        'actualResult': r"actualResult:\s*['\"]([^'\"]*)['\"]",
-        'executionTime': r"executionTime:\s*(\d+)",
-        'lastExecuted': r"lastExecuted:\s*(null|['\"][^'\"]*['\"])"
-    }
-    
-    for field, pattern in patterns.items():
-        match = re.search(pattern, test_case_str)
-        if match:
-            value = match.group(1)
-            if field in ['executionTime']:
-                test_case[field] = int(value) if value.isdigit() else 0
-            elif field == 'lastExecuted' and value == 'null':
-                test_case[field] = None
-            else:
-                test_case[field] = value
-    
-    # 提取数组字段
-    test_steps_match = re.search(r"testSteps:\s*\[(.*?)\]", test_case_str, re.DOTALL)
-    if test_steps_match:
-        steps_content = test_steps_match.group(1)
-        steps = re.findall(r"['\"]([^'\"]+)['\"]", steps_content)
-        test_case['testSteps'] = steps
-    
-    # 提取expectedResult
-    expected_result_match = re.search(r"expectedResult:\s*['\"]([^'\"]+)['\"]", test_case_str)
-    if expected_result_match:
-        test_case['expectedResult'] = expected_result_match.group(1)
-    
-    # 提取testData对象
-    test_data_match = re.search(r"testData:\s*\{(.*?)\}", test_case_str, re.DOTALL)
-    if test_data_match:
-        test_data_content = test_data_match.group(1)
-        test_data = {}
-        
-        # 简单的键值对提取
-        kv_matches = re.findall(r"(\w+):\s*['\"]([^'\"]*)['\"]", test_data_content)
-        for key, value in kv_matches:
-            test_data[key] = value
-            
-        # 处理特殊情况，如new Date()
-        date_matches = re.findall(r"(\w+):\s*new Date\(\)\.toISOString\(\)", test_data_content)
-        for key in date_matches:
-            test_data[key] = "2024-01-01T00:00:00.000Z"
-            
-        test_case['testData'] = test_data
-    else:
-        test_case['testData'] = {}
-    
-    return test_case
-
 def extract_test_cases_from_js(file_path):
-    """从JS文件中提取测试用例"""
+    """从JS文件中提取测试用例（通过 js_catalog 解析缓存读取，文件未变化时不再解析）"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 查找测试用例数组
-        array_pattern = r'const\s+\w*[Tt]est[Cc]ases\s*=\s*\[(.*?)\];'
-        match = re.search(array_pattern, content, re.DOTALL)
-        
-        if not match:
-            print(f"在文件 {file_path} 中未找到测试用例数组")
-            return []
-        
-        array_content = match.group(1)
-        
-        # 分割测试用例对象
         test_cases = []
-        brace_count = 0
-        current_case = ""
-        in_string = False
-        escape_next = False
-        string_char = None
-        
-        for char in array_content:
-            if escape_next:
-                current_case += char
-                escape_next = False
-                continue
-                
-            if char == '\\':
-                escape_next = True
-                current_case += char
+        for test_case in iter_test_cases(file_path):
+            if not text_field(test_case, 'id'):
                 continue
-            
-            if not in_string and char in ['"', "'"]:
-                in_string = True
-                string_char = char
-            elif in_string and char == string_char:
-                in_string = False
-                string_char = None
-            
-            current_case += char
-            
-            if not in_string:
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        # 完整的测试用例对象
-                        test_case = parse_single_test_case(current_case)
-                        if test_case.get('id'):
-                            test_cases.append(test_case)
-                        current_case = ""
+            test_case['testSteps'] = step_texts(test_case.get('testSteps'))
+            if not isinstance(test_case.get('testData'), dict):
+                test_case['testData'] = {}
+            test_cases.append(test_case)
         
+        if not test_cases:
+            print(f"在文件 {file_path} 中未找到测试用例")
         return test_cases
         
     except Exception as e:
@@ -6,11 +6,15 @@
 
 import sqlite3
 import os
-import re
+import sys
 import json
 import time
 from datetime import datetime
 
+from js_catalog import iter_test_cases, step_texts, text_field
+from backup import BackupManager
+from snapshots import SnapshotStore, restore_snapshot
+
 def get_db_connection(max_retries=5):
     """获取数据库连接，带重试机制"""
     for attempt in range(max_retries):
@@ -29,6 +33,8 @@ def get_db_connection(max_retries=5):
 
 def init_database():
     """初始化数据库，清空现有数据"""
+    # 清空前先备份，可用 python backup.py restore <备份文件> 恢复
+    BackupManager.from_config('test_management.db').create_backup('pre-reset')
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -74,42 +80,12 @@ def parse_js_file(file_path):
         return []
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 提取测试用例数组的变量名
-        array_pattern = r'const\s+(\w+TestCases)\s*=\s*\[(.*?)\];'
-        match = re.search(array_pattern, content, re.DOTALL)
-        
-        if not match:
-            print(f"❌ 未找到测试用例数组: {file_path}")
-            return []
-        
-        array_name = match.group(1)
-        test_cases_str = match.group(1) + ' = [' + match.group(2) + '];'
-        
-        # 使用正则表达式提取每个测试用例对象
-        case_pattern = r'\{([^{}]*(?:\{[^{}]*\}[^{}]*)*)\}'
-        cases = re.findall(case_pattern, match.group(2))
+        # 逐个读取解析后的测试用例（js_catalog 解析缓存，文件未变化时不再解析）
+        cases = iter_test_cases(file_path)
         
         test_cases = []
-        for i, case_str in enumerate(cases):
+        for i, case in enumerate(cases):
             try:
-                # 提取基本信息
-                name_match = re.search(r'name:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                desc_match = re.search(r'description:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                priority_match = re.search(r'priority:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                status_match = re.search(r'status:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                expected_match = re.search(r'expectedResult:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                
-                # 提取测试步骤
-                steps_match = re.search(r'testSteps:\s*\[(.*?)\]', case_str, re.DOTALL)
-                steps = []
-                if steps_match:
-                    steps_str = steps_match.group(1)
-                    step_matches = re.findall(r'[\'"]([^\'"]*)[\'"]', steps_str)
-                    steps = step_matches
-                
                 # 状态值映射
                 status_mapping = {
                     'completed': 'passed',
@@ -118,7 +94,7 @@ def parse_js_file(file_path):
                     'inactive': 'skipped'
                 }
                 
-                original_status = status_match.group(1) if status_match else 'pending'
+                original_status = text_field(case, 'status', 'pending')
                 mapped_status = status_mapping.get(original_status, original_status)
                 
                 # 确保状态值有效
@@ -127,12 +103,12 @@ def parse_js_file(file_path):
                     mapped_status = 'pending'
                 
                 test_case = {
-                    'name': name_match.group(1) if name_match else f'测试用例{i+1}',
-                    'description': desc_match.group(1) if desc_match else '',
-                    'priority': priority_match.group(1) if priority_match else 'medium',
+                    'name': text_field(case, 'name', f'测试用例{i+1}'),
+                    'description': text_field(case, 'description'),
+                    'priority': text_field(case, 'priority', 'medium'),
                     'status': mapped_status,
-                    'expected_result': expected_match.group(1) if expected_match else '',
-                    'steps': steps
+                    'expected_result': text_field(case, 'expectedResult'),
+                    'steps': step_texts(case.get('testSteps'))
                 }
                 
                 test_cases.append(test_case)
@@ -193,11 +169,18 @@ def insert_test_case(cursor, test_case, module_id):
     
     return test_case_id
 
-def main():
+def main(snapshot=None):
     print("============================================================")
     print("🚀 直接SQL导入测试用例脚本")
     print("============================================================")
     
+    # 已有快照时直接恢复（替换数据库文件），不再清空后重新解析和导入
+    store = SnapshotStore.from_config('test_management.db')
+    if snapshot and store.exists(snapshot):
+        info = restore_snapshot(snapshot, store)
+        print(f"📸 已从快照 {snapshot} 恢复，耗时 {info['duration_ms']:.0f}ms")
+        return True
+    
     # 1. 初始化数据库
     init_database()
     
@@ -261,6 +244,10 @@ def main():
         print(f"📊 总计导入: {total_imported} 个测试用例")
         print(f"============================================================")
         
+        if snapshot:
+            store.save(snapshot)
+            print(f"📸 已保存快照 {snapshot}，下次运行时直接恢复")
+
         return True
         
     except Exception as e:
@@ -272,6 +259,14 @@ def main():
         conn.close()
 
 if __name__ == "__main__":
-    success = main()
+    # --snapshot <名称>: 有快照时直接恢复，没有时完整导入后保存为快照
+    snapshot = None
+    if '--snapshot' in sys.argv:
+        index = sys.argv.index('--snapshot')
+        if index + 1 >= len(sys.argv):
+            print("❌ 错误: --snapshot 需要指定快照名称")
+            sys.exit(1)
+        snapshot = sys.argv[index + 1]
+    success = main(snapshot)
     if not success:
         exit(1)
\ No newline at end of file
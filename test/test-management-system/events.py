@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+数据变更事件
+TestDatabase 的写操作提交后发布事件，API 通过 Server-Sent Events（GET /api/events）推送给前端，
+前端只需重新获取发生变化的数据，不再轮询完整列表
+
+事件类型:
+    module.created / module.updated / module.deleted       data: {id}
+    test_case.created / test_case.updated / test_case.deleted  data: {id, ...} 或批量 {ids}
+    test_result.recorded                                    data: {id, test_case_id, status} 或批量 {test_case_ids, status}
+    statistics.changed                                      data: {}
+    reset        客户端请求的版本已不在缓冲区中（或服务器已重启、数据库已从快照恢复），需要重新加载全部数据
+"""
+
+import json
+import threading
+from collections import deque
+from datetime import datetime
+from typing import List, Dict, Optional, Any, Callable, Iterator
+
+EventListener = Callable[[Dict[str, Any]], None]
+
+
+class ChangeFeed:
+    """内存中的事件缓冲区，每个事件带有递增的版本号"""
+
+    def __init__(self, max_events: int = 1000):
+        """
+        Args:
+            max_events: 保留的最近事件数量，客户端断线重连时可从中补发
+        """
+        self.events = deque(maxlen=max_events)
+        self.version = 0
+        self.condition = threading.Condition()
+        self.listeners: List[EventListener] = []
+
+    def publish(self, event_type: str, data: Optional[Dict[str, Any]] = None) -> int:
+        """发布事件，返回事件版本号"""
+        with self.condition:
+            self.version += 1
+            event = {
+                'version': self.version,
+                'type': event_type,
+                'data': data or {},
+                'timestamp': datetime.now().isoformat()
+            }
+            self.events.append(event)
+            self.condition.notify_all()
+            listeners = list(self.listeners)
+        for listener in listeners:
+            listener(event)
+        return event['version']
+
+    def latest_version(self) -> int:
+        with self.condition:
+            return self.version
+
+    def events_since(self, version: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        获取版本号大于 version 的事件
+
+        Returns:
+            事件列表；请求的版本已被淘汰或大于当前版本（服务器重启）时返回 None
+        """
+        with self.condition:
+            if version > self.version:
+                return None
+            oldest = self.events[0]['version'] if self.events else self.version + 1
+            if version < oldest - 1:
+                return None
+            return [event for event in self.events if event['version'] > version]
+
+    def wait(self, version: int, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        """阻塞等待新事件（超时返回空列表），用于同步的流式响应"""
+        with self.condition:
+            # 版本号大于当前版本（服务器重启）时立即返回，由 events_since 判定需要重置
+            self.condition.wait_for(lambda: self.version != version, timeout)
+        return self.events_since(version)
+
+    def subscribe(self, listener: EventListener) -> None:
+        """注册事件回调（在发布事件的线程中调用，回调应尽快返回）"""
+        with self.condition:
+            self.listeners.append(listener)
+
+    def unsubscribe(self, listener: EventListener) -> None:
+        with self.condition:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+
+def format_sse(event: Dict[str, Any]) -> bytes:
+    """把事件编码为 SSE 消息（id 为版本号，浏览器重连时通过 Last-Event-ID 带回）"""
+    payload = json.dumps({**event['data'], 'timestamp': event['timestamp']},
+                         ensure_ascii=False, separators=(',', ':'))
+    return f"id: {event['version']}\nevent: {event['type']}\ndata: {payload}\n\n".encode('utf-8')
+
+
+def reset_event(version: int) -> Dict[str, Any]:
+    """通知客户端重新加载全部数据的事件"""
+    return {
+        'version': version,
+        'type': 'reset',
+        'data': {},
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def event_stream(feed: ChangeFeed, since: Optional[int] = None,
+                 heartbeat: float = 15.0) -> Iterator[bytes]:
+    """
+    同步的 SSE 流（WSGI 模式下每个连接占用一个线程）
+
+    Args:
+        feed: 事件源
+        since: 从该版本之后开始推送，None 表示只推送新事件
+        heartbeat: 没有事件时发送心跳注释的间隔（秒），避免代理断开空闲连接
+    """
+    version = feed.latest_version() if since is None else since
+    yield b'retry: 3000\n\n'
+    while True:
+        events = feed.wait(version, heartbeat)
+        if events is None:
+            version = feed.latest_version()
+            yield format_sse(reset_event(version))
+        elif not events:
+            yield b': keep-alive\n\n'
+        else:
+            for event in events:
+                yield format_sse(event)
+            version = events[-1]['version']
+
+
+def resume_version(since: Optional[str], last_event_id: Optional[str]) -> Optional[int]:
+    """解析 since 参数或 Last-Event-ID 请求头，都没有时返回 None（只接收新事件）"""
+    for value in (last_event_id, since):
+        if value:
+            try:
+                return int(value)
+            except ValueError:
+                continue
+    return None
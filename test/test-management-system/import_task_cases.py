@@ -8,9 +8,10 @@ import requests
 import json
 import os
 import sys
-import re
 import time
 
+from js_catalog import iter_test_cases, step_texts, text_field
+
 # 禁用代理
 os.environ['NO_PROXY'] = 'localhost,127.0.0.1'
 os.environ['no_proxy'] = 'localhost,127.0.0.1'
@@ -24,49 +25,19 @@ def parse_js_file():
         return []
     
     try:
-        with open(js_file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 提取taskTestCases数组
-        pattern = r'const\s+taskTestCases\s*=\s*\[(.*?)\];'
-        match = re.search(pattern, content, re.DOTALL)
-        
-        if not match:
-            print("❌ 未找到taskTestCases数组")
-            return []
-        
-        # 简单解析测试用例对象
-        test_cases_str = match.group(1)
-        
-        # 使用正则表达式提取每个测试用例
-        case_pattern = r'\{([^{}]*(?:\{[^{}]*\}[^{}]*)*)\}'
-        cases = re.findall(case_pattern, test_cases_str)
+        # 逐个读取解析后的测试用例（js_catalog 解析缓存，文件未变化时不再解析）
+        cases = iter_test_cases(js_file_path)
         
         test_cases = []
-        for i, case_str in enumerate(cases):
+        for i, case in enumerate(cases):
             try:
-                # 提取基本信息
-                name_match = re.search(r'name:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                desc_match = re.search(r'description:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                priority_match = re.search(r'priority:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                status_match = re.search(r'status:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                expected_match = re.search(r'expectedResult:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                
-                # 提取测试步骤
-                steps_match = re.search(r'testSteps:\s*\[(.*?)\]', case_str, re.DOTALL)
-                steps = []
-                if steps_match:
-                    steps_str = steps_match.group(1)
-                    step_matches = re.findall(r'[\'"]([^\'"]*)[\'"]', steps_str)
-                    steps = step_matches
-                
                 test_case = {
-                    'name': name_match.group(1) if name_match else f'测试用例{i+1}',
-                    'description': desc_match.group(1) if desc_match else '',
-                    'priority': priority_match.group(1) if priority_match else 'medium',
-                    'status': status_match.group(1) if status_match else 'pending',
-                    'expectedResult': expected_match.group(1) if expected_match else '',
-                    'testSteps': steps
+                    'name': text_field(case, 'name', f'测试用例{i+1}'),
+                    'description': text_field(case, 'description'),
+                    'priority': text_field(case, 'priority', 'medium'),
+                    'status': text_field(case, 'status', 'pending'),
+                    'expectedResult': text_field(case, 'expectedResult'),
+                    'testSteps': step_texts(case.get('testSteps'))
                 }
                 
                 test_cases.append(test_case)
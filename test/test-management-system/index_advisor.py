@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+索引顾问
+分析慢查询日志中的 EXPLAIN QUERY PLAN，找出全表扫描和临时排序，并给出候选索引
+
+用法:
+    python index_advisor.py [数据库路径]          # 在本地数据库上回放典型查询并分析
+    python index_advisor.py --from-api [API地址]  # 分析运行中API服务器的慢查询日志
+    追加 --json 输出机器可读的结果
+"""
+
+import re
+import sys
+import json
+import logging
+from typing import List, Dict, Any, Tuple
+
+from database import TestDatabase
+
+# 匹配 FROM/JOIN 子句中的表名和别名
+TABLE_PATTERN = re.compile(
+    r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!WHERE|JOIN|LEFT|INNER|ON|GROUP|ORDER|LIMIT)(\w+))?',
+    re.IGNORECASE
+)
+# 匹配 别名.列 = ? 形式的等值条件
+EQUALITY_PATTERN = re.compile(r'\b(?:(\w+)\.)?(\w+)\s*=\s*\?')
+# 匹配 ORDER BY 子句
+ORDER_BY_PATTERN = re.compile(r'\bORDER\s+BY\s+(.+?)(?:\bLIMIT\b|$)', re.IGNORECASE)
+# 执行计划中的全表扫描（不含通过索引的扫描）
+SCAN_PATTERN = re.compile(r'^\s*SCAN (\w+)\b(?! USING)')
+
+
+def collect_workload_plans(db_path: str) -> List[Dict[str, Any]]:
+    """在本地数据库上回放 TestDatabase 的典型读查询，返回带执行计划的查询记录"""
+    # 阈值为0时每条语句都会记录，回放期间不输出慢查询告警
+    logging.getLogger('database').setLevel(logging.ERROR)
+    db = TestDatabase(db_path, slow_query_threshold_ms=0)
+    db.slow_query_log.reset()  # 忽略初始化和迁移阶段的语句
+
+    modules = db.get_modules()
+    test_cases = db.get_test_cases()
+    db.get_statistics()
+    if modules:
+        db.get_module(modules[0]['id'])
+        db.get_test_cases(modules[0]['id'])
+        db.get_test_cases(modules[0]['id'], exclude_passed=True)
+    if test_cases:
+        db.get_test_case(test_cases[0]['id'])
+        db.get_test_steps(test_cases[0]['id'])
+        db.get_test_results(test_cases[0]['id'])
+
+    return db.slow_query_log.snapshot()
+
+
+def fetch_api_plans(api_base_url: str) -> List[Dict[str, Any]]:
+    """从运行中的API服务器获取慢查询日志"""
+    import requests
+
+    response = requests.get(f"{api_base_url}/admin/slow-queries", timeout=10)
+    response.raise_for_status()
+    return response.json()['data']['queries']
+
+
+def parse_tables(sql: str) -> Dict[str, str]:
+    """解析 别名 -> 表名 映射（没有别名时以表名作为别名）"""
+    return {alias or table: table for table, alias in TABLE_PATTERN.findall(sql)}
+
+
+def columns_for_table(sql: str, alias: str, aliases: Dict[str, str]) -> Tuple[List[str], List[str]]:
+    """提取某个表上的等值过滤列和排序列"""
+    single_table = len(set(aliases.values())) == 1
+
+    def belongs(prefix: str) -> bool:
+        return prefix == alias or (not prefix and single_table)
+
+    # JOIN ... ON 中的条件不计入过滤列
+    where_match = re.search(r'\bWHERE\b(.*?)(?:\bGROUP\b|\bORDER\b|\bLIMIT\b|$)', sql, re.IGNORECASE)
+    equality = []
+    if where_match:
+        for prefix, column in EQUALITY_PATTERN.findall(where_match.group(1)):
+            if belongs(prefix) and column not in equality:
+                equality.append(column)
+
+    ordering = []
+    order_match = ORDER_BY_PATTERN.search(sql)
+    if order_match:
+        for term in order_match.group(1).split(','):
+            name = term.strip().split()[0]
+            prefix, _, column = name.rpartition('.')
+            if belongs(prefix) and column not in equality and column not in ordering:
+                ordering.append(column)
+
+    return equality, ordering
+
+
+def analyze_entry(entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """分析单条查询的执行计划，返回发现的问题和候选索引"""
+    sql = entry['sql']
+    aliases = parse_tables(sql)
+    findings = []
+
+    temp_sort = any('USE TEMP B-TREE FOR ORDER BY' in line for line in entry.get('plan', []))
+    for line in entry.get('plan', []):
+        scan = SCAN_PATTERN.match(line)
+        if not scan:
+            continue
+        alias = scan.group(1)
+        table = aliases.get(alias, alias)
+        equality, ordering = columns_for_table(sql, alias, aliases)
+        columns = equality + (ordering if temp_sort else [])
+        findings.append({
+            'problem': f'全表扫描 {table}' + ('，并使用临时B树排序' if temp_sort else ''),
+            'table': table,
+            'suggested_columns': columns,
+        })
+
+    if temp_sort and not findings:
+        # 走了索引但仍需排序：索引列未覆盖 ORDER BY
+        for alias, table in aliases.items():
+            equality, ordering = columns_for_table(sql, alias, aliases)
+            if ordering:
+                findings.append({
+                    'problem': f'{table} 使用临时B树排序',
+                    'table': table,
+                    'suggested_columns': equality + ordering,
+                })
+
+    for finding in findings:
+        columns = finding['suggested_columns']
+        finding['suggested_index'] = (
+            f"CREATE INDEX IF NOT EXISTS idx_{finding['table']}_{'_'.join(columns)} "
+            f"ON {finding['table']}({', '.join(columns)})" if columns else None
+        )
+    return findings
+
+
+def advise(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """汇总所有查询的建议，按总耗时排序"""
+    report = []
+    for entry in entries:
+        findings = analyze_entry(entry)
+        if findings:
+            report.append({
+                'sql': entry['sql'],
+                'count': entry.get('count', 1),
+                'total_ms': entry.get('total_ms', 0),
+                'plan': entry.get('plan', []),
+                'findings': findings
+            })
+    return sorted(report, key=lambda item: item['total_ms'], reverse=True)
+
+
+def print_report(report: List[Dict[str, Any]]) -> None:
+    """打印建议报告"""
+    if not report:
+        print("✅ 未发现全表扫描或临时排序，当前索引已覆盖所有查询")
+        return
+
+    suggestions = []
+    for item in report:
+        print("-" * 60)
+        print(f"📄 {item['sql'][:160]}")
+        print(f"   执行 {item['count']} 次，总耗时 {item['total_ms']}ms")
+        for line in item['plan']:
+            print(f"   | {line}")
+        for finding in item['findings']:
+            print(f"   ⚠️ {finding['problem']}")
+            if finding['suggested_index'] and finding['suggested_index'] not in suggestions:
+                suggestions.append(finding['suggested_index'])
+
+    print("=" * 60)
+    print("💡 候选索引:")
+    for sql in suggestions:
+        print(f"   {sql};")
+
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if arg != '--json']
+    if args and args[0] == '--from-api':
+        if len(args) > 1:
+            base_url = args[1]
+        else:
+            from config import get_api_base_url
+            base_url = get_api_base_url()
+        entries = fetch_api_plans(base_url)
+    else:
+        entries = collect_workload_plans(args[0] if args else 'test_management.db')
+
+    report = advise(entries)
+    if '--json' in sys.argv:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
@@ -66,8 +66,17 @@ class ApiService {
         return this.request(endpoint);
     }
 
-    async getTestCase(testCaseId) {
-        return this.request(`/test-cases/${testCaseId}`);
+    // include 可为 ['steps', 'results']，一次请求取回详情页所需的全部数据
+    async getTestCase(testCaseId, include = null, resultsLimit = null) {
+        const params = new URLSearchParams();
+        if (include) {
+            params.set('include', include.join(','));
+        }
+        if (resultsLimit !== null) {
+            params.set('results_limit', resultsLimit);
+        }
+        const query = params.toString();
+        return this.request(`/test-cases/${testCaseId}${query ? `?${query}` : ''}`);
     }
 
     async createTestCase(testCaseData) {
@@ -84,6 +93,33 @@ class ApiService {
         });
     }
 
+    // 局部更新测试用例，只发送变化的字段；传入 version 时由服务器校验版本号
+    async patchTestCase(testCaseId, changes, version = null) {
+        const headers = { ...this.headers };
+        if (version !== null && version !== undefined) {
+            headers['If-Match'] = `"${version}"`;
+        }
+        return this.request(`/test-cases/${testCaseId}`, {
+            method: 'PATCH',
+            headers,
+            body: JSON.stringify(changes)
+        });
+    }
+
+    // 批量更新状态：target 为ID数组或过滤条件 { module_id, status }
+    async batchUpdateStatus(status, target, options = {}) {
+        const payload = { status, ...options };
+        if (Array.isArray(target)) {
+            payload.ids = target;
+        } else {
+            payload.filter = target;
+        }
+        return this.request('/test-cases/batch-status', {
+            method: 'POST',
+            body: JSON.stringify(payload)
+        });
+    }
+
     async deleteTestCase(testCaseId) {
         return this.request(`/test-cases/${testCaseId}`, {
             method: 'DELETE'
@@ -127,6 +163,11 @@ class ApiService {
         });
     }
 
+    // 增量同步：获取 since 版本之后的变更
+    async getChanges(since = 0, limit = 1000) {
+        return this.request(`/changes?since=${since}&limit=${limit}`);
+    }
+
     // 统计数据API
     async getStatistics() {
         return this.request('/test-cases/statistics');
@@ -141,11 +182,8 @@ class ApiService {
             executed_by: '手动测试'
         };
 
-        // 创建测试结果记录
-        await this.createTestResult(testCaseId, resultData);
-
-        // 更新测试用例状态
-        return this.updateTestCase(testCaseId, { status });
+        // 创建测试结果记录，服务器会在同一请求中更新测试用例状态
+        return this.createTestResult(testCaseId, resultData);
     }
 }
 
@@ -179,7 +217,8 @@ class DataTransformer {
             steps: backendTestCase.steps || [],
             expectedResult: backendTestCase.expected_result,
             testDate: backendTestCase.updated_at ? new Date(backendTestCase.updated_at).toLocaleDateString('zh-CN') : null,
-            executedBy: backendTestCase.executed_by || '手动测试'
+            executedBy: backendTestCase.executed_by || '手动测试',
+            version: backendTestCase.version
         };
 
         // 只有在actual_result有值且不为空时才设置actualResult字段
@@ -7,7 +7,11 @@
 if (typeof window.CacheManager === 'undefined') {
     window.CacheManager = class CacheManager {
     constructor() {
-        this.version = new Date().getTime();
+        // 构建后的 index.html 带有资源版本号，只有资源变化时才清理缓存；
+        // 直接使用源文件时每次加载都视为新版本
+        const versionMeta = document.querySelector('meta[name="asset-version"]');
+        this.version = versionMeta ? versionMeta.content : new Date().getTime();
+        this.fingerprinted = Boolean(versionMeta);
         this.init();
     }
 
@@ -81,6 +85,9 @@ if (typeof window.CacheManager === 'undefined') {
      * 获取带版本号的资源URL
      */
     getVersionedUrl(url) {
+        if (this.fingerprinted && /\.[0-9a-f]{10}\.(js|css)$/.test(url)) {
+            return url; // 文件名已包含内容哈希
+        }
         const separator = url.includes('?') ? '&' : '?';
         return `${url}${separator}v=${this.version}`;
     }
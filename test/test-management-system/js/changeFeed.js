@@ -0,0 +1,161 @@
+// 数据变更推送 - 通过 Server-Sent Events 接收后端的变更事件
+// 只重新获取发生变化的测试用例，不再重新加载完整列表
+class ChangeFeedClient {
+    constructor(baseUrl) {
+        this.url = `${baseUrl}/events`;
+        this.source = null;
+        // 批量变更超过该数量时通过 /api/changes 增量同步，不再逐个获取
+        this.batchSyncThreshold = 20;
+        // 已同步到的变更日志版本
+        this.changeVersion = null;
+    }
+
+    async start() {
+        if (typeof EventSource === 'undefined' || this.source) return;
+
+        try {
+            const response = await window.apiService.getChanges(0, 1);
+            this.changeVersion = response.data.latest_version;
+        } catch (error) {
+            console.warn('获取变更日志版本失败，批量变更时将重新加载全部数据:', error);
+        }
+
+        // 浏览器断线重连时会自动带上 Last-Event-ID，服务器从该版本补发事件
+        this.source = new EventSource(this.url);
+
+        this.source.addEventListener('test_case.created', (e) => this.handleTestCaseEvent(e));
+        this.source.addEventListener('test_case.updated', (e) => this.handleTestCaseEvent(e));
+        this.source.addEventListener('test_result.recorded', (e) => this.handleTestCaseEvent(e));
+        this.source.addEventListener('test_case.deleted', (e) => {
+            const data = JSON.parse(e.data);
+            this.removeTestCase(data.id);
+            this.notifyChanged();
+        });
+        ['module.created', 'module.updated', 'module.deleted', 'reset'].forEach(type => {
+            this.source.addEventListener(type, () => this.reloadAll());
+        });
+        this.source.onerror = () => {
+            console.warn('变更推送连接中断，浏览器将自动重连');
+        };
+    }
+
+    stop() {
+        if (this.source) {
+            this.source.close();
+            this.source = null;
+        }
+    }
+
+    async handleTestCaseEvent(e) {
+        const data = JSON.parse(e.data);
+        const ids = data.ids || data.test_case_ids || [data.test_case_id || data.id];
+        if (ids.length > this.batchSyncThreshold) {
+            await this.syncChanges();
+            return;
+        }
+        for (const id of ids) {
+            await this.refreshTestCase(id);
+        }
+        this.notifyChanged();
+    }
+
+    // 重新获取单个测试用例并在原位置更新
+    async refreshTestCase(id) {
+        const manager = window.testCaseManager;
+        if (!manager) return;
+
+        try {
+            const response = await window.apiService.getTestCase(id);
+            const testCase = window.DataTransformer.transformTestCase(response.data);
+            testCase.steps = (response.data.steps || []).map(step =>
+                typeof step === 'string' ? step : step.description
+            );
+            this.upsertTestCase(testCase);
+        } catch (error) {
+            // 事件到达前已被删除
+            this.removeTestCase(id);
+        }
+    }
+
+    upsertTestCase(testCase) {
+        const manager = window.testCaseManager;
+        let entry = manager.allTestCases.find(t => t.id === testCase.id);
+        if (entry) {
+            const moduleChanged = entry.module !== testCase.module;
+            // 保留对象引用，页面上已绑定的数据同步更新
+            Object.assign(entry, testCase);
+            if (!moduleChanged) return;
+            this.removeFromModule(entry.id);
+        } else {
+            entry = testCase;
+            manager.allTestCases.push(entry);
+        }
+        if (!manager.testCasesByModule[entry.module]) {
+            manager.testCasesByModule[entry.module] = [];
+        }
+        manager.testCasesByModule[entry.module].push(entry);
+    }
+
+    removeTestCase(id) {
+        const manager = window.testCaseManager;
+        if (!manager) return;
+        manager.allTestCases = manager.allTestCases.filter(t => t.id !== id);
+        this.removeFromModule(id);
+    }
+
+    removeFromModule(id) {
+        const manager = window.testCaseManager;
+        Object.keys(manager.testCasesByModule).forEach(moduleId => {
+            manager.testCasesByModule[moduleId] = manager.testCasesByModule[moduleId].filter(t => t.id !== id);
+        });
+    }
+
+    // 从变更日志获取上次同步之后的所有变更，只传输变化的数据
+    async syncChanges() {
+        if (!window.testCaseManager || this.changeVersion === null) {
+            await this.reloadAll();
+            return;
+        }
+        try {
+            let hasMore = true;
+            while (hasMore) {
+                const { data } = await window.apiService.getChanges(this.changeVersion);
+                if (data.reset || data.modules.length > 0 || data.deleted.modules.length > 0) {
+                    this.changeVersion = data.latest_version;
+                    await this.reloadAll();
+                    return;
+                }
+                data.test_cases.forEach(backendTestCase => {
+                    this.upsertTestCase(window.DataTransformer.transformTestCase(backendTestCase));
+                });
+                data.deleted.test_cases.forEach(id => this.removeTestCase(id));
+                this.changeVersion = data.version;
+                hasMore = data.has_more;
+            }
+            this.notifyChanged();
+        } catch (error) {
+            console.error('增量同步失败，重新加载全部数据:', error);
+            await this.reloadAll();
+        }
+    }
+
+    async reloadAll() {
+        if (!window.testCaseManager) return;
+        try {
+            await window.testCaseManager.loadFromAPI();
+            this.notifyChanged();
+        } catch (error) {
+            console.error('重新加载数据失败:', error);
+        }
+    }
+
+    notifyChanged() {
+        document.dispatchEvent(new CustomEvent('testCasesChanged'));
+    }
+}
+
+window.changeFeed = new ChangeFeedClient(window.apiService.baseUrl);
+document.addEventListener('testCasesLoaded', () => window.changeFeed.start(), { once: true });
+if (window.testCaseManager && window.testCaseManager.allTestCases.length > 0) {
+    window.changeFeed.start();
+}
@@ -19,7 +19,8 @@ if (typeof window.DataTransformer === 'undefined') {
             expectedResult: testCase.expected_result || testCase.expected,
             actualResult: testCase.actual_result,
             testDate: testCase.test_date,
-            executedBy: testCase.executed_by
+            executedBy: testCase.executed_by,
+            version: testCase.version
         }),
         transformTestCaseForBackend: (testCase) => ({
             title: testCase.title,
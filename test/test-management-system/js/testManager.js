@@ -111,6 +111,9 @@ class TestManager {
         
         this.setupEventListeners();
         this.updateStats();
+
+        // 其他页面或脚本修改数据后，changeFeed.js 更新 testCaseManager 并触发该事件
+        document.addEventListener('testCasesChanged', () => this.syncWithTestCaseManager());
         
         // 动态加载测试用例模块
         this.loadTestCaseModules();
@@ -522,6 +525,33 @@ class TestManager {
         }
     }
 
+    // 局部更新测试用例（PATCH），带上已知版本号避免覆盖他人的修改
+    async patchTestCase(testCase, changes) {
+        const headers = { 'Content-Type': 'application/json' };
+        if (testCase.version !== undefined && testCase.version !== null) {
+            headers['If-Match'] = `"${testCase.version}"`;
+        }
+
+        const response = await fetch(`/api/test-cases/${testCase.id}`, {
+            method: 'PATCH',
+            headers,
+            body: JSON.stringify(changes)
+        });
+
+        const result = await response.json();
+        if (response.status === 412) {
+            throw new Error('该测试用例已被其他人修改，请刷新页面后重试');
+        }
+        if (!response.ok) {
+            throw new Error(result.error || result.message || '更新失败');
+        }
+
+        if (result.data && result.data.version !== undefined) {
+            testCase.version = result.data.version;
+        }
+        return result.data;
+    }
+
     // 标记测试通过
     async markTestPassed(testId) {
         const testCase = this.allTestCases.find(tc => tc.id == testId);
@@ -531,33 +561,12 @@ class TestManager {
         }
 
         try {
-            // 准备API请求数据
-            const updateData = {
-                title: testCase.title,
-                description: testCase.description,
-                module_id: testCase.module_id || testCase.moduleId || testCase.module,
-                priority: testCase.priority,
+            // 只发送变化的字段
+            await this.patchTestCase(testCase, {
                 status: 'passed',
-                estimated_time: testCase.estimated_time || '',
-                expected_result: testCase.expected || testCase.expectedResult || '',
-                actual_result: testCase.actualResult || '',
                 executed_by: '手动测试'
-            };
-
-            // 调用API更新数据库
-            const response = await fetch(`/api/test-cases/${testCase.id}`, {
-                method: 'PUT',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(updateData)
             });
 
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.message || '更新失败');
-            }
-
             // 更新前端数据
             testCase.status = 'passed';
             testCase.testResult = '✅ 测试通过';
@@ -582,33 +591,12 @@ class TestManager {
         }
 
         try {
-            // 准备API请求数据
-            const updateData = {
-                title: testCase.title,
-                description: testCase.description,
-                module_id: testCase.module_id || testCase.moduleId || testCase.module,
-                priority: testCase.priority,
+            // 只发送变化的字段
+            await this.patchTestCase(testCase, {
                 status: 'failed',
-                estimated_time: testCase.estimated_time || '',
-                expected_result: testCase.expected || testCase.expectedResult || '',
-                actual_result: testCase.actualResult || '',
                 executed_by: '手动测试'
-            };
-
-            // 调用API更新数据库
-            const response = await fetch(`/api/test-cases/${testCase.id}`, {
-                method: 'PUT',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(updateData)
             });
 
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.message || '更新失败');
-            }
-
             // 更新前端数据
             testCase.status = 'failed';
             testCase.testResult = '❌ 测试失败';
@@ -633,33 +621,13 @@ class TestManager {
         }
 
         try {
-            // 准备API请求数据
-            const updateData = {
-                title: testCase.title,
-                description: testCase.description,
-                module_id: testCase.module_id || testCase.moduleId || testCase.module,
-                priority: testCase.priority,
+            // 只发送变化的字段，重置实际结果
+            await this.patchTestCase(testCase, {
                 status: 'pending',
-                estimated_time: testCase.estimated_time || '',
-                expected_result: testCase.expected || testCase.expectedResult || '',
-                actual_result: '', // 重置实际结果
+                actual_result: '',
                 executed_by: ''
-            };
-
-            // 调用API更新数据库
-            const response = await fetch(`/api/test-cases/${testCase.id}`, {
-                method: 'PUT',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(updateData)
             });
 
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.message || '更新失败');
-            }
-
             // 更新前端数据
             testCase.status = 'pending';
             delete testCase.testResult;
@@ -685,33 +653,12 @@ class TestManager {
         }
 
         try {
-            // 准备API请求数据
-            const updateData = {
-                title: testCase.title,
-                description: testCase.description,
-                module_id: testCase.module_id || testCase.moduleId || testCase.module,
-                priority: testCase.priority,
+            // 只发送变化的字段
+            await this.patchTestCase(testCase, {
                 status: 'passed',
-                estimated_time: testCase.estimated_time || '',
-                expected_result: testCase.expected || testCase.expectedResult || '',
-                actual_result: testCase.actualResult || '',
                 executed_by: '自动测试'
-            };
-
-            // 调用API更新数据库
-            const response = await fetch(`/api/test-cases/${testCase.id}`, {
-                method: 'PUT',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(updateData)
             });
 
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.message || '更新失败');
-            }
-
             // 更新前端数据
             testCase.status = 'passed';
             testCase.testResult = '✅ 测试通过';
@@ -728,14 +675,30 @@ class TestManager {
     }
 
     // 执行所有测试
-    runAllTests() {
+    async runAllTests() {
         if (confirm('确定要执行所有测试用例吗？这可能需要一些时间。')) {
+            try {
+                // 一个请求完成所有待执行用例的状态更新和执行记录
+                await window.apiService.batchUpdateStatus('passed', { status: 'pending' }, {
+                    record_results: true,
+                    executed_by: '自动化测试',
+                    actual_result: '批量自动化测试执行完成'
+                });
+            } catch (error) {
+                console.error('批量执行测试失败:', error);
+                alert(`操作失败: ${error.message}`);
+                return;
+            }
+
             this.allTestCases.forEach(testCase => {
                 if (testCase.status === 'pending') {
                     testCase.status = 'passed';
                     testCase.testResult = '🔄 批量自动化测试执行完成';
                     testCase.testDate = new Date().toLocaleDateString('zh-CN');
                     testCase.executedBy = '自动化测试';
+                    if (typeof testCase.version === 'number') {
+                        testCase.version += 1; // 与服务器端的版本号保持一致
+                    }
                 }
             });
             this.renderTestCases(this.getCurrentModule());
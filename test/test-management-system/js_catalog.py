@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+JS 测试用例目录文件解析
+testCases/*.js 中形如 const xxxTestCases = [ {...}, {...} ]; 的数组
+
+文件通过 mmap 只读映射，用正则在映射上跳到下一个括号/引号/注释，
+不读入整个文件、不切片复制数组内容，每次只解码一个测试用例对象，
+几百MB的生成文件也能以固定内存逐个导入
+
+解析结果缓存在 .parse_cache/ 中（配置 import_export.parse_cache），每个源文件一个缓存文件，
+按路径、修改时间、大小和内容哈希校验；文件未变化时所有脚本都直接读取缓存，不再扫描和解析
+
+用法:
+    python js_catalog.py <文件.js>...    # 输出每个文件的测试用例数量和解析耗时
+    python js_catalog.py --clear-cache    # 清空解析缓存
+"""
+
+import os
+import re
+import sys
+import mmap
+import time
+import pickle
+import shutil
+import hashlib
+import logging
+import tempfile
+from typing import List, Dict, Optional, Any, Iterator, Tuple
+
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 解析逻辑变化时递增，旧缓存自动失效
+CACHE_FORMAT = 3
+# 解析结果按块序列化，读取时每次只加载一块
+CACHE_CHUNK_SIZE = 1000
+
+# 测试用例数组声明
+DECLARATION_PATTERN = re.compile(rb'(?:const|let|var)\s+(\w*[Tt]est[Cc]ases?)\s*=\s*\[')
+
+# 数组内的记号：完整的字符串和注释（整体跳过）、括号；单独的引号表示字符串没有结束
+TOKEN_PATTERN = re.compile(
+    rb'"[^"\\\n]*(?:\\.[^"\\\n]*)*"|\'[^\'\\\n]*(?:\\.[^\'\\\n]*)*\'|`[^`\\]*(?:\\.[^`\\]*)*`'
+    rb'|//[^\n]*|/\*.*?\*/|[\[\]{}]|["\'`]|/\*',
+    re.DOTALL
+)
+OPEN_BRACE, CLOSE_BRACE, OPEN_BRACKET, CLOSE_BRACKET = b'{}[]'
+QUOTES = set(b'"\'`')
+SLASH = ord('/')
+
+# 对象字面量的记号（前面可以有空白和注释）：字符串 / 数字 / 标识符 / 标点
+LITERAL_TOKEN_PATTERN = re.compile(
+    r'''(?:\s+|//[^\n]*|/\*.*?\*/)*(?:'''
+    r'''"([^"\\]*(?:\\.[^"\\]*)*)"|'([^'\\]*(?:\\.[^'\\]*)*)'|`([^`\\]*(?:\\.[^`\\]*)*)`'''
+    r'''|(-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)|([A-Za-z_$][\w$]*)|([{}\[\]:,]))''',
+    re.DOTALL
+)
+KEYWORDS = {'true': True, 'false': False, 'null': None, 'undefined': None}
+ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '\\': '\\', "'": "'", '"': '"', '`': '`'}
+
+
+def iter_object_spans(buffer: Any, start: int = 0) -> Iterator[Tuple[int, int]]:
+    """
+    在缓冲区（bytes / mmap）中定位测试用例数组，逐个返回顶层对象的 (起始, 结束) 字节位置
+
+    Args:
+        buffer: 文件内容，可以是 mmap，不会被复制
+        start: 开始查找数组声明的位置
+    """
+    declaration = DECLARATION_PATTERN.search(buffer, start)
+    if not declaration:
+        return
+
+    depth = 0
+    object_start = None
+    for token in TOKEN_PATTERN.finditer(buffer, declaration.end()):
+        index = token.start()
+        char = buffer[index]
+        if char == OPEN_BRACE or char == OPEN_BRACKET:
+            if depth == 0 and char == OPEN_BRACE:
+                object_start = index
+            depth += 1
+        elif char == CLOSE_BRACE or char == CLOSE_BRACKET:
+            if depth == 0:
+                return  # 数组结束
+            depth -= 1
+            if depth == 0 and object_start is not None:
+                yield object_start, index + 1
+                object_start = None
+        elif token.end() - index == 1 and char in QUOTES:
+            raise ValueError(f"位置 {index} 的字符串没有结束")
+        elif char == SLASH and token.end() - index == 2 and buffer[index + 1] == ord('*'):
+            raise ValueError(f"位置 {index} 的注释没有结束")
+        # 其余为完整的字符串或注释，直接跳过
+    raise ValueError(f"测试用例数组没有结束（从位置 {declaration.start()} 开始）")
+
+
+def scan_object_texts(path: str) -> Iterator[str]:
+    """直接扫描文件，逐个返回测试用例对象的源码文本（不使用缓存）"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for start, end in iter_object_spans(buffer):
+                yield buffer[start:end].decode('utf-8')
+
+
+def unescape(value: str) -> str:
+    """处理JS字符串中的转义字符"""
+    if '\\' not in value:
+        return value
+    return re.sub(r'\\(.)', lambda m: ESCAPES.get(m.group(1), m.group(1)), value, flags=re.DOTALL)
+
+
+class _LiteralParser:
+    """JS 对象字面量的递归下降解析（字符串、数字、true/false/null、数组和嵌套对象）"""
+
+    def __init__(self, text: str):
+        self.text = text
+        # 一次切分全部记号，记号之间不能有无法识别的字符
+        self.tokens = LITERAL_TOKEN_PATTERN.finditer(text)
+        self.pos = 0
+
+    def next_token(self) -> Tuple[int, str, Any]:
+        """返回 (记号位置, 类型, 值)，类型为 value / name / punct"""
+        match = next(self.tokens, None)
+        if match is None or match.start() != self.pos:
+            raise ValueError(f"位置 {self.pos} 无法解析: {self.text[self.pos:self.pos + 20]!r}")
+        self.pos = match.end()
+        group = match.lastindex
+        if group == 6:
+            return match.start(6), 'punct', match.group(6)
+        if group <= 3:
+            return match.start(group), 'value', unescape(match.group(group))
+        if group == 4:
+            number = match.group(4)
+            return match.start(4), 'value', int(number) if number.lstrip('-').isdigit() else float(number)
+        return match.start(5), 'name', match.group(5)
+
+    def parse_value(self) -> Any:
+        index, kind, value = self.next_token()
+        return self._value(index, kind, value)
+
+    def _value(self, index: int, kind: str, value: Any) -> Any:
+        if kind == 'value':
+            return value
+        if kind == 'name':
+            if value in KEYWORDS:
+                return KEYWORDS[value]
+            raise ValueError(f"位置 {index} 的值 {value} 不是字面量（不支持变量、函数调用等表达式）")
+        if value == '{':
+            return self._object()
+        if value == '[':
+            return self._array()
+        raise ValueError(f"位置 {index} 出现了意外的 {value!r}")
+
+    def _object(self) -> Dict[str, Any]:
+        fields: Dict[str, Any] = {}
+        while True:
+            index, kind, key = self.next_token()
+            if kind == 'punct' and key == '}':
+                return fields
+            if kind == 'punct' or (kind == 'value' and not isinstance(key, str)):
+                raise ValueError(f"位置 {index} 应为字段名")
+            index, kind, colon = self.next_token()
+            if colon != ':':
+                raise ValueError(f"位置 {index} 应为冒号")
+            fields[key] = self.parse_value()
+            index, kind, separator = self.next_token()
+            if separator == '}':
+                return fields
+            if separator != ',':
+                raise ValueError(f"位置 {index} 应为逗号或 }}")
+
+    def _array(self) -> List[Any]:
+        items: List[Any] = []
+        while True:
+            index, kind, value = self.next_token()
+            if kind == 'punct' and value == ']':
+                return items
+            items.append(self._value(index, kind, value))
+            index, kind, separator = self.next_token()
+            if separator == ']':
+                return items
+            if separator != ',':
+                raise ValueError(f"位置 {index} 应为逗号或 ]")
+
+
+def parse_object(text: str) -> Dict[str, Any]:
+    """
+    解析测试用例对象字面量
+    字段值可以是字符串、数字、布尔、null、数组和嵌套对象（保持原有结构）；
+    其他表达式（变量、函数调用等）或语法错误抛出 ValueError
+    """
+    parser = _LiteralParser(text)
+    index, kind, value = parser.next_token()
+    if value != '{':
+        raise ValueError(f"位置 {index} 应为对象")
+    return parser._object()
+
+
+def parse_record(text: str, path: str, number: int) -> Dict[str, Any]:
+    """解析文件中第 number 个测试用例；无法解析时记录警告并返回空字典（迭代时跳过）"""
+    try:
+        return parse_object(text)
+    except ValueError as e:
+        logger.warning("%s 中第 %d 个测试用例无法解析，已跳过: %s", path, number, e)
+        return {}
+
+
+def file_sha256(path: str) -> str:
+    """分块计算文件内容哈希"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    解析结果的磁盘缓存
+    
+    缓存文件依次保存: 头部 {format, path, mtime_ns, size, sha256, count, chunks}、按块序列化的解析结果。
+    修改时间和大小与头部一致时直接使用；不一致但内容哈希相同（如重新检出）时刷新头部后继续使用
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def cache_file(self, path: str) -> str:
+        name = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:20]
+        return os.path.join(self.directory, f'{name}.pickle')
+
+    @staticmethod
+    def read_header(cache_file: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(cache_file, 'rb') as f:
+                header = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+        if not isinstance(header, dict) or header.get('format') != CACHE_FORMAT:
+            return None
+        return header
+
+    def lookup(self, path: str) -> Optional[str]:
+        """返回有效的缓存文件路径，没有或已过期时返回 None"""
+        cache_file = self.cache_file(path)
+        header = self.read_header(cache_file)
+        if header is None or header['path'] != os.path.abspath(path):
+            return None
+        stat = os.stat(path)
+        if header['mtime_ns'] == stat.st_mtime_ns and header['size'] == stat.st_size:
+            return cache_file
+        if header['size'] == stat.st_size and header['sha256'] == file_sha256(path):
+            header['mtime_ns'] = stat.st_mtime_ns
+            self._write(cache_file, header, lambda out: self._copy_body(cache_file, out))
+            return cache_file
+        return None
+
+    def build(self, path: str) -> str:
+        """扫描并解析源文件，写入缓存文件"""
+        stat = os.stat(path)
+        sha256 = file_sha256(path)
+        count = 0
+        chunks = 0
+        with tempfile.TemporaryFile(dir=self.directory) as records:
+            chunk: List[Dict[str, Any]] = []
+            with open(path, 'rb') as f:
+                if stat.st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                        for start, end in iter_object_spans(buffer):
+                            count += 1
+                            chunk.append(parse_record(buffer[start:end].decode('utf-8'), path, count))
+                            if len(chunk) >= CACHE_CHUNK_SIZE:
+                                pickle.dump(chunk, records, pickle.HIGHEST_PROTOCOL)
+                                chunks += 1
+                                chunk = []
+            if chunk:
+                pickle.dump(chunk, records, pickle.HIGHEST_PROTOCOL)
+                chunks += 1
+
+            header = {
+                'format': CACHE_FORMAT,
+                'path': os.path.abspath(path),
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'sha256': sha256,
+                'count': count,
+                'chunks': chunks
+            }
+            records.seek(0)
+            cache_file = self.cache_file(path)
+            self._write(cache_file, header, lambda out: shutil.copyfileobj(records, out))
+        return cache_file
+
+    @staticmethod
+    def _copy_body(cache_file: str, out: Any) -> None:
+        with open(cache_file, 'rb') as f:
+            pickle.load(f)
+            shutil.copyfileobj(f, out)
+
+    def _write(self, cache_file: str, header: Dict[str, Any], write_body: Any) -> None:
+        """写入临时文件后原子替换，并发运行的脚本不会读到不完整的缓存"""
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                pickle.dump(header, out, pickle.HIGHEST_PROTOCOL)
+                write_body(out)
+            os.replace(temp_path, cache_file)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    @staticmethod
+    def iter_records(cache_file: str) -> Iterator[Dict[str, Any]]:
+        with open(cache_file, 'rb') as f:
+            header = pickle.load(f)
+            for _ in range(header['chunks']):
+                yield from pickle.load(f)
+
+    def clear(self) -> int:
+        """删除所有缓存文件，返回删除数量"""
+        if not os.path.isdir(self.directory):
+            return 0
+        removed = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(('.pickle', '.tmp')):
+                os.unlink(os.path.join(self.directory, name))
+                removed += 1
+        return removed
+
+
+_cache: Optional[ParseCache] = None
+
+
+def get_cache() -> Optional[ParseCache]:
+    """按配置返回解析缓存，未启用时返回 None"""
+    global _cache
+    if not get_config('import_export.parse_cache', True):
+        return None
+    if _cache is None:
+        directory = get_config('import_export.parse_cache_dir', '.parse_cache')
+        _cache = ParseCache(directory if os.path.isabs(directory) else os.path.join(BASE_DIR, directory))
+    return _cache
+
+
+def cached_file(path: str) -> Optional[str]:
+    """获取源文件的有效缓存（没有时解析并写入），缓存不可用时返回 None"""
+    cache = get_cache()
+    if cache is None:
+        return None
+    try:
+        os.makedirs(cache.directory, exist_ok=True)
+        return cache.lookup(path) or cache.build(path)
+    except OSError as e:
+        logger.warning("解析缓存不可用，直接解析 %s: %s", path, e)
+        return None
+
+
+def count_test_cases(path: str) -> int:
+    """统计文件中的测试用例数量（不解码对象内容）"""
+    cache_file = cached_file(path)
+    if cache_file is not None:
+        return ParseCache.read_header(cache_file)['count']
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return sum(1 for _ in iter_object_spans(buffer))
+
+
+def iter_test_cases(path: str) -> Iterator[Dict[str, Any]]:
+    """逐个返回文件中解析后的测试用例（缓存有效时直接读取解析结果）"""
+    cache_file = cached_file(path)
+    if cache_file is not None:
+        records: Iterator[Dict[str, Any]] = ParseCache.iter_records(cache_file)
+    else:
+        records = (parse_record(text, path, number)
+                   for number, text in enumerate(scan_object_texts(path), 1))
+    for fields in records:
+        if fields:
+            yield fields
+
+
+def step_texts(steps: Any) -> List[str]:
+    """步骤字段统一为文本列表：对象形式的步骤（{description, expected_result}）取 description，忽略空步骤"""
+    if not isinstance(steps, list):
+        return []
+    texts = []
+    for step in steps:
+        if isinstance(step, dict):
+            step = step.get('description')
+        text = str(step).strip() if step is not None else ''
+        if text:
+            texts.append(text)
+    return texts
+
+
+def text_field(case: Dict[str, Any], name: str, default: str = '') -> str:
+    """字符串字段的值，缺失、为空或不是字符串时返回 default"""
+    value = case.get(name)
+    return value if isinstance(value, str) and value else default
+
+
+# 按 id / category 组织的目录文件中导入脚本使用的字段
+IMPORT_FIELDS = ('category', 'title', 'description', 'expected', 'status', 'priority', 'estimatedTime')
+
+
+def import_fields(case: Dict[str, Any]) -> Dict[str, Any]:
+    """取出导入脚本使用的字段：id 为整数，文本字段非空，steps 为文本列表"""
+    fields: Dict[str, Any] = {}
+    if isinstance(case.get('id'), int) and not isinstance(case['id'], bool):
+        fields['id'] = case['id']
+    for name in IMPORT_FIELDS:
+        value = text_field(case, name)
+        if value:
+            fields[name] = value
+    if 'steps' in case:
+        fields['steps'] = step_texts(case['steps'])
+    return fields
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("用法: python js_catalog.py <文件.js>... | --clear-cache")
+        sys.exit(1)
+    if sys.argv[1] == '--clear-cache':
+        cache = get_cache()
+        removed = cache.clear() if cache else 0
+        print(f"🧹 已删除 {removed} 个解析缓存文件")
+        sys.exit(0)
+    for path in sys.argv[1:]:
+        started = time.perf_counter()
+        try:
+            count = sum(1 for _ in iter_test_cases(path))
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            print(f"❌ {path}: {e}")
+            continue
+        size = os.path.getsize(path)
+        print(f"📄 {path}: {count} 个测试用例，{size / 1024 / 1024:.1f}MB，"
+              f"耗时 {(time.perf_counter() - started) * 1000:.0f}ms")
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+数据库维护
+反复清空重新导入和执行结果的增删会让数据库文件产生大量空闲页，查询规划器也缺少统计信息。
+API 服务器空闲时按配置的间隔执行（config.py maintenance 部分）:
+
+    analyze             ANALYZE，重新收集所有索引的统计信息
+    optimize            PRAGMA optimize，只分析统计信息可能过期的表
+    incremental_vacuum  PRAGMA incremental_vacuum，回收空闲页（需要 auto_vacuum = INCREMENTAL，新建数据库时设置）
+    wal_checkpoint      PRAGMA wal_checkpoint(TRUNCATE)，把 WAL 写回数据库并截断 WAL 文件
+
+各任务最近的执行时间、耗时和结果在 GET /api/health 的 maintenance 中返回
+
+用法:
+    python maintenance.py [任务...]                 # 立即执行（默认全部任务）
+    python maintenance.py --enable-incremental-vacuum   # 已有数据库改为 auto_vacuum = INCREMENTAL（执行一次 VACUUM）
+"""
+
+import sys
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional, Any, Callable
+
+from config import get_config
+from database import TestDatabase
+
+logger = logging.getLogger(__name__)
+
+# auto_vacuum 的取值: 0 NONE, 1 FULL, 2 INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def run_analyze(conn: sqlite3.Connection, settings: Dict[str, Any]) -> str:
+    conn.execute('ANALYZE')
+    return 'ok'
+
+
+def run_optimize(conn: sqlite3.Connection, settings: Dict[str, Any]) -> str:
+    conn.execute('PRAGMA optimize')
+    return 'ok'
+
+
+def run_incremental_vacuum(conn: sqlite3.Connection, settings: Dict[str, Any]) -> str:
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+        return 'skipped: auto_vacuum 未启用（python maintenance.py --enable-incremental-vacuum）'
+    free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    if free_pages < settings.get('vacuum_min_free_pages', 256):
+        return f'skipped: {free_pages} 个空闲页'
+    pages = min(free_pages, settings.get('vacuum_pages', 2000))
+    # 该语句每执行一步回收一页，executescript 会执行到结束（execute 只执行一步）
+    conn.executescript(f'PRAGMA incremental_vacuum({int(pages)});')
+    remaining = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    return f'回收 {free_pages - remaining} 页，剩余空闲页 {remaining}'
+
+
+def run_wal_checkpoint(conn: sqlite3.Connection, settings: Dict[str, Any]) -> str:
+    if conn.execute('PRAGMA journal_mode').fetchone()[0] != 'wal':
+        return 'skipped: 未使用 WAL'
+    busy, log_frames, checkpointed = conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+    if busy:
+        return f'busy: 写回 {checkpointed}/{log_frames} 帧'
+    return f'写回 {checkpointed} 帧'
+
+
+# 任务名称 -> (执行函数, 间隔配置项)，按执行顺序排列（回收空闲页后再写回 WAL）
+TASKS: Dict[str, Any] = {
+    'analyze': (run_analyze, 'analyze_interval'),
+    'optimize': (run_optimize, 'optimize_interval'),
+    'incremental_vacuum': (run_incremental_vacuum, 'vacuum_interval'),
+    'wal_checkpoint': (run_wal_checkpoint, 'checkpoint_interval')
+}
+
+
+class MaintenanceScheduler:
+    """后台线程在数据库空闲时执行到期的维护任务"""
+
+    def __init__(self, db: TestDatabase, settings: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            db: 数据库（通过 last_activity 判断空闲）
+            settings: 维护配置，默认读取 config.py 的 maintenance 部分
+        """
+        self.db = db
+        self.settings = settings if settings is not None else get_config('maintenance', {})
+        self.status: Dict[str, Dict[str, Any]] = {
+            name: {'last_run': None, 'duration_ms': None, 'result': None, 'error': None}
+            for name in TASKS
+        }
+        # 任务上次执行的时间（time.monotonic），没有执行过的任务在第一次空闲时执行
+        self._last_run: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sqlite-maintenance', daemon=True)
+
+    def start(self) -> 'MaintenanceScheduler':
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def is_idle(self) -> bool:
+        return time.monotonic() - self.db.last_activity >= self.settings.get('idle_seconds', 30)
+
+    def due_tasks(self) -> List[str]:
+        """已到执行间隔的任务"""
+        now = time.monotonic()
+        return [
+            name for name, (_, interval_key) in TASKS.items()
+            if name not in self._last_run
+            or now - self._last_run[name] >= self.settings.get(interval_key, 3600)
+        ]
+
+    def run_tasks(self, names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        立即执行维护任务（不检查是否空闲）
+
+        Args:
+            names: 任务名称，默认全部任务
+        """
+        names = [name for name in TASKS if names is None or name in names]
+        with self._lock:
+            conn = self.db.get_connection(background=True)
+            conn.isolation_level = None  # 维护语句不能在事务中执行
+            conn.execute('PRAGMA busy_timeout = 30000')
+            try:
+                for name in names:
+                    self._run_task(conn, name)
+            finally:
+                conn.close()
+        return {name: self.status[name] for name in names}
+
+    def _run_task(self, conn: sqlite3.Connection, name: str) -> None:
+        function: Callable[[sqlite3.Connection, Dict[str, Any]], str] = TASKS[name][0]
+        started = time.perf_counter()
+        status = {'last_run': datetime.now().isoformat(), 'result': None, 'error': None}
+        try:
+            status['result'] = function(conn, self.settings)
+        except sqlite3.Error as e:
+            status['error'] = str(e)
+            logger.warning("数据库维护任务 %s 失败: %s", name, e)
+        status['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        self.status[name] = status
+        self._last_run[name] = time.monotonic()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.settings.get('check_interval', 60)):
+            if not self.is_idle():
+                continue
+            for name in self.due_tasks():
+                # 每个任务执行前重新确认空闲，有请求到达时推迟剩余任务
+                if self._stop.is_set() or not self.is_idle():
+                    break
+                try:
+                    self.run_tasks([name])
+                except Exception as e:
+                    logger.error("数据库维护失败: %s", e)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """维护状态（/api/health）"""
+        return {
+            'idle': self.is_idle(),
+            'tasks': {name: dict(status) for name, status in self.status.items()}
+        }
+
+
+def enable_incremental_vacuum(db_path: str) -> None:
+    """已有数据库改为 auto_vacuum = INCREMENTAL（需要执行一次完整 VACUUM，期间数据库被锁定）"""
+    conn = sqlite3.connect(db_path, timeout=30.0)
+    conn.isolation_level = None
+    try:
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('VACUUM')
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    db_path = get_config('database.path', 'test_management.db')
+    args = sys.argv[1:]
+    if '--enable-incremental-vacuum' in args:
+        started = time.perf_counter()
+        enable_incremental_vacuum(db_path)
+        print(f"✅ 已启用增量 VACUUM（{db_path}），耗时 {(time.perf_counter() - started) * 1000:.0f}ms")
+        sys.exit(0)
+
+    unknown = [name for name in args if name not in TASKS]
+    if unknown:
+        print(f"❌ 未知的维护任务: {', '.join(unknown)}（可选: {', '.join(TASKS)}）")
+        sys.exit(1)
+
+    scheduler = MaintenanceScheduler(TestDatabase(db_path))
+    print(f"🔧 数据库维护: {db_path}")
+    for name, status in scheduler.run_tasks(args or None).items():
+        if status['error']:
+            print(f"   ❌ {name}: {status['error']}")
+        else:
+            print(f"   ✅ {name}: {status['result']}（{status['duration_ms']:.0f}ms）")
@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+测试用例管理系统数据库迁移模块
+基于 PRAGMA user_version 的版本化迁移，由 TestDatabase.init_database() 自动执行
+
+每个迁移由若干步骤组成，步骤各自在短事务中提交，不会在整个迁移期间持有写锁；
+所有步骤都是幂等的，迁移中断后重新启动会从中断处继续，全部完成后才更新 user_version。
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import time
+import shutil
+import logging
+import tempfile
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Any, Callable, Iterator
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def immediate_transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """在自动提交模式的连接上开启 BEGIN IMMEDIATE 短事务"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    else:
+        conn.execute('COMMIT')
+
+
+class MigrationStep:
+    """迁移步骤基类"""
+
+    def apply(self, conn: sqlite3.Connection, runner: 'MigrationRunner') -> None:
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        return self.__class__.__name__
+
+
+class ExecuteSQL(MigrationStep):
+    """执行一条幂等的SQL语句"""
+
+    def __init__(self, sql: str):
+        self.sql = sql
+
+    def apply(self, conn: sqlite3.Connection, runner: 'MigrationRunner') -> None:
+        with immediate_transaction(conn):
+            conn.execute(self.sql)
+
+    def describe(self) -> str:
+        return ' '.join(self.sql.split())[:80]
+
+
+class AddColumn(MigrationStep):
+    """添加字段（字段已存在时跳过）"""
+
+    def __init__(self, table: str, column: str, definition: str):
+        self.table = table
+        self.column = column
+        self.definition = definition
+
+    def apply(self, conn: sqlite3.Connection, runner: 'MigrationRunner') -> None:
+        with immediate_transaction(conn):
+            columns = [row[1] for row in conn.execute(f'PRAGMA table_info({self.table})')]
+            if self.column not in columns:
+                conn.execute(f'ALTER TABLE {self.table} ADD COLUMN {self.column} {self.definition}')
+
+    def describe(self) -> str:
+        return f'添加字段 {self.table}.{self.column}'
+
+
+class CreateIndex(MigrationStep):
+    """
+    创建索引
+    SQLite 的 CREATE INDEX 只能在单个语句内完成，这里每个索引使用独立的短事务，
+    索引之间会释放写锁，让其他写入得以穿插执行
+    """
+
+    def __init__(self, name: str, table: str, columns: List[str],
+                 where: Optional[str] = None, unique: bool = False):
+        self.name = name
+        self.table = table
+        self.columns = columns
+        self.where = where
+        self.unique = unique
+
+    def sql(self) -> str:
+        unique = 'UNIQUE ' if self.unique else ''
+        where = f' WHERE {self.where}' if self.where else ''
+        return (f'CREATE {unique}INDEX IF NOT EXISTS {self.name} '
+                f'ON {self.table}({", ".join(self.columns)}){where}')
+
+    def apply(self, conn: sqlite3.Connection, runner: 'MigrationRunner') -> None:
+        with immediate_transaction(conn):
+            conn.execute(self.sql())
+        runner.pause()
+
+    def describe(self) -> str:
+        return f'创建索引 {self.name}'
+
+
+class DropIndex(MigrationStep):
+    """删除索引（不存在时跳过）"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def apply(self, conn: sqlite3.Connection, runner: 'MigrationRunner') -> None:
+        with immediate_transaction(conn):
+            conn.execute(f'DROP INDEX IF EXISTS {self.name}')
+
+    def describe(self) -> str:
+        return f'删除索引 {self.name}'
+
+
+class RebuildTable(MigrationStep):
+    """
+    在线重建表
+
+    1. 以 create_sql 创建影子表 _<table>_rebuild（create_sql 中用 {table} 表示表名）
+    2. 在原表上安装触发器，把复制期间的增删改同步到影子表
+    3. 按主键分批复制数据，每批一个短事务，批次之间释放写锁
+    4. 在一个短事务内删除原表、重命名影子表，并重建原表上的索引和触发器
+
+    中断后重新执行会复用已存在的影子表和触发器；复制时跳过影子表中已有的主键，
+    不会覆盖触发器同步过来的较新数据，违反新约束的行会直接报错而不是被静默丢弃。
+    """
+
+    def __init__(self, table: str, create_sql: str, columns: List[str], key: str = 'id'):
+        self.table = table
+        self.create_sql = create_sql
+        self.columns = columns
+        self.key = key
+
+    @property
+    def shadow(self) -> str:
+        return f'_{self.table}_rebuild'
+
+    @property
+    def sync_triggers(self) -> List[str]:
+        return [f'{self.shadow}_{suffix}' for suffix in ('ai', 'au', 'ad')]
+
+    def apply(self, conn: sqlite3.Connection, runner: 'MigrationRunner') -> None:
+        shadow = self.shadow
+        cols = ', '.join(self.columns)
+        new_values = ', '.join(f'NEW.{col}' for col in self.columns)
+
+        with immediate_transaction(conn):
+            conn.execute(self.create_sql.format(table=shadow))
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {shadow}_ai AFTER INSERT ON {self.table} BEGIN
+                    INSERT OR REPLACE INTO {shadow} ({cols}) VALUES ({new_values});
+                END
+            ''')
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {shadow}_au AFTER UPDATE ON {self.table} BEGIN
+                    DELETE FROM {shadow} WHERE {self.key} = OLD.{self.key};
+                    INSERT OR REPLACE INTO {shadow} ({cols}) VALUES ({new_values});
+                END
+            ''')
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {shadow}_ad AFTER DELETE ON {self.table} BEGIN
+                    DELETE FROM {shadow} WHERE {self.key} = OLD.{self.key};
+                END
+            ''')
+
+        # 分批复制：触发器安装后新插入的行已同步到影子表，只需复制到当前最大主键为止
+        high_water = conn.execute(f'SELECT MAX({self.key}) FROM {self.table}').fetchone()[0]
+        last_key = None
+        copied = 0
+        while high_water is not None:
+            with immediate_transaction(conn):
+                params: tuple = ((high_water, runner.batch_size) if last_key is None
+                                 else (last_key, high_water, runner.batch_size))
+                where = (f'WHERE {self.key} <= ?' if last_key is None
+                         else f'WHERE {self.key} > ? AND {self.key} <= ?')
+                row = conn.execute(f'''
+                    SELECT MAX({self.key}), COUNT(*) FROM (
+                        SELECT {self.key} FROM {self.table} {where} ORDER BY {self.key} LIMIT ?
+                    )
+                ''', params).fetchone()
+                batch_end, batch_count = row[0], row[1]
+                if not batch_count:
+                    break
+
+                range_where = (f'src.{self.key} <= ?' if last_key is None
+                               else f'src.{self.key} > ? AND src.{self.key} <= ?')
+                range_params = (batch_end,) if last_key is None else (last_key, batch_end)
+                conn.execute(f'''
+                    INSERT INTO {shadow} ({cols})
+                    SELECT {cols} FROM {self.table} src WHERE {range_where}
+                      AND NOT EXISTS (SELECT 1 FROM {shadow} dst WHERE dst.{self.key} = src.{self.key})
+                ''', range_params)
+
+            copied += batch_count
+            last_key = batch_end
+            logger.info("重建表 %s: 已复制 %d 行", self.table, copied)
+            runner.pause()
+
+        # 切换：原表上的索引和触发器需要在新表上重建
+        with immediate_transaction(conn):
+            dependents = [
+                row[0] for row in conn.execute('''
+                    SELECT sql FROM sqlite_master
+                    WHERE tbl_name = ? AND type IN ('index', 'trigger')
+                      AND sql IS NOT NULL AND name NOT IN (?, ?, ?)
+                ''', (self.table, *self.sync_triggers))
+            ]
+            for trigger in self.sync_triggers:
+                conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            conn.execute(f'DROP TABLE {self.table}')
+            conn.execute(f'ALTER TABLE {shadow} RENAME TO {self.table}')
+            for sql in dependents:
+                conn.execute(sql)
+
+    def describe(self) -> str:
+        return f'重建表 {self.table}'
+
+
+def change_log_steps() -> List[MigrationStep]:
+    """
+    变更日志（增量同步 GET /api/changes）
+    
+    触发器把每次增删改记录到 change_log，每行数据只保留最新的一条记录
+    （INSERT OR REPLACE 会分配新的自增版本号），日志大小与数据行数成正比。
+    步骤归属于测试用例，步骤变化记为所属测试用例的更新；
+    删除模块时同时为其测试用例写入删除记录（列表接口不再返回这些用例）。
+    """
+    def log(table: str, row_id: str, operation: str) -> str:
+        return (f"INSERT OR REPLACE INTO change_log (table_name, row_id, operation) "
+                f"VALUES ('{table}', {row_id}, '{operation}');")
+
+    def touch_test_case(ref: str) -> str:
+        return (f"INSERT OR REPLACE INTO change_log (table_name, row_id, operation) "
+                f"SELECT 'test_cases', id, 'upsert' FROM test_cases WHERE id = {ref}.test_case_id;")
+
+    steps: List[MigrationStep] = [
+        ExecuteSQL('''
+            CREATE TABLE IF NOT EXISTS change_log (
+                version INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                operation TEXT NOT NULL CHECK (operation IN ('upsert', 'delete')),
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (table_name, row_id)
+            )
+        '''),
+    ]
+    for table in ('test_modules', 'test_cases', 'test_results'):
+        on_delete = log(table, 'OLD.id', 'delete')
+        if table == 'test_modules':
+            on_delete += (" INSERT OR REPLACE INTO change_log (table_name, row_id, operation) "
+                          "SELECT 'test_cases', id, 'delete' FROM test_cases WHERE module_id = OLD.id;")
+        steps += [
+            ExecuteSQL(f'''
+                CREATE TRIGGER IF NOT EXISTS change_log_{table}_ai AFTER INSERT ON {table} BEGIN
+                    {log(table, 'NEW.id', 'upsert')}
+                END
+            '''),
+            ExecuteSQL(f'''
+                CREATE TRIGGER IF NOT EXISTS change_log_{table}_au AFTER UPDATE ON {table} BEGIN
+                    {log(table, 'NEW.id', 'upsert')}
+                END
+            '''),
+            ExecuteSQL(f'''
+                CREATE TRIGGER IF NOT EXISTS change_log_{table}_ad AFTER DELETE ON {table} BEGIN
+                    {on_delete}
+                END
+            '''),
+        ]
+    steps += [
+        ExecuteSQL(f'''
+            CREATE TRIGGER IF NOT EXISTS change_log_test_steps_ai AFTER INSERT ON test_steps BEGIN
+                {touch_test_case('NEW')}
+            END
+        '''),
+        ExecuteSQL(f'''
+            CREATE TRIGGER IF NOT EXISTS change_log_test_steps_au AFTER UPDATE ON test_steps BEGIN
+                {touch_test_case('OLD')}
+                {touch_test_case('NEW')}
+            END
+        '''),
+        ExecuteSQL(f'''
+            CREATE TRIGGER IF NOT EXISTS change_log_test_steps_ad AFTER DELETE ON test_steps BEGIN
+                {touch_test_case('OLD')}
+            END
+        '''),
+    ]
+    # 已有数据记为初始版本，客户端从 since=0 开始同步即可获得完整数据
+    for table in ('test_modules', 'test_cases', 'test_results'):
+        steps.append(ExecuteSQL(f'''
+            INSERT OR IGNORE INTO change_log (table_name, row_id, operation)
+            SELECT '{table}', id, 'upsert' FROM {table} ORDER BY id
+        '''))
+    return steps
+
+
+class Migration:
+    """一个版本的迁移"""
+
+    def __init__(self, version: int, description: str, steps: List[MigrationStep]):
+        self.version = version
+        self.description = description
+        self.steps = steps
+
+
+# 迁移列表，版本号必须递增；已发布的迁移不要修改，新的变更追加新版本
+MIGRATIONS: List[Migration] = [
+    Migration(1, '模块排序字段', [
+        AddColumn('test_modules', 'sort_order', 'INTEGER DEFAULT 999'),
+    ]),
+    Migration(2, '按查询形态设计的复合索引', [
+        # 按模块过滤并按创建时间倒序：索引有序，无需临时排序
+        CreateIndex('idx_test_cases_module_created', 'test_cases', ['module_id', 'created_at', 'id']),
+        CreateIndex('idx_test_cases_created', 'test_cases', ['created_at', 'id']),
+        CreateIndex('idx_test_steps_case_step', 'test_steps', ['test_case_id', 'step_number']),
+        CreateIndex('idx_test_results_case_executed', 'test_results', ['test_case_id', 'executed_at']),
+        # 未通过用例通常只占少数，部分索引体积小、维护成本低
+        CreateIndex('idx_test_cases_not_passed', 'test_cases', ['module_id', 'status'],
+                    where="status != 'passed'"),
+        # 以下单列索引已是复合索引的前缀
+        DropIndex('idx_test_cases_module_id'),
+        DropIndex('idx_test_steps_test_case_id'),
+        DropIndex('idx_test_results_test_case_id'),
+    ]),
+    Migration(3, '测试用例版本号（乐观并发控制）', [
+        AddColumn('test_cases', 'version', 'INTEGER NOT NULL DEFAULT 1'),
+    ]),
+    Migration(4, '变更日志（增量同步）', change_log_steps()),
+]
+
+
+class MigrationRunner:
+    """迁移执行器"""
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection],
+                 migrations: Optional[List[Migration]] = None,
+                 batch_size: int = 1000, pause_seconds: float = 0.01):
+        """
+        Args:
+            connect: 返回新数据库连接的函数
+            migrations: 迁移列表，默认为 MIGRATIONS
+            batch_size: 重建表时每批复制的行数
+            pause_seconds: 批次之间让出写锁的时间
+        """
+        self.connect = connect
+        self.migrations = sorted(migrations if migrations is not None else MIGRATIONS,
+                                 key=lambda m: m.version)
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+
+    def pause(self) -> None:
+        """批次之间暂停，让其他连接获得写锁"""
+        if self.pause_seconds > 0:
+            time.sleep(self.pause_seconds)
+
+    def open_connection(self) -> sqlite3.Connection:
+        conn = self.connect()
+        conn.isolation_level = None  # 由迁移步骤自行控制事务
+        conn.execute('PRAGMA busy_timeout = 30000')
+        return conn
+
+    @staticmethod
+    def get_version(conn: sqlite3.Connection) -> int:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+
+    def latest_version(self) -> int:
+        return self.migrations[-1].version if self.migrations else 0
+
+    def status(self) -> Dict[str, Any]:
+        """获取当前版本和待执行的迁移"""
+        conn = self.open_connection()
+        try:
+            current = self.get_version(conn)
+        finally:
+            conn.close()
+        return {
+            'current_version': current,
+            'latest_version': self.latest_version(),
+            'pending': [
+                {'version': m.version, 'description': m.description}
+                for m in self.migrations if m.version > current
+            ]
+        }
+
+    def run(self, target: Optional[int] = None) -> int:
+        """
+        执行待处理的迁移
+
+        Args:
+            target: 目标版本，默认迁移到最新
+
+        Returns:
+            执行的迁移数量
+        """
+        conn = self.open_connection()
+        applied = 0
+        try:
+            current = self.get_version(conn)
+            for migration in self.migrations:
+                if migration.version <= current:
+                    continue
+                if target is not None and migration.version > target:
+                    break
+
+                logger.info("执行迁移 v%d: %s", migration.version, migration.description)
+                started = time.perf_counter()
+                for step in migration.steps:
+                    logger.info("  - %s", step.describe())
+                    step.apply(conn, self)
+
+                # 其他进程可能已并发完成了同一迁移，版本号只增不减
+                if self.get_version(conn) < migration.version:
+                    conn.execute(f'PRAGMA user_version = {int(migration.version)}')
+                current = migration.version
+                applied += 1
+                logger.info("迁移 v%d 完成，耗时 %.2fs", migration.version,
+                            time.perf_counter() - started)
+        finally:
+            conn.close()
+        return applied
+
+
+def check_rebuild(db_path: str, table: str = 'test_steps', batch_size: int = 100) -> Dict[str, Any]:
+    """
+    在数据库的临时副本上按原表结构执行一次 RebuildTable，检查数据、索引和触发器是否完整保留
+
+    Args:
+        db_path: 数据库路径（只读取，不修改）
+        table: 要重建的表
+        batch_size: 每批复制的行数，较小的值可以覆盖多批次复制
+
+    Returns:
+        {'table', 'rows', 'batches', 'duration_ms'}
+
+    Raises:
+        RuntimeError: 重建后的数据或结构与原表不一致
+    """
+    scratch_dir = tempfile.mkdtemp(prefix='rebuild-check-')
+    scratch_path = os.path.join(scratch_dir, 'scratch.db')
+    try:
+        source = sqlite3.connect(f'file:{quote(os.path.abspath(db_path))}?mode=ro', uri=True)
+        target = sqlite3.connect(scratch_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+        runner = MigrationRunner(lambda: sqlite3.connect(scratch_path),
+                                 batch_size=batch_size, pause_seconds=0)
+        conn = runner.open_connection()
+        try:
+            row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                               (table,)).fetchone()
+            if row is None:
+                raise RuntimeError(f"表 {table} 不存在")
+            create_sql = re.sub(rf'^CREATE TABLE (IF NOT EXISTS )?"?{table}"?',
+                                'CREATE TABLE IF NOT EXISTS {table}', row[0].strip())
+            columns = [info[1] for info in conn.execute(f'PRAGMA table_info({table})')]
+
+            def fingerprint() -> Dict[str, Any]:
+                return {
+                    'rows': conn.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid").fetchall(),
+                    'dependents': sorted(conn.execute('''
+                        SELECT type, name, sql FROM sqlite_master
+                        WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL
+                    ''', (table,)).fetchall())
+                }
+
+            before = fingerprint()
+            started = time.perf_counter()
+            RebuildTable(table, create_sql, columns).apply(conn, runner)
+            duration_ms = (time.perf_counter() - started) * 1000
+            after = fingerprint()
+
+            if after['rows'] != before['rows']:
+                raise RuntimeError(f"重建后 {table} 的数据不一致")
+            if after['dependents'] != before['dependents']:
+                raise RuntimeError(f"重建后 {table} 的索引或触发器不一致")
+            integrity = conn.execute('PRAGMA integrity_check').fetchone()[0]
+            if integrity != 'ok' or conn.execute('PRAGMA foreign_key_check').fetchall():
+                raise RuntimeError(f"重建后数据库完整性检查失败: {integrity}")
+        finally:
+            conn.close()
+        return {
+            'table': table,
+            'rows': len(before['rows']),
+            'batches': -(-len(before['rows']) // batch_size),
+            'duration_ms': round(duration_ms, 1)
+        }
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    # 用法: python migrations.py [status|migrate|check-rebuild] [数据库路径]
+    from database import TestDatabase
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+    db_path = sys.argv[2] if len(sys.argv) > 2 else 'test_management.db'
+
+    if command == 'migrate':
+        # TestDatabase 初始化时会自动执行所有待处理的迁移
+        db = TestDatabase(db_path)
+        print(f"✅ 数据库已迁移到 v{MigrationRunner(db.get_connection).status()['current_version']}")
+    elif command == 'status':
+        runner = MigrationRunner(lambda: sqlite3.connect(db_path))
+        info = runner.status()
+        print(f"📦 当前版本: v{info['current_version']} / 最新版本: v{info['latest_version']}")
+        for item in info['pending']:
+            print(f"  ⏳ v{item['version']}: {item['description']}")
+    elif command == 'check-rebuild':
+        # 在临时副本上重建 test_steps，验证在线重建步骤，不修改原数据库
+        try:
+            result = check_rebuild(db_path)
+        except (RuntimeError, sqlite3.Error) as e:
+            print(f"❌ 重建检查失败: {e}")
+            sys.exit(1)
+        print(f"✅ 重建 {result['table']} 通过: {result['rows']} 行，"
+              f"{result['batches']} 批，耗时 {result['duration_ms']}ms")
+    else:
+        print(f"❌ 未知命令: {command}，可用命令: status, migrate, check-rebuild")
+        sys.exit(1)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+种子数据加载
+从数据文件读取测试模块和测试用例目录，在一个事务内批量写入数据库（executemany）
+
+目录文件格式:
+    JSON / YAML:
+        {
+          "modules": [{"name": "用户认证", "description": "...", "color": "#3498db", "icon": "🔐"}],
+          "test_cases": {
+            "用户认证": [{"title": "...", "priority": "high", "steps": ["步骤描述", {"description": "...", "expected_result": "..."}]}]
+          }
+        }
+        test_cases 也可以是列表，每个用例用 "module" 字段指定模块名称
+    NDJSON（.ndjson / .jsonl）: 每行一个对象，"type": "module" 的行为模块，其余行为测试用例（需要 "module" 字段）
+
+加载是幂等的：已存在的模块（按名称）和测试用例（按模块 + 标题）会被跳过，重复执行不会产生重复数据。
+YAML 需要安装 PyYAML（pip3 install pyyaml）
+
+用法:
+    python seed_loader.py [目录文件...] [--db 数据库路径] [--dry-run]
+    默认加载 seeds/ 目录下的所有目录文件
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+from typing import List, Dict, Optional, Any, Iterable, Tuple
+
+from config import get_config
+from database import TestDatabase
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+SEED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'seeds')
+CATALOG_EXTENSIONS = ('.json', '.yaml', '.yml', '.ndjson', '.jsonl')
+
+
+class DryRunRollback(Exception):
+    """试运行时回滚事务，携带加载结果"""
+
+    def __init__(self, report: Dict[str, Any]):
+        super().__init__('dry run')
+        self.report = report
+
+
+def read_catalog(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    读取目录文件并规范化
+
+    Returns:
+        {'modules': [...], 'test_cases': [...]}，每个测试用例带有 module 字段
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, encoding='utf-8') as f:
+        if ext in ('.ndjson', '.jsonl'):
+            modules, test_cases = [], []
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_number} 不是有效的JSON: {e}")
+                record_type = record.pop('type', 'test_case')
+                (modules if record_type == 'module' else test_cases).append(record)
+            return {'modules': modules, 'test_cases': test_cases}
+
+        if ext in ('.yaml', '.yml'):
+            if yaml is None:
+                raise RuntimeError(f"读取 {path} 需要安装 PyYAML: pip3 install pyyaml")
+            data = yaml.safe_load(f) or {}
+        elif ext == '.json':
+            data = json.load(f)
+        else:
+            raise ValueError(f"不支持的目录文件格式: {path}")
+
+    test_cases = data.get('test_cases', [])
+    if isinstance(test_cases, dict):
+        # 按模块名称分组的形式
+        test_cases = [
+            {**test_case, 'module': module_name}
+            for module_name, cases in test_cases.items()
+            for test_case in cases
+        ]
+    return {'modules': list(data.get('modules', [])), 'test_cases': list(test_cases)}
+
+
+def merge_catalogs(catalogs: Iterable[Dict[str, List[Dict[str, Any]]]]) -> Dict[str, List[Dict[str, Any]]]:
+    """合并多个目录，同名模块以先出现的为准"""
+    modules: Dict[str, Dict[str, Any]] = {}
+    test_cases: List[Dict[str, Any]] = []
+    for catalog in catalogs:
+        for module in catalog['modules']:
+            modules.setdefault(module['name'], module)
+        test_cases.extend(catalog['test_cases'])
+    return {'modules': list(modules.values()), 'test_cases': test_cases}
+
+
+def normalize_steps(steps: List[Any]) -> List[Tuple[str, str]]:
+    """步骤可以是描述字符串或 {description, expected_result}，返回 [(描述, 预期结果)]"""
+    normalized = []
+    for step in steps or []:
+        if isinstance(step, str):
+            if step.strip():
+                normalized.append((step.strip(), ''))
+        elif step.get('description', '').strip():
+            normalized.append((step['description'].strip(), step.get('expected_result', '')))
+    return normalized
+
+
+def validate_catalog(catalog: Dict[str, List[Dict[str, Any]]]) -> None:
+    """检查必填字段，错误一次性全部报告"""
+    errors = []
+    for index, module in enumerate(catalog['modules']):
+        if not module.get('name'):
+            errors.append(f"模块 #{index + 1} 缺少 name")
+    for index, test_case in enumerate(catalog['test_cases']):
+        if not test_case.get('title'):
+            errors.append(f"测试用例 #{index + 1} 缺少 title")
+        if not test_case.get('module'):
+            errors.append(f"测试用例 #{index + 1}（{test_case.get('title', '')}）缺少 module")
+    if errors:
+        raise ValueError("目录文件有误:\n  " + "\n  ".join(errors))
+
+
+def seed(db: TestDatabase, catalog: Dict[str, List[Dict[str, Any]]],
+         dry_run: bool = False) -> Dict[str, Any]:
+    """
+    在一个事务内加载目录
+
+    Args:
+        db: 数据库
+        catalog: read_catalog / merge_catalogs 的结果
+        dry_run: 只统计将要写入的数据，事务回滚
+
+    Returns:
+        {'modules_created', 'modules_existing', 'test_cases_created', 'test_cases_skipped', 'steps_created'}
+    """
+    validate_catalog(catalog)
+
+    def write(conn: sqlite3.Connection) -> Dict[str, Any]:
+        # 模块名称 -> ID，一次查询
+        module_ids = {row['name']: row['id'] for row in conn.execute('SELECT id, name FROM test_modules')}
+        new_modules = [module for module in catalog['modules'] if module['name'] not in module_ids]
+        conn.executemany('''
+            INSERT INTO test_modules (name, description, color, icon, sort_order)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [
+            (module['name'], module.get('description', ''), module.get('color', '#3498db'),
+             module.get('icon', ''), module.get('sort_order', 999))
+            for module in new_modules
+        ])
+        if new_modules:
+            module_ids = {row['name']: row['id'] for row in conn.execute('SELECT id, name FROM test_modules')}
+
+        unknown = sorted({tc['module'] for tc in catalog['test_cases'] if tc['module'] not in module_ids})
+        if unknown:
+            raise ValueError(f"测试用例引用了不存在的模块: {', '.join(unknown)}")
+
+        # (模块ID, 标题) 已存在的测试用例跳过
+        existing = {(row['module_id'], row['title'])
+                    for row in conn.execute('SELECT module_id, title FROM test_cases')}
+        new_cases: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        skipped = 0
+        for test_case in catalog['test_cases']:
+            key = (module_ids[test_case['module']], test_case['title'])
+            if key in existing or key in new_cases:
+                skipped += 1
+                continue
+            new_cases[key] = test_case
+
+        last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM test_cases').fetchone()[0]
+        conn.executemany('''
+            INSERT INTO test_cases (
+                title, description, module_id, priority, status,
+                estimated_time, expected_result, actual_result, executed_by
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (title, test_case.get('description', ''), module_id,
+             test_case.get('priority', 'medium'), test_case.get('status', 'pending'),
+             test_case.get('estimated_time', ''), test_case.get('expected_result', ''),
+             test_case.get('actual_result', ''), test_case.get('executed_by', ''))
+            for (module_id, title), test_case in new_cases.items()
+        ])
+
+        # 新用例的ID：一次查询取回本次插入的行
+        case_ids = {(row['module_id'], row['title']): row['id'] for row in conn.execute(
+            'SELECT id, module_id, title FROM test_cases WHERE id > ?', (last_id,))}
+        step_rows = [
+            (case_ids[key], step_number, description, expected_result)
+            for key, test_case in new_cases.items()
+            for step_number, (description, expected_result)
+            in enumerate(normalize_steps(test_case.get('steps', [])), 1)
+        ]
+        conn.executemany('''
+            INSERT INTO test_steps (test_case_id, step_number, description, expected_result)
+            VALUES (?, ?, ?, ?)
+        ''', step_rows)
+
+        report = {
+            'modules_created': len(new_modules),
+            'modules_existing': len(catalog['modules']) - len(new_modules),
+            'test_cases_created': len(new_cases),
+            'test_cases_skipped': skipped,
+            'steps_created': len(step_rows)
+        }
+        if dry_run:
+            raise DryRunRollback(report)
+        return report
+
+    try:
+        return db.execute_write(write)
+    except DryRunRollback as rollback:
+        return rollback.report
+
+
+def find_catalogs(directory: str = SEED_DIR) -> List[str]:
+    """目录下的所有目录文件（按文件名排序）"""
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.lower().endswith(CATALOG_EXTENSIONS)]
+
+
+def load_files(paths: List[str], db_path: Optional[str] = None,
+               dry_run: bool = False) -> Dict[str, Any]:
+    """读取并加载多个目录文件"""
+    catalog = merge_catalogs(read_catalog(path) for path in paths)
+    db = TestDatabase(db_path or get_config('database.path', 'test_management.db'))
+    return seed(db, catalog, dry_run)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    dry_run = '--dry-run' in args
+    db_path = None
+    if '--db' in args:
+        index = args.index('--db')
+        if index + 1 >= len(args):
+            print("❌ 错误: --db 需要指定数据库路径")
+            sys.exit(1)
+        db_path = args[index + 1]
+        del args[index:index + 2]
+    paths = [arg for arg in args if arg != '--dry-run'] or find_catalogs()
+    if not paths:
+        print(f"❌ 错误: 没有找到目录文件（{SEED_DIR}）")
+        sys.exit(1)
+
+    print(f"🌱 加载种子数据{'（试运行）' if dry_run else ''}:")
+    for path in paths:
+        print(f"   {path}")
+    started = time.perf_counter()
+    try:
+        report = load_files(paths, db_path, dry_run)
+    except (ValueError, RuntimeError, sqlite3.Error) as e:
+        print(f"❌ 加载失败，数据库未修改: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+
+    print(f"📁 模块: 新建 {report['modules_created']}，已存在 {report['modules_existing']}")
+    print(f"🧪 测试用例: 新建 {report['test_cases_created']}，跳过 {report['test_cases_skipped']}")
+    print(f"📝 测试步骤: 新建 {report['steps_created']}")
+    print(f"✅ 完成，耗时 {elapsed * 1000:.0f}ms")
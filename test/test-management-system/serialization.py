@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+JSON 序列化后端
+API 响应统一通过 dumps() 序列化：安装了 orjson 时使用 orjson，否则回退到标准库 json
+
+后端由配置 api.json_backend 选择:
+    auto    - 优先 orjson，未安装时使用标准库（默认）
+    orjson  - 强制使用 orjson
+    stdlib  - 强制使用标准库
+"""
+
+import json
+from typing import Any, Callable, Dict, Tuple
+
+from config import get_config
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    # 紧凑分隔符、保留中文原文，输出比 jsonify 默认格式更小
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def _load_orjson() -> Callable[[Any], bytes]:
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return dumps
+
+
+def available_backends() -> Dict[str, Callable[[Any], bytes]]:
+    """当前环境可用的序列化后端"""
+    backends = {'stdlib': _stdlib_dumps}
+    try:
+        backends['orjson'] = _load_orjson()
+    except ImportError:
+        pass
+    return backends
+
+
+def select_backend(name: str = 'auto') -> Tuple[str, Callable[[Any], bytes]]:
+    """
+    按名称选择序列化函数
+
+    Args:
+        name: auto / orjson / stdlib
+
+    Returns:
+        (实际使用的后端名称, 序列化函数)
+    """
+    backends = available_backends()
+    if name == 'auto':
+        name = 'orjson' if 'orjson' in backends else 'stdlib'
+    if name not in backends:
+        raise ValueError(f"JSON序列化后端不可用: {name}（可用: {', '.join(backends)}）")
+    return name, backends[name]
+
+
+BACKEND, dumps = select_backend(get_config('api.json_backend', 'auto'))
@@ -2,19 +2,238 @@
 """
 简单的HTTP服务器，带有防缓存功能
 用于解决测试管理系统的浏览器缓存问题
+
+- 默认使用多线程服务器，慢客户端不会阻塞其他请求（static.server = single 时使用单线程服务器）
+- 文件内容通过 sendfile 零拷贝发送，支持 Range 断点续传和 If-None-Match / If-Modified-Since 条件请求
+- js/ 和 css/ 有预压缩文件（python compression.py 生成）时按 Accept-Encoding 直接发送
+- 访问日志通过队列由后台线程输出，不阻塞请求处理
 """
 
 import http.server
 import socketserver
 import os
 import sys
+import queue
+import logging
+import logging.handlers
+import email.utils
 from datetime import datetime
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+
+from config import get_config
+from build_assets import cache_control_for
+from compression import STATIC_DIRECTORIES, precompressed_variant
+
+access_logger = logging.getLogger('server.access')
+
+
+def setup_access_log(mode: str = 'async') -> Optional[logging.handlers.QueueListener]:
+    """
+    配置访问日志
+
+    Args:
+        mode: async（队列 + 后台线程输出）、sync（直接输出）或 off（关闭）
+
+    Returns:
+        async 模式下的队列监听器，停止服务时需要调用 stop() 输出剩余日志
+    """
+    access_logger.handlers.clear()
+    access_logger.propagate = False
+    if mode == 'off':
+        access_logger.disabled = True
+        return None
 
-class NoCacheHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    access_logger.disabled = False
+    access_logger.setLevel(logging.INFO)
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter('[%(asctime)s] %(message)s', '%Y-%m-%d %H:%M:%S'))
+    if mode != 'async':
+        access_logger.addHandler(output)
+        return None
+
+    records = queue.SimpleQueue()
+    access_logger.addHandler(logging.handlers.QueueHandler(records))
+    listener = logging.handlers.QueueListener(records, output)
+    listener.start()
+    return listener
+
+
+class StaticFileHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    静态文件请求处理器
+    在 SimpleHTTPRequestHandler 基础上增加 keep-alive、sendfile、Range、ETag 和预压缩文件支持
+    """
+
+    protocol_version = 'HTTP/1.1'
+    use_sendfile = True
+    compression_enabled = True
+
+    etag = None
+    byte_range: Optional[Tuple[int, int]] = None
+
+    def send_head(self):
+        """
+        发送响应头并返回打开的文件；目录请求交给父类处理
+        """
+        self.etag = None
+        self.byte_range = None
+        request_path = urlsplit(self.path).path
+        if request_path == '/':
+            request_path = '/index.html'
+
+        path = self.translate_path(request_path)
+        if os.path.isdir(path):
+            return super().send_head()
+
+        # js/ 和 css/ 下的资源优先发送预压缩文件
+        file_path, encoding = path, None
+        negotiable = self.compression_enabled and request_path.lstrip('/').startswith(
+            tuple(f'{name}/' for name in STATIC_DIRECTORIES))
+        if negotiable:
+            variant = precompressed_variant(path, self.headers.get('Accept-Encoding', ''))
+            if variant:
+                file_path, encoding = variant
+
+        try:
+            f = open(file_path, 'rb')
+        except OSError:
+            self.send_error(404, "File not found")
+            return None
+
+        try:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            self.etag = f'"{stat.st_mtime_ns:x}-{size:x}{"-" + encoding if encoding else ""}"'
+            last_modified = self.date_time_string(int(stat.st_mtime))
+
+            if self.not_modified(stat.st_mtime):
+                f.close()
+                self.send_response(304)
+                self.send_header('ETag', self.etag)
+                if negotiable:
+                    self.send_header('Vary', 'Accept-Encoding')
+                self.end_headers()
+                return None
+
+            self.byte_range = self.parse_range(size, last_modified)
+            if self.byte_range == (-1, -1):
+                f.close()
+                self.byte_range = None
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return None
+
+            if self.byte_range:
+                start, length = self.byte_range
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {start}-{start + length - 1}/{size}')
+            else:
+                length = size
+                self.send_response(200)
+            self.send_header('Content-Type', self.guess_type(path))
+            self.send_header('Content-Length', str(length))
+            self.send_header('Last-Modified', last_modified)
+            self.send_header('ETag', self.etag)
+            self.send_header('Accept-Ranges', 'bytes')
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            if negotiable:
+                self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return f
+        except Exception:
+            f.close()
+            raise
+
+    def not_modified(self, mtime: float) -> bool:
+        """检查 If-None-Match / If-Modified-Since 条件请求"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or self.etag in tags
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            if since is None:
+                return False
+            return int(mtime) <= since.timestamp()
+        return False
+
+    def parse_range(self, size: int, last_modified: str) -> Optional[Tuple[int, int]]:
+        """
+        解析单个 Range 请求
+
+        Returns:
+            (起始位置, 长度)；没有 Range 或需要忽略时返回 None；无法满足时返回 (-1, -1)
+        """
+        header = self.headers.get('Range', '')
+        if not header.startswith('bytes=') or ',' in header:
+            return None  # 不支持多段请求，返回完整内容
+
+        # If-Range 与当前版本不一致时返回完整内容
+        if_range = self.headers.get('If-Range')
+        if if_range and if_range not in (self.etag, last_modified):
+            return None
+
+        first, _, last = header[len('bytes='):].strip().partition('-')
+        try:
+            if first:
+                start = int(first)
+                end = int(last) if last else size - 1
+            else:
+                # bytes=-500 表示最后 500 字节
+                suffix = int(last)
+                if suffix == 0:
+                    return (-1, -1)
+                start = max(size - suffix, 0)
+                end = size - 1
+        except ValueError:
+            return None
+
+        if start >= size or end < start:
+            return (-1, -1)
+        end = min(end, size - 1)
+        return (start, end - start + 1)
+
+    def copyfile(self, source, outputfile):
+        """
+        使用 sendfile 零拷贝发送文件内容（只发送 Range 指定的部分）
+        """
+        offset, count = self.byte_range or (0, None)
+        if self.use_sendfile:
+            outputfile.flush()
+            self.connection.sendfile(source, offset, count)
+            return
+
+        source.seek(offset)
+        remaining = count
+        while remaining is None or remaining > 0:
+            chunk = source.read(64 * 1024 if remaining is None else min(64 * 1024, remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+
+    def log_message(self, format, *args):
+        """
+        访问日志写入队列，由后台线程输出
+        """
+        access_logger.info("%s - %s", self.address_string(), format % args)
+
+
+class NoCacheHTTPRequestHandler(StaticFileHandler):
     """
     自定义HTTP请求处理器，添加防缓存头
     """
-    
+
     def end_headers(self):
         """
         在响应头结束前添加防缓存头
@@ -23,97 +242,120 @@ class NoCacheHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
         self.send_header('Pragma', 'no-cache')
         self.send_header('Expires', '0')
-        
+
         # 添加CORS头（如果需要）
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-        
+
         # 添加时间戳头
         self.send_header('X-Timestamp', str(int(datetime.now().timestamp())))
-        
+
         super().end_headers()
-    
-    def do_GET(self):
-        """
-        处理GET请求
-        """
-        # 记录请求
-        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] GET {self.path}")
-        
-        # 如果请求的是根路径，重定向到index.html
-        if self.path == '/':
-            self.path = '/index.html'
-        
-        # 调用父类方法处理请求
-        super().do_GET()
-    
+
     def do_OPTIONS(self):
         """
-        处理OPTIONS请求（CORS预检）
+        处理OPTIONS请求（CORS预检），CORS头由 end_headers 添加
         """
         self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        self.send_header('Content-Length', '0')
         self.end_headers()
-    
-    def log_message(self, format, *args):
+
+
+class CachingHTTPRequestHandler(StaticFileHandler):
+    """
+    提供 build_assets.py 构建结果的请求处理器
+    带内容哈希的资源长期缓存（immutable），index.html 等入口文件通过 ETag 重新验证
+    """
+
+    def end_headers(self):
         """
-        自定义日志格式
+        添加缓存相关响应头
         """
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        print(f"[{timestamp}] {format % args}")
+        if self.etag:
+            self.send_header('Cache-Control', cache_control_for(urlsplit(self.path).path))
+        super().end_headers()
 
-def start_server(port=8000, directory=None):
+
+def start_server(port=8000, directory=None, mode=None):
     """
     启动HTTP服务器
-    
+
     Args:
         port (int): 服务器端口
         directory (str): 服务目录
+        mode (str): source（源文件，防缓存）或 dist（构建结果，长期缓存），默认读取配置 static.mode
     """
+    mode = mode or get_config('static.mode', 'source')
+    if mode == 'dist' and not directory:
+        directory = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 get_config('static.dist_dir', 'dist'))
+        if not os.path.exists(directory):
+            print(f"❌ 错误: 构建目录 '{directory}' 不存在，请先运行 python build_assets.py")
+            sys.exit(1)
     if directory:
         os.chdir(directory)
-    
+
+    handler = CachingHTTPRequestHandler if mode == 'dist' else NoCacheHTTPRequestHandler
+    handler.use_sendfile = get_config('static.sendfile', True) and hasattr(os, 'sendfile')
+    handler.compression_enabled = get_config('compression.enabled', True)
+
+    threaded = get_config('static.server', 'threaded') == 'threaded'
+    server_class = http.server.ThreadingHTTPServer if threaded else socketserver.TCPServer
+    server_class.allow_reuse_address = True
+    listener = setup_access_log(get_config('static.access_log', 'async'))
+
     # 创建服务器
-    with socketserver.TCPServer(("", port), NoCacheHTTPRequestHandler) as httpd:
+    with server_class(("", port), handler) as httpd:
         print(f"🚀 测试管理系统服务器启动成功!")
         print(f"📍 服务地址: http://localhost:{port}")
         print(f"📁 服务目录: {os.getcwd()}")
-        print(f"🔄 已启用防缓存功能")
+        print(f"🧵 服务模式: {'多线程' if threaded else '单线程'}"
+              f"{'，sendfile 零拷贝' if handler.use_sendfile else ''}")
+        if mode == 'dist':
+            print(f"📦 已启用带哈希资源的长期缓存")
+        else:
+            print(f"🔄 已启用防缓存功能")
         print(f"⏰ 启动时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 50)
         print("💡 提示:")
         print("   - 页面右上角有强制刷新按钮")
-        print("   - 所有资源文件都会添加时间戳参数")
+        if mode == 'dist':
+            print("   - 资源文件名包含内容哈希，修改后重新运行 python build_assets.py")
+        else:
+            print("   - 所有资源文件都会添加时间戳参数")
         print("   - 数据更新时会自动提示刷新")
         print("   - 使用 Ctrl+C 停止服务器")
         print("=" * 50)
-        
+
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
             print(f"\n🛑 服务器已停止 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             print("👋 感谢使用测试管理系统!")
+        finally:
+            if listener:
+                listener.stop()
 
 if __name__ == "__main__":
     # 解析命令行参数
     port = 8000
     directory = None
-    
-    if len(sys.argv) > 1:
+    mode = 'dist' if '--dist' in sys.argv else None
+    args = [arg for arg in sys.argv[1:] if arg != '--dist']
+
+    if len(args) > 0:
         try:
-            port = int(sys.argv[1])
+            port = int(args[0])
         except ValueError:
             print("❌ 错误: 端口号必须是数字")
             sys.exit(1)
-    
-    if len(sys.argv) > 2:
-        directory = sys.argv[2]
+
+    if len(args) > 1:
+        directory = args[1]
         if not os.path.exists(directory):
             print(f"❌ 错误: 目录 '{directory}' 不存在")
             sys.exit(1)
-    
+
     # 启动服务器
-    start_server(port, directory)
\ No newline at end of file
+    start_server(port, directory, mode)
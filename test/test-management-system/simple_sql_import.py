@@ -6,10 +6,11 @@
 
 import sqlite3
 import os
-import re
 import time
 from datetime import datetime
 
+from js_catalog import iter_test_cases, step_texts, text_field
+
 def get_db_connection():
     """获取数据库连接"""
     conn = sqlite3.connect('test_management.db', timeout=30.0)
@@ -60,20 +61,8 @@ def parse_and_import_file(file_path, module_name):
         return 0
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 提取测试用例数组
-        array_pattern = r'const\s+(\w+TestCases)\s*=\s*\[(.*?)\];'
-        match = re.search(array_pattern, content, re.DOTALL)
-        
-        if not match:
-            print(f"❌ 未找到测试用例数组: {file_path}")
-            return 0
-        
-        # 提取每个测试用例对象
-        case_pattern = r'\{([^{}]*(?:\{[^{}]*\}[^{}]*)*)\}'
-        cases = re.findall(case_pattern, match.group(2))
+        # 读取解析后的测试用例（js_catalog 解析缓存，文件未变化时不再解析）
+        cases = list(iter_test_cases(file_path))
         
         if not cases:
             print(f"❌ 未找到测试用例: {file_path}")
@@ -88,21 +77,9 @@ def parse_and_import_file(file_path, module_name):
         
         imported_count = 0
         
-        for i, case_str in enumerate(cases):
+        for i, case in enumerate(cases):
             try:
-                # 提取基本信息
-                name_match = re.search(r'name:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                desc_match = re.search(r'description:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                priority_match = re.search(r'priority:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                status_match = re.search(r'status:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                expected_match = re.search(r'expectedResult:\s*[\'"]([^\'"]*)[\'"]', case_str)
-                
-                # 提取测试步骤
-                steps_match = re.search(r'testSteps:\s*\[(.*?)\]', case_str, re.DOTALL)
-                steps = []
-                if steps_match:
-                    step_matches = re.findall(r'[\'"]([^\'"]*)[\'"]', steps_match.group(1))
-                    steps = step_matches
+                name = text_field(case, 'name', f'测试用例{i+1}')
                 
                 # 状态值映射
                 status_mapping = {
@@ -112,7 +89,7 @@ def parse_and_import_file(file_path, module_name):
                     'inactive': 'skipped'
                 }
                 
-                original_status = status_match.group(1) if status_match else 'pending'
+                original_status = text_field(case, 'status', 'pending')
                 mapped_status = status_mapping.get(original_status, original_status)
                 
                 valid_statuses = ['pending', 'passed', 'failed', 'blocked', 'skipped']
@@ -128,19 +105,19 @@ def parse_and_import_file(file_path, module_name):
                         created_at, updated_at
                     ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
-                    name_match.group(1) if name_match else f'测试用例{i+1}',
-                    desc_match.group(1) if desc_match else '',
+                    name,
+                    text_field(case, 'description'),
                     module_id,
-                    priority_match.group(1) if priority_match else 'medium',
+                    text_field(case, 'priority', 'medium'),
                     mapped_status,
-                    expected_match.group(1) if expected_match else '',
+                    text_field(case, 'expectedResult'),
                     '', '', '', now, now
                 ))
                 
                 test_case_id = cursor.lastrowid
                 
                 # 插入测试步骤
-                for step_order, step_description in enumerate(steps, 1):
+                for step_order, step_description in enumerate(step_texts(case.get('testSteps')), 1):
                     cursor.execute("""
                         INSERT INTO test_steps (
                             test_case_id, step_order, description, expected_result,
@@ -149,7 +126,7 @@ def parse_and_import_file(file_path, module_name):
                     """, (test_case_id, step_order, step_description, '', now, now))
                 
                 imported_count += 1
-                print(f"  ✅ 导入测试用例 {i+1}: {name_match.group(1) if name_match else f'测试用例{i+1}'} (ID: {test_case_id})")
+                print(f"  ✅ 导入测试用例 {i+1}: {name} (ID: {test_case_id})")
                 
             except Exception as e:
                 print(f"  ❌ 导入失败 {i+1}: {str(e)}")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+数据库命名快照
+把导入完成的数据库保存为模板（VACUUM INTO，生成紧凑且一致的单个文件），
+重置测试环境时用快照原子替换数据库文件，不再清空后重新解析和导入 JS 文件
+
+API 服务器运行时通过 POST /api/admin/snapshots/<名称>/restore 恢复（服务器替换文件并重新打开连接）；
+服务器未运行时直接替换数据库文件
+
+用法:
+    python snapshots.py save <名称>      # 保存当前数据库为快照
+    python snapshots.py list            # 列出快照
+    python snapshots.py restore <名称>   # 恢复快照
+    python snapshots.py delete <名称>    # 删除快照
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import tempfile
+import urllib.error
+import urllib.request
+from datetime import datetime
+from typing import List, Dict, Optional, Any
+from urllib.parse import quote
+
+from config import get_config, get_api_url
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_EXTENSION = '.db'
+NAME_PATTERN = re.compile(r'^[\w.-]+$')
+
+
+class SnapshotError(Exception):
+    """快照不存在、名称无效或保存/恢复失败"""
+
+
+class SnapshotStore:
+    """快照目录，每个快照是一个完整的数据库文件 <名称>.db"""
+
+    def __init__(self, db_path: str, directory: str = 'snapshots'):
+        self.db_path = db_path
+        self.directory = directory
+
+    @classmethod
+    def from_config(cls, db_path: Optional[str] = None) -> 'SnapshotStore':
+        """按 config.py 的 database 配置创建"""
+        directory = get_config('database.snapshot_dir', 'snapshots')
+        return cls(
+            db_path or get_config('database.path', 'test_management.db'),
+            directory if os.path.isabs(directory) else os.path.join(BASE_DIR, directory)
+        )
+
+    def path(self, name: str) -> str:
+        if not NAME_PATTERN.match(name or ''):
+            raise SnapshotError("快照名称只能包含字母、数字、下划线、点和连字符")
+        return os.path.join(self.directory, name + SNAPSHOT_EXTENSION)
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.path(name))
+
+    def save(self, name: str, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+        """
+        保存快照（同名快照被替换）
+
+        Args:
+            name: 快照名称
+            conn: 使用已有的数据库连接（API 服务器），默认新建连接
+        """
+        target = self.path(name)
+        if not os.path.exists(self.db_path):
+            raise SnapshotError(f"数据库文件不存在: {self.db_path}")
+        os.makedirs(self.directory, exist_ok=True)
+
+        started = time.perf_counter()
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        own_connection = conn is None
+        if own_connection:
+            conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            # VACUUM INTO 在一个读事务中写出整理过的数据库副本，不阻塞 WAL 模式下的写入
+            conn.execute('VACUUM INTO ?', (temp_path,))
+            os.replace(temp_path, target)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        finally:
+            if own_connection:
+                conn.close()
+        return {**self.describe(target), 'duration_ms': round((time.perf_counter() - started) * 1000, 1)}
+
+    @staticmethod
+    def describe(path: str) -> Dict[str, Any]:
+        """快照信息：名称、大小、创建时间和数据量"""
+        conn = sqlite3.connect(f'file:{quote(os.path.abspath(path))}?mode=ro', uri=True)
+        try:
+            counts = {
+                table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                for table in ('test_modules', 'test_cases', 'test_steps', 'test_results')
+            }
+        except sqlite3.Error:
+            counts = {}
+        finally:
+            conn.close()
+        stat = os.stat(path)
+        return {
+            'name': os.path.basename(path)[:-len(SNAPSHOT_EXTENSION)],
+            'path': path,
+            'size': stat.st_size,
+            'created_at': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            'counts': counts
+        }
+
+    def list(self) -> List[Dict[str, Any]]:
+        """列出快照（按名称排序）"""
+        if not os.path.isdir(self.directory):
+            return []
+        return [self.describe(os.path.join(self.directory, file_name))
+                for file_name in sorted(os.listdir(self.directory))
+                if file_name.endswith(SNAPSHOT_EXTENSION)]
+
+    def delete(self, name: str) -> None:
+        path = self.path(name)
+        if not os.path.exists(path):
+            raise SnapshotError(f"快照不存在: {name}")
+        os.unlink(path)
+
+    def restore_file(self, name: str) -> Dict[str, Any]:
+        """
+        直接替换数据库文件（只在没有其他进程打开数据库时使用；API 服务器运行时使用 restore_snapshot）
+        """
+        source = self.path(name)
+        if not os.path.exists(source):
+            raise SnapshotError(f"快照不存在: {name}")
+
+        started = time.perf_counter()
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.db_path)), suffix='.swap')
+        os.close(fd)
+        try:
+            shutil.copyfile(source, temp_path)
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(self.db_path + suffix):
+                    os.unlink(self.db_path + suffix)
+            os.replace(temp_path, self.db_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        return {'name': name, 'duration_ms': round((time.perf_counter() - started) * 1000, 1), 'via': 'file'}
+
+
+def restore_snapshot(name: str, store: Optional[SnapshotStore] = None) -> Dict[str, Any]:
+    """
+    恢复快照：API 服务器在运行时由服务器替换文件并重新打开连接，否则直接替换数据库文件
+
+    Returns:
+        {name, duration_ms, via: 'api' | 'file'}
+    """
+    store = store or SnapshotStore.from_config()
+    if not store.exists(name):
+        raise SnapshotError(f"快照不存在: {name}")
+
+    request = urllib.request.Request(get_api_url(f'/admin/snapshots/{quote(name)}/restore'),
+                                     data=b'{}', method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=get_config('import_export.timeout', 30)) as response:
+            return {**json.loads(response.read())['data'], 'via': 'api'}
+    except urllib.error.HTTPError as e:
+        raise SnapshotError(f"API 恢复快照失败: {e.code} {e.read().decode('utf-8', 'replace')}")
+    except (urllib.error.URLError, ConnectionError):
+        # API 服务器没有运行
+        return store.restore_file(name)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in ('save', 'list', 'restore', 'delete'):
+        print("用法: python snapshots.py [save <名称> | list | restore <名称> | delete <名称>]")
+        sys.exit(1)
+    command = sys.argv[1]
+    if command != 'list' and len(sys.argv) < 3:
+        print("❌ 错误: 请指定快照名称")
+        sys.exit(1)
+
+    store = SnapshotStore.from_config()
+    try:
+        if command == 'save':
+            info = store.save(sys.argv[2])
+            print(f"📸 已保存快照 {info['name']}: {info['counts'].get('test_cases', 0)} 个测试用例，"
+                  f"{info['size'] / 1024:.0f}KB，耗时 {info['duration_ms']:.0f}ms")
+        elif command == 'list':
+            snapshots = store.list()
+            if not snapshots:
+                print(f"📭 没有快照（{store.directory}）")
+            for info in snapshots:
+                print(f"📸 {info['name']}  {info['created_at']}  {info['counts'].get('test_cases', 0)} 个测试用例  "
+                      f"{info['size'] / 1024:.0f}KB")
+        elif command == 'restore':
+            info = restore_snapshot(sys.argv[2], store)
+            via = 'API 服务器' if info['via'] == 'api' else '替换数据库文件'
+            print(f"✅ 已恢复快照 {sys.argv[2]}（{via}，耗时 {info['duration_ms']:.0f}ms）")
+        else:
+            store.delete(sys.argv[2])
+            print(f"🗑️ 已删除快照 {sys.argv[2]}")
+    except (SnapshotError, OSError, sqlite3.Error) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -20,6 +20,10 @@ if [ -f "requirements.txt" ]; then
     pip3 install -r requirements.txt
 fi
 
+# 预压缩静态资源
+echo "🗜️ 预压缩静态资源..."
+python3 compression.py
+
 # 启动Flask API服务器
 echo "🔧 启动Flask API服务器..."
 python3 api_server.py 8000
\ No newline at end of file
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+列式统计引擎
+把测试用例的 模块 / 状态 / 优先级 / 最近执行时间 加载为紧凑的定长数组（array 模块），
+安装了 NumPy 时零拷贝转换为 ndarray 后用 bincount 做向量化分组计数，否则逐行计数
+
+统计接口 GET /api/test-cases/statistics?group_by=module,priority,status 和
+GET /api/modules/statistics 由此计算；列数据在 change_log 版本变化（或数据库被替换）后重新加载
+
+后端由配置 api.statistics_backend 选择:
+    auto    - 优先 numpy，未安装时使用 array（默认）
+    numpy   - 强制使用 numpy
+    array   - 强制使用标准库 array 模块
+"""
+
+import math
+import sqlite3
+import calendar
+import threading
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Any, Sequence, Tuple
+
+from config import get_config
+from database import TestDatabase
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# 列中保存的是以下元组的下标；未知或为空的状态计为 pending（与模块统计的口径一致）
+STATUSES = ('pending', 'passed', 'failed', 'blocked', 'skipped')
+PRIORITIES = ('low', 'medium', 'high', 'urgent')
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+PRIORITY_CODES = {priority: code for code, priority in enumerate(PRIORITIES)}
+DEFAULT_PRIORITY = PRIORITY_CODES['medium']
+
+# 可分组的字段
+GROUP_FIELDS = ('module', 'priority', 'status')
+
+# 执行时间直方图的桶宽（秒）
+HISTOGRAM_BUCKETS = {'hour': 3600, 'day': 86400, 'week': 7 * 86400}
+
+# 直方图桶数上限（计数列表和标签的长度与桶数成正比）
+MAX_HISTOGRAM_BUCKETS = 1000
+
+
+def select_backend(name: str = 'auto') -> str:
+    """
+    Args:
+        name: auto / numpy / array
+
+    Returns:
+        实际使用的后端名称
+    """
+    if name == 'auto':
+        return 'numpy' if numpy is not None else 'array'
+    if name == 'numpy' and numpy is None:
+        raise ValueError("统计后端不可用: numpy（未安装）")
+    if name not in ('numpy', 'array'):
+        raise ValueError(f"未知的统计后端: {name}（可选: auto, numpy, array）")
+    return name
+
+
+class StatisticsColumns:
+    """
+    一次加载的列数据，每个测试用例占一行:
+        module_index  模块在 modules 中的下标（int64，模块不存在时为 len(modules)）
+        status        STATUSES 下标（int8）
+        priority      PRIORITIES 下标（int8）
+        executed_at   最近一次执行时间（float64，秒；与数据库中的本地时间同一时间轴，未执行为 NaN）
+    """
+
+    def __init__(self, modules: List[Dict[str, Any]], module_index: array, status: array,
+                 priority: array, executed_at: array):
+        self.modules = modules
+        self.module_index = module_index
+        self.status = status
+        self.priority = priority
+        self.executed_at = executed_at
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> 'StatisticsColumns':
+        modules = [dict(row) for row in conn.execute('''
+            SELECT id, name, description, color, icon FROM test_modules
+            ORDER BY sort_order ASC, name ASC
+        ''')]
+        positions = {module['id']: index for index, module in enumerate(modules)}
+        missing = len(modules)
+
+        module_index, status, priority, executed_at = array('q'), array('b'), array('b'), array('d')
+        cursor = conn.execute('''
+            SELECT tc.module_id, tc.status, tc.priority,
+                   (julianday(r.executed_at) - 2440587.5) * 86400.0
+            FROM test_cases tc
+            LEFT JOIN (
+                SELECT test_case_id, MAX(executed_at) AS executed_at
+                FROM test_results GROUP BY test_case_id
+            ) r ON r.test_case_id = tc.id
+        ''')
+        for module_id, case_status, case_priority, executed in cursor:
+            module_index.append(positions.get(module_id, missing))
+            status.append(STATUS_CODES.get(case_status, 0))
+            priority.append(PRIORITY_CODES.get(case_priority, DEFAULT_PRIORITY))
+            executed_at.append(math.nan if executed is None else executed)
+        return cls(modules, module_index, status, priority, executed_at)
+
+
+def bincount(keys: Sequence[Tuple[Sequence[int], int]], backend: str) -> List[int]:
+    """
+    多列组合分组计数
+
+    Args:
+        keys: [(列, 取值个数), ...]，按行优先组合为一个下标
+        backend: numpy / array
+
+    Returns:
+        长度为各列取值个数乘积的计数列表
+    """
+    size = 1
+    for _, cardinality in keys:
+        size *= cardinality
+    if backend == 'numpy':
+        combined = None
+        for column, cardinality in keys:
+            values = numpy.frombuffer(column, dtype=numpy.int8 if column.typecode == 'b' else numpy.int64)
+            combined = values.astype(numpy.int64) if combined is None else combined * cardinality + values
+        if combined is None or not len(combined):
+            return [0] * size
+        return numpy.bincount(combined, minlength=size).tolist()
+
+    counts = [0] * size
+    for key, count in Counter(zip(*(column for column, _ in keys))).items():
+        index = 0
+        for value, (_, cardinality) in zip(key, keys):
+            index = index * cardinality + value
+        counts[index] += count
+    return counts
+
+
+def histogram(columns: StatisticsColumns, start: float, width: float, buckets: int,
+              backend: str) -> List[int]:
+    """按最近执行时间分桶，再按状态计数，返回长度为 buckets * len(STATUSES) 的计数列表"""
+    size = buckets * len(STATUSES)
+    if backend == 'numpy':
+        executed_at = numpy.frombuffer(columns.executed_at, dtype=numpy.float64)
+        status = numpy.frombuffer(columns.status, dtype=numpy.int8)
+        # NaN（未执行）的比较结果为 False
+        mask = (executed_at >= start) & (executed_at < start + width * buckets)
+        bucket = ((executed_at[mask] - start) // width).astype(numpy.int64)
+        return numpy.bincount(bucket * len(STATUSES) + status[mask], minlength=size).tolist()
+
+    counts = [0] * size
+    end = start + width * buckets
+    for executed, case_status in zip(columns.executed_at, columns.status):
+        if start <= executed < end:
+            counts[int((executed - start) // width) * len(STATUSES) + case_status] += 1
+    return counts
+
+
+def summarize_counts(counts: Sequence[int]) -> Dict[str, Any]:
+    """按状态的计数向量 -> 总数、各状态数量、通过率和执行率（百分比）"""
+    total = sum(counts)
+    by_status = dict(zip(STATUSES, counts))
+    return {
+        'total_cases': total,
+        'by_status': by_status,
+        'pass_rate': round(by_status['passed'] / total * 100, 1) if total else 0,
+        'execution_rate': round((total - by_status['pending']) / total * 100, 1) if total else 0
+    }
+
+
+class StatisticsEngine:
+    """统计接口的计算入口（线程安全，列数据在多个请求间共享）"""
+
+    def __init__(self, db: TestDatabase, backend: Optional[str] = None):
+        """
+        Args:
+            db: 数据库（通过 analytics_connection 加载列数据）
+            backend: auto / numpy / array，默认读取配置 api.statistics_backend
+        """
+        self.db = db
+        self.backend = select_backend(backend or get_config('api.statistics_backend', 'auto'))
+        self._columns: Optional[StatisticsColumns] = None
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        db.events.subscribe(self._on_event)
+
+    def _on_event(self, event: Dict[str, Any]) -> None:
+        # 替换后的数据库的变更日志版本可能与之前相同
+        if event['type'] == 'reset':
+            self._columns = None
+
+    def columns(self) -> StatisticsColumns:
+        """当前的列数据（change_log 版本变化后重新加载）"""
+        with self._lock:
+            with self.db.analytics_connection() as conn:
+                version = conn.execute('SELECT COALESCE(MAX(version), 0) FROM change_log').fetchone()[0]
+                if self._columns is None or version != self._version:
+                    self._columns = StatisticsColumns.load(conn)
+                    self._version = version
+            return self._columns
+
+    def module_statistics(self) -> List[Dict[str, Any]]:
+        """各模块的测试用例数量和通过率（GET /api/modules/statistics）"""
+        columns = self.columns()
+        module_count = len(columns.modules) + 1
+        counts = bincount([(columns.module_index, module_count), (columns.status, len(STATUSES))], self.backend)
+        result = []
+        for index, module in enumerate(columns.modules):
+            summary = summarize_counts(counts[index * len(STATUSES):(index + 1) * len(STATUSES)])
+            result.append({
+                'id': module['id'],
+                'name': module['name'],
+                'description': module['description'],
+                'color': module['color'],
+                'icon': module['icon'],
+                'total_cases': summary['total_cases'],
+                'passed_cases': summary['by_status']['passed'],
+                'failed_cases': summary['by_status']['failed'],
+                'pending_cases': summary['by_status']['pending'],
+                'pass_rate': summary['pass_rate'],
+                'status': 'active' if summary['total_cases'] > 0 else 'inactive'
+            })
+        return result
+
+    def statistics(self, group_by: Sequence[str] = (), bucket: str = 'day', buckets: int = 30,
+                   now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        分组统计（GET /api/test-cases/statistics?group_by=...）
+
+        Args:
+            group_by: 分组字段（module / priority / status 的组合），为空时只返回总体、按优先级和直方图
+            bucket: 执行时间直方图的桶宽（hour / day / week）
+            buckets: 直方图的桶数（截止到当前时间所在的桶，1 到 MAX_HISTOGRAM_BUCKETS）
+            now: 当前时间（本地时间，默认 datetime.now()）
+
+        Returns:
+            {backend, overall, by_priority, group_by, groups, histogram}
+        """
+        unknown = [field for field in group_by if field not in GROUP_FIELDS]
+        if unknown:
+            raise ValueError(f"不支持的分组字段: {', '.join(unknown)}（可选: {', '.join(GROUP_FIELDS)}）")
+        if bucket not in HISTOGRAM_BUCKETS:
+            raise ValueError(f"不支持的直方图桶宽: {bucket}（可选: {', '.join(HISTOGRAM_BUCKETS)}）")
+        if not 1 <= buckets <= MAX_HISTOGRAM_BUCKETS:
+            raise ValueError(f"直方图桶数必须在 1 到 {MAX_HISTOGRAM_BUCKETS} 之间")
+
+        columns = self.columns()
+        status_count = len(STATUSES)
+        by_priority = bincount([(columns.priority, len(PRIORITIES)), (columns.status, status_count)], self.backend)
+
+        return {
+            'backend': self.backend,
+            'overall': summarize_counts(bincount([(columns.status, status_count)], self.backend)),
+            'by_priority': [
+                {'priority': priority,
+                 **summarize_counts(by_priority[index * status_count:(index + 1) * status_count])}
+                for index, priority in enumerate(PRIORITIES)
+            ],
+            'group_by': list(group_by),
+            'groups': self._groups(columns, group_by) if group_by else [],
+            'histogram': self._histogram(columns, bucket, buckets, now or datetime.now())
+        }
+
+    def _groups(self, columns: StatisticsColumns, group_by: Sequence[str]) -> List[Dict[str, Any]]:
+        # 状态总是作为最后一维计数；按状态分组时把每组的状态向量再拆开
+        fields = [field for field in GROUP_FIELDS if field in group_by and field != 'status']
+        dimensions = {
+            'module': (columns.module_index, len(columns.modules) + 1),
+            'priority': (columns.priority, len(PRIORITIES))
+        }
+        keys = [dimensions[field] for field in fields] + [(columns.status, len(STATUSES))]
+        counts = bincount(keys, self.backend)
+
+        groups = []
+        for offset in range(0, len(counts), len(STATUSES)):
+            status_counts = counts[offset:offset + len(STATUSES)]
+            if not any(status_counts):
+                continue
+            values: Dict[str, int] = {}
+            index = offset // len(STATUSES)
+            for field in reversed(fields):
+                cardinality = dimensions[field][1]
+                values[field], index = index % cardinality, index // cardinality
+            group: Dict[str, Any] = {}
+            for field in fields:
+                if field == 'module':
+                    module = columns.modules[values[field]] if values[field] < len(columns.modules) else None
+                    group['module_id'] = module['id'] if module else None
+                    group['module_name'] = module['name'] if module else None
+                else:
+                    group['priority'] = PRIORITIES[values[field]]
+            if 'status' in group_by:
+                for status, count in zip(STATUSES, status_counts):
+                    if count:
+                        groups.append({**group, 'status': status, 'total_cases': count})
+            else:
+                groups.append({**group, **summarize_counts(status_counts)})
+        return groups
+
+    def _histogram(self, columns: StatisticsColumns, bucket: str, buckets: int,
+                   now: datetime) -> Dict[str, Any]:
+        width = HISTOGRAM_BUCKETS[bucket]
+        # 执行时间按本地时间保存，与 julianday 一样把它当作 UTC 换算为秒，时间轴一致
+        current = calendar.timegm(now.timetuple())
+        if bucket == 'week':
+            # 1970-01-01 是星期四，偏移到星期一开始
+            monday = 4 * 86400
+            start = (current - monday) // width * width + monday - (buckets - 1) * width
+        else:
+            start = current // width * width - (buckets - 1) * width
+        counts = histogram(columns, start, width, buckets, self.backend)
+        return {
+            'bucket': bucket,
+            'labels': [
+                datetime.fromtimestamp(start + index * width, timezone.utc).replace(tzinfo=None).isoformat()
+                for index in range(buckets)
+            ],
+            'executed': [sum(counts[index * len(STATUSES):(index + 1) * len(STATUSES)]) for index in range(buckets)],
+            'by_status': {status: counts[code::len(STATUSES)] for code, status in enumerate(STATUSES)}
+        }
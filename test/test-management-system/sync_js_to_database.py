@@ -5,11 +5,9 @@
 """
 
 import os
-import re
-import json
 import requests
-import sqlite3
-from typing import List, Dict, Any, Optional
+
+from js_catalog import iter_test_cases, count_test_cases, step_texts
 
 # 导入配置管理器
 try:
@@ -45,179 +43,36 @@ def get_database_test_cases():
         return []
 
 def parse_js_file(file_path):
-    """解析JS文件中的测试用例"""
+    """解析JS文件中的测试用例数量"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 查找测试用例数组
-        patterns = [
-            r'const\s+\w*[Tt]est[Cc]ases\s*=\s*(\[[\s\S]*?\]);',
-            r'let\s+\w*[Tt]est[Cc]ases\s*=\s*(\[[\s\S]*?\]);',
-            r'var\s+\w*[Tt]est[Cc]ases\s*=\s*(\[[\s\S]*?\]);'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, content)
-            if match:
-                array_content = match.group(1)
-                # 简单的对象计数
-                object_count = array_content.count('{')
-                return object_count, array_content
-        
-        return 0, ""
+        return count_test_cases(file_path)
     except Exception as e:
         print(f"解析文件 {file_path} 失败: {e}")
-        return 0, ""
+        return 0
 
 def extract_test_cases_from_js(file_path):
-    """从JS文件中提取完整的测试用例数据"""
+    """
+    从JS文件中逐个提取完整的测试用例数据
+    通过 js_catalog 解析缓存读取，文件未变化时不再扫描和解析
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 查找测试用例数组的开始
-        patterns = [
-            r'const\s+(\w*[Tt]est[Cc]ases)\s*=\s*\[',
-            r'let\s+(\w*[Tt]est[Cc]ases)\s*=\s*\[',
-            r'var\s+(\w*[Tt]est[Cc]ases)\s*=\s*\['
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, content)
-            if match:
-                var_name = match.group(1)
-                start_pos = match.end() - 1  # 回到 '[' 位置
-                
-                # 找到匹配的 ']'
-                bracket_count = 0
-                end_pos = start_pos
-                for i, char in enumerate(content[start_pos:]):
-                    if char == '[':
-                        bracket_count += 1
-                    elif char == ']':
-                        bracket_count -= 1
-                        if bracket_count == 0:
-                            end_pos = start_pos + i + 1
-                            break
-                
-                array_content = content[start_pos:end_pos]
-                
-                # 简单解析：计算对象数量和提取基本信息
-                test_cases = []
-                
-                # 使用正则表达式提取每个测试用例对象
-                object_pattern = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
-                
-                # 更复杂的对象匹配，处理嵌套
-                brace_count = 0
-                current_object = ""
-                in_object = False
-                in_string = False
-                string_char = None
-                escape_next = False
-                
-                for char in array_content[1:-1]:  # 跳过开头和结尾的 []
-                    if escape_next:
-                        current_object += char
-                        escape_next = False
-                        continue
-                    
-                    if char == '\\':
-                        escape_next = True
-                        current_object += char
-                        continue
-                    
-                    if not in_string and char in ['"', "'", '`']:
-                        in_string = True
-                        string_char = char
-                        current_object += char
-                        continue
-                    
-                    if in_string and char == string_char:
-                        in_string = False
-                        string_char = None
-                        current_object += char
-                        continue
-                    
-                    if in_string:
-                        current_object += char
-                        continue
-                    
-                    if char == '{':
-                        if not in_object:
-                            in_object = True
-                            current_object = ""
-                        brace_count += 1
-                        current_object += char
-                    elif char == '}':
-                        brace_count -= 1
-                        current_object += char
-                        if brace_count == 0 and in_object:
-                            # 解析这个对象
-                            test_case = parse_single_test_case(current_object)
-                            if test_case:
-                                test_cases.append(test_case)
-                            current_object = ""
-                            in_object = False
-                    elif in_object:
-                        current_object += char
-                
-                return test_cases
-        
-        return []
+        for test_case in iter_test_cases(file_path):
+            yield normalize_test_case(test_case)
     except Exception as e:
         print(f"提取文件 {file_path} 中的测试用例失败: {e}")
-        return []
 
-def parse_single_test_case(obj_str):
-    """解析单个测试用例对象字符串"""
-    try:
-        test_case = {}
-        
-        # 提取基本字段
-        fields = {
-            'id': r"id\s*:\s*['\"`]([^'\"`]*)['\"`]",
-            'title': r"title\s*:\s*['\"`]([^'\"`]*)['\"`]",
-            'description': r"description\s*:\s*['\"`]([^'\"`]*)['\"`]",
-            'expected': r"expected\s*:\s*['\"`]([^'\"`]*)['\"`]",
-            'status': r"status\s*:\s*['\"`]([^'\"`]*)['\"`]",
-            'priority': r"priority\s*:\s*['\"`]([^'\"`]*)['\"`]",
-            'estimatedTime': r"estimatedTime\s*:\s*['\"`]([^'\"`]*)['\"`]",
-            'executedBy': r"executedBy\s*:\s*['\"`]([^'\"`]*)['\"`]",
-            'notes': r"notes\s*:\s*['\"`]([^'\"`]*)['\"`]"
-        }
-        
-        for field, pattern in fields.items():
-            match = re.search(pattern, obj_str)
-            if match:
-                test_case[field] = match.group(1)
-        
-        # 处理数组字段 steps
-        steps_match = re.search(r"steps\s*:\s*\[(.*?)\]", obj_str, re.DOTALL)
-        if steps_match:
-            steps_content = steps_match.group(1)
-            steps = re.findall(r"['\"`]([^'\"`]*)['\"`]", steps_content)
-            test_case['steps'] = '\n'.join(steps)
-        
-        # 处理可能包含模板字符串的字段
-        for field in ['actualResult', 'description', 'expected']:
-            # 尝试匹配模板字符串
-            template_pattern = f"{field}\\s*:\\s*`([^`]*)`"
-            match = re.search(template_pattern, obj_str, re.DOTALL)
-            if match:
-                test_case[field] = match.group(1).strip()
-            elif field not in test_case:
-                # 尝试普通字符串
-                normal_pattern = f"{field}\\s*:\\s*['\"]([^'\"]*)['\"]"
-                match = re.search(normal_pattern, obj_str)
-                if match:
-                    test_case[field] = match.group(1)
-        
-        return test_case if test_case else None
-    except Exception as e:
-        print(f"解析测试用例对象失败: {e}")
-        return None
+def normalize_test_case(test_case):
+    """整理解析后的测试用例字段"""
+    # 步骤数组合并为多行文本
+    if isinstance(test_case.get('steps'), list):
+        test_case['steps'] = '\n'.join(step_texts(test_case['steps']))
+    
+    # 模板字符串字段去掉首尾空白
+    for field in ['actualResult', 'description', 'expected']:
+        if isinstance(test_case.get(field), str):
+            test_case[field] = test_case[field].strip()
+    
+    return test_case
 
 def get_module_id_by_name(module_name):
     """根据模块名获取模块ID"""
@@ -296,13 +151,12 @@ def sync_js_to_database():
         
         print(f"\n  处理文件: {js_file} -> {module_name}")
         
-        # 提取测试用例
-        test_cases = extract_test_cases_from_js(file_path)
-        print(f"    找到 {len(test_cases)} 个测试用例")
-        
         module_id = get_module_id_by_name(module_name)
         
-        for i, case in enumerate(test_cases):
+        # 逐个提取并处理测试用例
+        found = 0
+        for i, case in enumerate(extract_test_cases_from_js(file_path)):
+            found += 1
             # 检查是否已存在（基于ID）
             case_id = case.get('id')
             if case_id and case_id in existing_ids:
@@ -332,6 +186,8 @@ def sync_js_to_database():
                 total_added += 1
             else:
                 print(f"    ✗ 创建失败: {api_data['title']}")
+        
+        print(f"    找到 {found} 个测试用例")
     
     print(f"\n3. 同步完成:")
     print(f"  新增测试用例: {total_added}")
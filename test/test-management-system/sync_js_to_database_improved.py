@@ -8,11 +8,12 @@
 """
 
 import os
-import re
 import json
 import requests
 from typing import List, Dict, Any, Optional
 
+from js_catalog import iter_test_cases, import_fields
+
 # API配置
 API_BASE_URL = "http://localhost:8000"
 
@@ -45,104 +46,14 @@ def get_module_id_by_name(module_name: str) -> Optional[int]:
     }
     return module_mapping.get(module_name)
 
-def parse_single_test_case(case_text: str) -> Optional[Dict[str, Any]]:
-    """解析单个测试用例对象"""
-    try:
-        # 提取各个字段
-        fields = {}
-        
-        # ID
-        id_match = re.search(r'id:\s*(\d+)', case_text)
-        if id_match:
-            fields['id'] = int(id_match.group(1))
-        
-        # Category
-        category_match = re.search(r'category:\s*["\']([^"\']+)["\']', case_text)
-        if category_match:
-            fields['category'] = category_match.group(1)
-        
-        # Title
-        title_match = re.search(r'title:\s*["\']([^"\']+)["\']', case_text)
-        if title_match:
-            fields['title'] = title_match.group(1)
-        
-        # Description
-        desc_match = re.search(r'description:\s*["\']([^"\']+)["\']', case_text)
-        if desc_match:
-            fields['description'] = desc_match.group(1)
-        
-        # Steps (数组格式)
-        steps_match = re.search(r'steps:\s*\[(.*?)\]', case_text, re.DOTALL)
-        if steps_match:
-            steps_content = steps_match.group(1)
-            steps = re.findall(r'["\']([^"\']+)["\']', steps_content)
-            fields['steps'] = steps
-        
-        # Expected
-        expected_match = re.search(r'expected:\s*["\']([^"\']+)["\']', case_text)
-        if expected_match:
-            fields['expected'] = expected_match.group(1)
-        
-        # Status
-        status_match = re.search(r'status:\s*["\']([^"\']+)["\']', case_text)
-        if status_match:
-            fields['status'] = status_match.group(1)
-        
-        # Priority
-        priority_match = re.search(r'priority:\s*["\']([^"\']+)["\']', case_text)
-        if priority_match:
-            fields['priority'] = priority_match.group(1)
-        
-        # EstimatedTime
-        time_match = re.search(r'estimatedTime:\s*["\']([^"\']+)["\']', case_text)
-        if time_match:
-            fields['estimatedTime'] = time_match.group(1)
-        
-        return fields if fields else None
-        
-    except Exception as e:
-        print(f"解析测试用例失败: {e}")
-        return None
-
 def extract_test_cases_from_js(file_path: str) -> List[Dict[str, Any]]:
-    """从JS文件中提取测试用例"""
+    """从JS文件中提取测试用例（通过 js_catalog 解析缓存读取，文件未变化时不再解析）"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 查找测试用例数组
-        array_pattern = r'(?:const|let|var)\s+\w*[Tt]est[Cc]ases?\s*=\s*\[(.*?)\];'
-        match = re.search(array_pattern, content, re.DOTALL)
-        
-        if not match:
-            return []
-        
-        array_content = match.group(1)
-        
-        # 分割单个测试用例对象
         cases = []
-        brace_count = 0
-        current_case = ""
-        
-        for char in array_content:
-            if char == '{':
-                if brace_count == 0:
-                    current_case = "{"
-                else:
-                    current_case += char
-                brace_count += 1
-            elif char == '}':
-                current_case += char
-                brace_count -= 1
-                if brace_count == 0:
-                    # 解析这个测试用例
-                    parsed_case = parse_single_test_case(current_case)
-                    if parsed_case:
-                        cases.append(parsed_case)
-                    current_case = ""
-            elif brace_count > 0:
-                current_case += char
-        
+        for case in iter_test_cases(file_path):
+            fields = import_fields(case)
+            if fields:
+                cases.append(fields)
         return cases
         
     except Exception as e: